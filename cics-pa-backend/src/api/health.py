@@ -3,6 +3,7 @@ Endpoint de health check.
 Verifica el estado del servicio y la conexión a la base de datos.
 """
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 from datetime import datetime
 
 from ..models import HealthResponse
@@ -55,3 +56,28 @@ async def ping():
         Mensaje de pong
     """
     return {"message": "pong", "timestamp": datetime.utcnow()}
+
+
+@router.get("/ready")
+async def readiness(
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Readiness check.
+
+    Indica si el pool ODBC alcanzó el mínimo de conexiones. Con
+    POOL_LAZY_INIT la aplicación arranca antes de que el pool esté listo.
+
+    Returns:
+        200 si el pool está listo, 503 si todavía se está calentando
+    """
+    ready = service.odbc_manager.ready
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "pool": service.odbc_manager.pool.status(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    )
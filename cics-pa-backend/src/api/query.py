@@ -2,24 +2,226 @@
 Endpoints para ejecución de queries.
 Permite ejecutar consultas personalizadas y obtener abends.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from ..models import (
     QueryRequest,
+    ContinueQueryRequest,
     QueryResponse,
+    ColumnarQueryResponse,
     AbendsFilterRequest,
     AbendsResponse,
+    ColumnarAbendsResponse,
+    ResponseFormat,
+    ExportFormat,
+    TimeseriesGroupBy,
+    TimeseriesResponse,
+    TopAbendsWindow,
+    TopAbendsDimension,
+    TopAbendsResponse,
+    DistinctCountsResponse,
+    NameField,
+    NameSuggestionsResponse,
 )
 from ..services import get_query_service, QueryService
-from ..core import get_logger
+from ..database import CursorNotFoundError, CursorLimitError
+from ..services.serializers import (
+    NDJSON_MEDIA_TYPE,
+    CSV_MEDIA_TYPE,
+    export_headers,
+)
+from ..services.arrow_export import (
+    ARROW_STREAM_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    arrow_available,
+)
+from ..services.broadcast import SSE_MEDIA_TYPE, StreamLimitError, get_abend_broadcaster
+from ..services.ingest import get_abend_ingester
+from ..services.sketches import SketchesUnavailableError
+from ..core import get_logger, get_settings
+from ..core.responses import FastJSONResponse, conditional_response, weak_etag
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/query", tags=["Query"])
 
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: NDJSON_MEDIA_TYPE,
+    ExportFormat.CSV: CSV_MEDIA_TYPE,
+    ExportFormat.ARROW: ARROW_STREAM_MEDIA_TYPE,
+    ExportFormat.PARQUET: PARQUET_MEDIA_TYPE,
+}
+
+# Media types del header Accept que activan la exportación binaria
+NEGOTIATED_FORMATS = {
+    ARROW_STREAM_MEDIA_TYPE: ExportFormat.ARROW,
+    PARQUET_MEDIA_TYPE: ExportFormat.PARQUET,
+    "application/x-parquet": ExportFormat.PARQUET,
+}
+
+EXPORT_FORMAT_QUERY = Query(
+    ExportFormat.NDJSON,
+    alias="format",
+    description="Formato de salida: ndjson, csv, arrow o parquet"
+)
+
+RESPONSE_FORMAT_QUERY = Query(
+    ResponseFormat.JSON,
+    alias="format",
+    description="json (lista de objetos) o columnar (columns + rows como arrays)"
+)
+
+
+def negotiate_export_format(http_request: Request) -> Optional[ExportFormat]:
+    """
+    Detecta si el cliente pidió Arrow o Parquet en el header Accept.
+
+    Args:
+        http_request: Request HTTP
+
+    Returns:
+        ExportFormat negociado, o None para la respuesta JSON habitual
+    """
+    accept = http_request.headers.get("accept", "")
+    for media_range in accept.split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in NEGOTIATED_FORMATS:
+            return NEGOTIATED_FORMATS[media_type]
+    return None
+
+
+def _check_export_format(export_format: ExportFormat):
+    """Rechaza Arrow/Parquet si pyarrow no está instalado"""
+    if export_format in (ExportFormat.ARROW, ExportFormat.PARQUET) and not arrow_available():
+        raise HTTPException(
+            status_code=406,
+            detail="Formato no disponible: pyarrow no está instalado en el servidor"
+        )
+
+
+async def _export_query(
+    request: QueryRequest,
+    export_format: ExportFormat,
+    service: QueryService
+) -> StreamingResponse:
+    """Abre el stream de una query y lo envuelve en un StreamingResponse"""
+    _check_export_format(export_format)
+
+    try:
+        chunks = await service.stream_custom_query(
+            query=request.query,
+            params=request.params,
+            export_format=export_format
+        )
+
+    except ValueError as e:
+        logger.warning(f"Validación fallida en exportación de query: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error en exportación de query: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error ejecutando query: {str(e)}"
+        )
+
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=export_headers(f"query.{export_format.value}")
+    )
 
-@router.post("/execute", response_model=QueryResponse)
+
+async def _export_abends(
+    region: Optional[Union[str, List[str]]],
+    program: Optional[str],
+    limit: int,
+    export_format: ExportFormat,
+    service: QueryService
+) -> StreamingResponse:
+    """Abre el stream de abends y lo envuelve en un StreamingResponse"""
+    _check_export_format(export_format)
+
+    try:
+        chunks = await service.stream_abends(
+            region=region,
+            program=program,
+            limit=limit,
+            export_format=export_format
+        )
+
+    except ValueError as e:
+        logger.warning(f"Validación fallida en exportación de abends: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error en exportación de abends: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error exportando abends: {str(e)}"
+        )
+
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=export_headers(f"abends.{export_format.value}")
+    )
+
+
+def abends_validators(
+    result: Union[AbendsResponse, ColumnarAbendsResponse]
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Validadores HTTP baratos de una página de abends.
+
+    El ETag se calcula con el número de registros, el primero y el último
+    (el más reciente y el más antiguo) y los cursores, sin serializar la
+    página completa. Last-Modified es el TIMESTAMP más reciente.
+
+    Args:
+        result: AbendsResponse o ColumnarAbendsResponse
+
+    Returns:
+        Tupla (ETag, Last-Modified o None)
+    """
+    if isinstance(result, ColumnarAbendsResponse):
+        rows = result.rows
+        columns = [column.upper() for column in result.columns]
+        ts_index = columns.index("TIMESTAMP") if "TIMESTAMP" in columns else None
+        newest = rows[0][ts_index] if rows and ts_index is not None else None
+        shape = "columnar"
+    else:
+        rows = result.abends
+        newest = rows[0].get("TIMESTAMP") if rows else None
+        shape = "json"
+
+    etag = weak_etag(
+        shape,
+        result.total,
+        rows[0] if rows else None,
+        rows[-1] if rows else None,
+        result.next_cursor,
+        result.prev_cursor
+    )
+    return etag, newest if isinstance(newest, datetime) else None
+
+
+@router.post(
+    "/execute",
+    response_model=Union[QueryResponse, ColumnarQueryResponse],
+    response_class=FastJSONResponse
+)
 async def execute_query(
     request: QueryRequest,
+    http_request: Request,
+    response_format: ResponseFormat = RESPONSE_FORMAT_QUERY,
     service: QueryService = Depends(get_query_service)
 ):
     """
@@ -29,26 +231,58 @@ async def execute_query(
     - No se permiten queries DDL (DROP, CREATE, ALTER, etc.)
     - Solo queries de lectura (SELECT)
 
+    Con `fetch_all=false` retorna la primera página de `page_size` registros
+    y un `continuation_token` para leer las siguientes con
+    POST /query/execute/continue sin volver a ejecutar la query.
+
+    Con `?format=columnar` retorna los nombres de columnas una sola vez y
+    los registros como arrays. Con `Accept: application/vnd.apache.arrow.stream`
+    o `Accept: application/vnd.apache.parquet` transmite el resultado
+    completo en Arrow IPC o Parquet.
+
     Args:
         request: QueryRequest con la query y parámetros
+        response_format: json o columnar
 
     Returns:
-        QueryResponse con los resultados
+        QueryResponse (o ColumnarQueryResponse) con los resultados
 
     Raises:
         HTTPException: Si hay error ejecutando la query
     """
+    export_format = negotiate_export_format(http_request)
+    if export_format is not None:
+        return await _export_query(request, export_format, service)
+
     try:
         logger.info(f"Endpoint /query/execute - query: {request.query[:100]}...")
 
+        if response_format == ResponseFormat.COLUMNAR:
+            result = await service.execute_custom_query_columnar(
+                query=request.query,
+                params=request.params,
+                fetch_all=request.fetch_all,
+                page_size=request.page_size
+            )
+            return FastJSONResponse(result)
+
         result = await service.execute_custom_query(
             query=request.query,
             params=request.params,
-            fetch_all=request.fetch_all
+            fetch_all=request.fetch_all,
+            page_size=request.page_size
         )
 
-        return result
+        # Se retorna la respuesta ya serializada para que FastAPI no
+        # revalide cada registro contra response_model
+        return FastJSONResponse(result)
 
+    except CursorLimitError as e:
+        logger.warning(f"Paginación rechazada en /query/execute: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e)
+        )
     except ValueError as e:
         # Error de validación
         logger.warning(f"Validación fallida en /query/execute: {e}")
@@ -64,9 +298,123 @@ async def execute_query(
         )
 
 
-@router.post("/abends", response_model=AbendsResponse)
+@router.post(
+    "/execute/continue",
+    response_model=Union[QueryResponse, ColumnarQueryResponse],
+    response_class=FastJSONResponse
+)
+async def continue_query(
+    request: ContinueQueryRequest,
+    response_format: ResponseFormat = RESPONSE_FORMAT_QUERY,
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Lee la siguiente página de una query ejecutada con `fetch_all=false`.
+
+    El cursor sigue abierto en el servidor mientras quedan registros; se
+    cierra al leer la última página (continuation_token nulo) o tras
+    `CURSOR_TTL_SECONDS` sin actividad.
+
+    Args:
+        request: ContinueQueryRequest con el token y el tamaño de página
+        response_format: json o columnar
+
+    Returns:
+        QueryResponse (o ColumnarQueryResponse) con la página
+
+    Raises:
+        HTTPException: 404 si el token no existe o expiró
+    """
+    try:
+        if response_format == ResponseFormat.COLUMNAR:
+            result = await service.continue_query_columnar(
+                request.continuation_token,
+                page_size=request.page_size
+            )
+        else:
+            result = await service.continue_query(
+                request.continuation_token,
+                page_size=request.page_size
+            )
+
+        return FastJSONResponse(result)
+
+    except CursorNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error en /query/execute/continue: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error leyendo página: {str(e)}"
+        )
+
+
+@router.delete("/execute/cursors/{continuation_token}", status_code=204)
+async def close_cursor(
+    continuation_token: str,
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Cierra una query paginada sin leer el resto de sus páginas.
+
+    Libera la conexión que retiene el cursor.
+
+    Args:
+        continuation_token: Token de la última respuesta
+
+    Raises:
+        HTTPException: 404 si el token no existe o expiró
+    """
+    if not await service.close_cursor(continuation_token):
+        raise HTTPException(
+            status_code=404,
+            detail="Token de continuación inválido o expirado"
+        )
+
+    return Response(status_code=204)
+
+
+@router.post("/execute/export")
+async def export_query(
+    request: QueryRequest,
+    export_format: ExportFormat = EXPORT_FORMAT_QUERY,
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Ejecuta una query SQL y transmite los resultados en streaming.
+
+    Los registros se leen por lotes (fetchmany) y se escriben a medida que
+    llegan, por lo que la memoria usada no depende del número de registros.
+    `fetch_all` se ignora: siempre se transmite el resultado completo.
+
+    Args:
+        request: QueryRequest con la query y parámetros
+        export_format: ndjson (un objeto JSON por línea), csv, arrow
+            (Arrow IPC stream) o parquet
+
+    Returns:
+        StreamingResponse con los registros
+
+    Raises:
+        HTTPException: Si hay error ejecutando la query
+    """
+    logger.info(f"Endpoint /query/execute/export - query: {request.query[:100]}...")
+
+    return await _export_query(request, export_format, service)
+
+
+@router.post(
+    "/abends",
+    response_model=Union[AbendsResponse, ColumnarAbendsResponse],
+    response_class=FastJSONResponse
+)
 async def get_abends(
     request: AbendsFilterRequest,
+    http_request: Request,
+    response_format: ResponseFormat = RESPONSE_FORMAT_QUERY,
     service: QueryService = Depends(get_query_service)
 ):
     """
@@ -74,24 +422,49 @@ async def get_abends(
 
     Args:
         request: AbendsFilterRequest con filtros
+        response_format: json o columnar
 
     Returns:
-        AbendsResponse con los abends encontrados
+        AbendsResponse (o ColumnarAbendsResponse) con los abends encontrados
 
     Raises:
         HTTPException: Si hay error obteniendo abends
     """
+    export_format = negotiate_export_format(http_request)
+    if export_format is not None:
+        return await _export_abends(
+            request.region, request.program, request.limit, export_format, service
+        )
+
     try:
         logger.info(f"Endpoint /query/abends - filtros: {request.dict()}")
 
+        if response_format == ResponseFormat.COLUMNAR:
+            result = await service.get_abends_columnar(
+                region=request.region,
+                program=request.program,
+                limit=request.limit,
+                after=request.after,
+                before=request.before
+            )
+            return FastJSONResponse(result)
+
         result = await service.get_abends(
             region=request.region,
             program=request.program,
-            limit=request.limit
+            limit=request.limit,
+            after=request.after,
+            before=request.before
         )
 
-        return result
+        return FastJSONResponse(result)
 
+    except ValueError as e:
+        logger.warning(f"Paginación inválida en /query/abends: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error en /query/abends: {e}")
         raise HTTPException(
@@ -100,38 +473,94 @@ async def get_abends(
         )
 
 
-@router.get("/abends", response_model=AbendsResponse)
+@router.get(
+    "/abends",
+    response_model=Union[AbendsResponse, ColumnarAbendsResponse],
+    response_class=FastJSONResponse
+)
 async def get_abends_by_params(
-    region: str = Query(None, description="Región CICS"),
+    http_request: Request,
+    region: Optional[List[str]] = Query(
+        None,
+        description="Región CICS; repetida o separada por comas para varias regiones"
+    ),
     program: str = Query(None, description="Nombre del programa"),
     limit: int = Query(100, description="Límite de registros", ge=1, le=1000),
+    after: Optional[str] = Query(None, description="next_cursor: página de abends más antiguos"),
+    before: Optional[str] = Query(None, description="prev_cursor: página de abends más recientes"),
+    response_format: ResponseFormat = RESPONSE_FORMAT_QUERY,
     service: QueryService = Depends(get_query_service)
 ):
     """
     Obtiene abends de CICS PA con query parameters.
 
+    Paginación keyset: para seguir hacia abends más antiguos se pasa el
+    `next_cursor` de la respuesta como `after`; hacia más recientes, el
+    `prev_cursor` como `before`. Cada página cuesta lo mismo que la primera.
+
+    Con varias regiones (`region=PROD01&region=PROD02` o
+    `region=PROD01,PROD02`) se lanza una query por región en paralelo y los
+    resultados se mezclan por TIMESTAMP; la latencia es la de una query.
+
+    Soporta requests condicionales: la respuesta lleva `ETag` y
+    `Last-Modified`, y con `If-None-Match` se responde 304 si no cambió.
+
     Args:
-        region: Región CICS (opcional)
+        region: Región o regiones CICS (opcional)
         program: Nombre del programa (opcional)
         limit: Límite de registros (1-1000)
+        after: Cursor next_cursor de la respuesta anterior
+        before: Cursor prev_cursor de la respuesta anterior
+        response_format: json o columnar
 
     Returns:
-        AbendsResponse con los abends encontrados
+        AbendsResponse (o ColumnarAbendsResponse) con los abends encontrados
 
     Raises:
         HTTPException: Si hay error obteniendo abends
     """
+    export_format = negotiate_export_format(http_request)
+    if export_format is not None:
+        return await _export_abends(region, program, limit, export_format, service)
+
     try:
         logger.info(f"Endpoint GET /query/abends - region={region}, program={program}, limit={limit}")
 
-        result = await service.get_abends(
-            region=region,
-            program=program,
-            limit=limit
+        if response_format == ResponseFormat.COLUMNAR:
+            result = await service.get_abends_columnar(
+                region=region,
+                program=program,
+                limit=limit,
+                after=after,
+                before=before
+            )
+        else:
+            result = await service.get_abends(
+                region=region,
+                program=program,
+                limit=limit,
+                after=after,
+                before=before
+            )
+
+        # Los dashboards hacen polling: si la página no cambió se responde
+        # 304 sin serializar ni enviar el cuerpo
+        etag, last_modified = abends_validators(result)
+        return conditional_response(
+            http_request,
+            result,
+            etag,
+            last_modified,
+            max_age=get_settings().http_cache_max_age,
+            vary="Accept"
         )
 
-        return result
-
+    except ValueError as e:
+        logger.warning(f"Paginación inválida en GET /query/abends: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error en GET /query/abends: {e}")
         raise HTTPException(
@@ -140,14 +569,57 @@ async def get_abends_by_params(
         )
 
 
-@router.get("/abends/summary")
+@router.get("/abends/export")
+async def export_abends(
+    region: str = Query(None, description="Región CICS"),
+    program: str = Query(None, description="Nombre del programa"),
+    limit: int = Query(10000, description="Límite de registros", ge=1, le=1000000),
+    export_format: ExportFormat = EXPORT_FORMAT_QUERY,
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Exporta abends de CICS PA en streaming.
+
+    Permite límites mucho mayores que GET /query/abends porque los
+    registros se transmiten por lotes sin acumularse en memoria.
+
+    Args:
+        region: Región CICS (opcional)
+        program: Nombre del programa (opcional)
+        limit: Límite de registros (1-1000000)
+        export_format: ndjson, csv, arrow o parquet
+
+    Returns:
+        StreamingResponse con los abends
+
+    Raises:
+        HTTPException: Si hay error obteniendo abends
+    """
+    logger.info(
+        f"Endpoint GET /query/abends/export - region={region}, "
+        f"program={program}, limit={limit}, format={export_format.value}"
+    )
+
+    return await _export_abends(region, program, limit, export_format, service)
+
+
+@router.get("/abends/summary", response_class=FastJSONResponse)
 async def get_abends_summary(
+    http_request: Request,
     region: str = Query(None, description="Región CICS"),
-    limit: int = Query(1000, description="Límite de registros a analizar", ge=1, le=10000),
+    hours: int = Query(
+        None,
+        description="Ventana en horas hacia atrás (por defecto ABEND_SUMMARY_HOURS)",
+        ge=1,
+        le=24 * 90
+    ),
     service: QueryService = Depends(get_query_service)
 ):
     """
-    Obtiene resumen estadístico de abends.
+    Obtiene resumen estadístico de abends de una ventana de tiempo.
+
+    Los conteos se agregan en DVM con GROUP BY sobre todos los abends de
+    la ventana, no sobre una muestra de registros.
 
     Proporciona:
     - Total de abends
@@ -156,9 +628,11 @@ async def get_abends_summary(
     - Top 10 códigos de abend más frecuentes
     - Totales únicos
 
+    Responde 304 a `If-None-Match` si el resumen no cambió.
+
     Args:
         region: Región CICS (opcional)
-        limit: Límite de registros a analizar
+        hours: Ventana en horas (opcional)
 
     Returns:
         Diccionario con estadísticas
@@ -167,17 +641,23 @@ async def get_abends_summary(
         HTTPException: Si hay error generando resumen
     """
     try:
-        logger.info(f"Endpoint /query/abends/summary - region={region}, limit={limit}")
+        logger.info(f"Endpoint /query/abends/summary - region={region}, hours={hours}")
 
         result = await service.get_abends_summary(
             region=region,
-            limit=limit
+            hours=hours
         )
 
-        return {
-            "success": True,
-            "summary": result
-        }
+        # El resumen es pequeño: su contenido completo sirve de validador
+        return conditional_response(
+            http_request,
+            {
+                "success": True,
+                "summary": result
+            },
+            weak_etag(result),
+            max_age=get_settings().http_cache_max_age
+        )
 
     except Exception as e:
         logger.error(f"Error en /query/abends/summary: {e}")
@@ -185,3 +665,308 @@ async def get_abends_summary(
             status_code=500,
             detail=f"Error generando resumen: {str(e)}"
         )
+
+
+@router.get(
+    "/abends/timeseries",
+    response_model=TimeseriesResponse,
+    response_class=FastJSONResponse
+)
+async def get_abends_timeseries(
+    http_request: Request,
+    bucket_seconds: int = Query(
+        3600,
+        description="Tamaño de cada intervalo en segundos (60 = por minuto, 3600 = por hora)",
+        ge=60,
+        le=7 * 24 * 3600
+    ),
+    start: Optional[datetime] = Query(None, description="Inicio del rango (por defecto end - 24h)"),
+    end: Optional[datetime] = Query(None, description="Fin del rango (por defecto ahora)"),
+    group_by: TimeseriesGroupBy = Query(
+        TimeseriesGroupBy.NONE,
+        description="Separar series por region, program o abend_code"
+    ),
+    region: str = Query(None, description="Región CICS"),
+    max_series: int = Query(10, description="Series máximas; el resto se suma en OTHER", ge=1, le=100),
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Obtiene abends por intervalo de tiempo para gráficos.
+
+    Las series son densas: un conteo por intervalo, con 0 en los
+    intervalos sin abends. Los tiempos son UTC y el rango se alinea a
+    múltiplos de `bucket_seconds`. Responde 304 a `If-None-Match` si la
+    serie no cambió.
+
+    Args:
+        bucket_seconds: Tamaño de cada intervalo
+        start: Inicio del rango (opcional)
+        end: Fin del rango (opcional)
+        group_by: Dimensión de las series
+        region: Región CICS (opcional)
+        max_series: Series máximas
+
+    Returns:
+        TimeseriesResponse
+
+    Raises:
+        HTTPException: 400 si el rango no es válido, 500 si hay error
+    """
+    try:
+        logger.info(
+            f"Endpoint /query/abends/timeseries - bucket={bucket_seconds}s, "
+            f"group_by={group_by.value}, region={region}"
+        )
+
+        result = await service.get_abends_timeseries(
+            bucket_seconds=bucket_seconds,
+            start=start,
+            end=end,
+            group_by=group_by,
+            region=region,
+            max_series=max_series
+        )
+
+        return conditional_response(
+            http_request,
+            result,
+            weak_etag(result.start, result.end, result.series),
+            max_age=get_settings().http_cache_max_age
+        )
+
+    except ValueError as e:
+        logger.warning(f"Rango inválido en /query/abends/timeseries: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error en /query/abends/timeseries: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generando serie de abends: {str(e)}"
+        )
+
+
+@router.get(
+    "/abends/top",
+    response_model=TopAbendsResponse,
+    response_class=FastJSONResponse
+)
+async def get_top_abends(
+    http_request: Request,
+    window: TopAbendsWindow = Query(TopAbendsWindow.DAY, description="Ventana: 24h, 7d o 30d"),
+    dimension: TopAbendsDimension = Query(
+        TopAbendsDimension.PROGRAM,
+        description="program, transaction o abend_code"
+    ),
+    region: str = Query(None, description="Región CICS"),
+    k: int = Query(10, description="Elementos a retornar", ge=1, le=100),
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Obtiene el top-K aproximado de programas, transacciones o códigos de
+    abend en las últimas 24 horas, 7 días o 30 días.
+
+    Se calcula en memoria con sketches Space-Saving alimentados por la
+    ingesta incremental, sin consultar DVM. Cada elemento trae su conteo
+    estimado (cota superior) y el error máximo; `guaranteed` indica que
+    pertenece al top-K con certeza. La ventana se alinea a horas (24h) o
+    días (7d, 30d). Responde 304 a `If-None-Match` si no cambió.
+
+    Args:
+        window: Ventana de tiempo
+        dimension: Dimensión del top-K
+        region: Región CICS (opcional)
+        k: Elementos a retornar
+
+    Returns:
+        TopAbendsResponse
+
+    Raises:
+        HTTPException: 503 si la ingesta está desactivada o en backfill
+    """
+    try:
+        logger.info(
+            f"Endpoint /query/abends/top - window={window.value}, "
+            f"dimension={dimension.value}, region={region}, k={k}"
+        )
+
+        result = await service.get_top_abends(
+            window=window,
+            dimension=dimension,
+            region=region,
+            k=k
+        )
+
+        return conditional_response(
+            http_request,
+            result,
+            weak_etag(result.end, result.items),
+            max_age=get_settings().http_cache_max_age
+        )
+
+    except SketchesUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error en /query/abends/top: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generando top de abends: {str(e)}"
+        )
+
+
+@router.get(
+    "/abends/distinct",
+    response_model=DistinctCountsResponse,
+    response_class=FastJSONResponse
+)
+async def get_abends_distinct(
+    http_request: Request,
+    hours: int = Query(
+        None,
+        description="Ventana en horas hacia atrás (por defecto ABEND_SUMMARY_HOURS)",
+        ge=1,
+        le=24 * 30
+    ),
+    region: str = Query(None, description="Región CICS"),
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Obtiene cuántos programas, transacciones, usuarios y terminales
+    distintos tuvieron abends en una ventana de tiempo.
+
+    Los conteos son aproximados (HyperLogLog, error relativo típico en
+    `relative_error`) y se calculan en memoria sin consultar DVM. La
+    ventana se alinea a la hora dentro de las últimas 24 horas y al día
+    fuera de ellas. Responde 304 a `If-None-Match` si no cambió.
+
+    Args:
+        hours: Ventana en horas (opcional)
+        region: Región CICS (opcional)
+
+    Returns:
+        DistinctCountsResponse
+
+    Raises:
+        HTTPException: 503 si la ingesta está desactivada o en backfill
+    """
+    try:
+        logger.info(f"Endpoint /query/abends/distinct - region={region}, hours={hours}")
+
+        result = await service.get_abends_distinct(hours=hours, region=region)
+
+        return conditional_response(
+            http_request,
+            result,
+            weak_etag(result.start, result.end, result.counts),
+            max_age=get_settings().http_cache_max_age
+        )
+
+    except SketchesUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error en /query/abends/distinct: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error contando valores distintos de abends: {str(e)}"
+        )
+
+
+@router.get(
+    "/abends/names",
+    response_model=NameSuggestionsResponse,
+    response_class=FastJSONResponse
+)
+async def suggest_abend_names(
+    http_request: Request,
+    field: NameField = Query(NameField.PROGRAM, description="program o transaction"),
+    q: str = Query("", description="Prefijo o subcadena del nombre", max_length=64),
+    limit: int = Query(20, description="Sugerencias máximas", ge=1, le=100),
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Autocompleta nombres de programa o transacción con abends.
+
+    Primero los nombres que empiezan por `q` y luego los que lo contienen,
+    en orden alfabético. Se responde desde un índice en memoria sin
+    consultar DVM; `complete` es False hasta la primera carga del índice.
+
+    Args:
+        field: Columna a autocompletar
+        q: Texto escrito por el usuario
+        limit: Sugerencias máximas
+
+    Returns:
+        NameSuggestionsResponse
+    """
+    try:
+        result = await service.suggest_names(field=field, q=q, limit=limit)
+
+        return conditional_response(
+            http_request,
+            result,
+            weak_etag(result.field.value, result.query, result.names, result.complete),
+            max_age=get_settings().http_cache_max_age
+        )
+
+    except Exception as e:
+        logger.error(f"Error en /query/abends/names: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error autocompletando nombres: {str(e)}"
+        )
+
+
+@router.get("/abends/stream")
+async def stream_abends(
+    region: str = Query(None, description="Región CICS"),
+    program: str = Query(None, description="Nombre del programa (subcadena)")
+):
+    """
+    Stream en vivo (Server-Sent Events) de los abends nuevos.
+
+    Reemplaza el polling de /query/abends: un único ingestor consulta DVM
+    y reparte los abends nuevos a todos los clientes con sus filtros.
+    Cada evento `abends` contiene `{"columns": [...], "rows": [[...]]}` y su
+    `id` es un cursor utilizable como `before` en GET /query/abends para
+    recuperar lo perdido tras una reconexión. Un evento `overflow` indica
+    que el cliente se desconectó por no consumir a tiempo.
+
+    Args:
+        region: Región CICS (opcional)
+        program: Nombre del programa (opcional)
+
+    Returns:
+        StreamingResponse text/event-stream
+
+    Raises:
+        HTTPException: 503 si la ingesta está desactivada o se alcanzó el
+            máximo de clientes
+    """
+    if not get_abend_ingester().running:
+        raise HTTPException(
+            status_code=503,
+            detail="Stream no disponible: la ingesta de abends está desactivada"
+        )
+
+    broadcaster = get_abend_broadcaster()
+    try:
+        subscriber = broadcaster.subscribe(region, program)
+    except StreamLimitError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    logger.info(
+        f"Endpoint /query/abends/stream - region={region}, program={program}, "
+        f"clientes={broadcaster.clients}"
+    )
+
+    return StreamingResponse(
+        broadcaster.events(subscriber),
+        media_type=SSE_MEDIA_TYPE,
+        headers={
+            "Cache-Control": "no-cache",
+            # Evita que nginx acumule el stream en su buffer
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from ..models import TableInfoRequest, TableInfoResponse
 from ..services import get_query_service, QueryService
+from ..database import TableNotFoundError
 from ..core import get_logger
 
 logger = get_logger(__name__)
@@ -27,7 +28,7 @@ async def get_table_info(
         TableInfoResponse con columnas y metadata
 
     Raises:
-        HTTPException: Si hay error obteniendo la información
+        HTTPException: 404 si la tabla no existe, 500 si hay error
     """
     try:
         logger.info(f"Endpoint /tables/info - tabla: {request.table_name}")
@@ -36,6 +37,11 @@ async def get_table_info(
 
         return result
 
+    except TableNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error en /tables/info: {e}")
         raise HTTPException(
@@ -59,7 +65,7 @@ async def get_table_info_by_path(
         TableInfoResponse con columnas y metadata
 
     Raises:
-        HTTPException: Si hay error obteniendo la información
+        HTTPException: 404 si la tabla no existe, 500 si hay error
     """
     try:
         logger.info(f"Endpoint GET /tables/info/{table_name}")
@@ -68,9 +74,49 @@ async def get_table_info_by_path(
 
         return result
 
+    except TableNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error en GET /tables/info/{table_name}: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Error obteniendo información de tabla: {str(e)}"
         )
+
+
+@router.delete("/info/{table_name}")
+async def invalidate_table_info(
+    table_name: str,
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Descarta la metadata cacheada de una tabla.
+
+    La próxima consulta la vuelve a leer del catálogo ODBC (útil tras
+    modificar una vista virtual en DVM).
+
+    Args:
+        table_name: Nombre de la tabla
+
+    Returns:
+        Número de entradas descartadas
+    """
+    invalidated = await service.invalidate_table_info(table_name)
+    return {"success": True, "invalidated": invalidated}
+
+
+@router.delete("/info")
+async def invalidate_all_table_info(
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    Descarta la metadata cacheada de todas las tablas.
+
+    Returns:
+        Número de entradas descartadas
+    """
+    invalidated = await service.invalidate_table_info()
+    return {"success": True, "invalidated": invalidated}
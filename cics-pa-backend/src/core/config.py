@@ -2,6 +2,7 @@
 Configuración centralizada de la aplicación.
 Usa variables de entorno con valores por defecto.
 """
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from typing import Optional
 from functools import lru_cache
@@ -30,7 +31,37 @@ class Settings(BaseSettings):
     # Database Pool Settings
     pool_size: int = 5
     max_overflow: int = 10
-    pool_recycle: int = 3600  # 1 hora
+    pool_recycle: int = 3600  # 1 hora (0 desactiva el reciclado)
+    pool_timeout: int = 10  # Espera máxima por una conexión libre
+    pool_overflow_idle_timeout: int = 60  # Cierre de conexiones de overflow ociosas
+    pool_validation_idle_seconds: int = 30  # Validar solo conexiones ociosas más de esto
+    pool_reaper_interval: int = 15  # Intervalo del reaper (0 lo desactiva)
+    pool_min_size: int = 1  # Conexiones mínimas para considerar el pool listo
+    pool_lazy_init: bool = False  # Calentar el pool en segundo plano
+    pool_leak_detection_threshold: int = 120  # Log del stack de checkouts retenidos (0 lo desactiva)
+
+    # ODBC Executor Settings
+    db_executor_workers: Optional[int] = None  # Por defecto pool_size + max_overflow
+
+    # Streaming Settings
+    stream_batch_size: int = 1000  # Registros por fetchmany en exportaciones
+
+    # Server-side Cursor Settings
+    cursor_ttl_seconds: int = 120  # Cierre de cursores paginados sin actividad
+    max_open_cursors: Optional[int] = None  # Por defecto la mitad de pool_size
+
+    # Table Metadata Settings
+    table_metadata_ttl_seconds: int = 3600  # Columnas leídas del catálogo ODBC
+    table_metadata_negative_ttl_seconds: int = 60  # Tablas inexistentes
+
+    # Result Cache Settings
+    cache_enabled: bool = True
+    cache_ttl_seconds: float = 15  # Vigencia de los resultados de abends
+    cache_max_bytes: int = 67108864  # 64MB (tamaño estimado de los resultados)
+    http_cache_max_age: int = 0  # Cache-Control max-age de abends (0 = revalidar con ETag)
+    watermark_probe_interval: float = 30  # Sonda MAX(TIMESTAMP)/COUNT(*) por región (0 la desactiva)
+    watermark_probe_window_hours: float = 24  # Rango reciente de TIMESTAMP que cuenta la sonda
+    cache_watermark_ttl_seconds: float = 3600  # Vigencia máxima con la sonda activa
 
     # Logging Settings
     log_level: str = "INFO"
@@ -41,6 +72,43 @@ class Settings(BaseSettings):
     # CICS PA Specific
     default_cics_region: Optional[str] = None
     abend_table_name: str = "CICS_ABENDS"
+    # Columnas de orden y desempate para la paginación keyset de abends; la
+    # última debe ser única por abend (número de tarea o id de registro)
+    abend_keyset_columns: str = "TIMESTAMP,CICS_REGION,TRANSACTION_ID"
+    abend_fanout_max_regions: int = 16  # Regiones por request de /query/abends (una query por región)
+    abend_summary_hours: int = 24  # Ventana por defecto de /query/abends/summary
+    # Resumen en una sola query GROUPING SETS (si DVM la soporta) en vez de una por dimensión
+    abend_summary_grouping_sets: bool = False
+    # Agregados de abends en memoria mantenidos por sondeo incremental
+    abend_ingest_interval: float = 10  # Segundos entre sondeos (0 desactiva la ingesta)
+    abend_ingest_retention_hours: int = 24  # Ventana máxima servida desde los agregados
+    abend_ingest_bucket_seconds: int = 300  # Granularidad de los intervalos
+    abend_ingest_lag_seconds: float = 30  # Margen para abends publicados con retraso
+    abend_ingest_batch_size: int = 5000  # Registros por lote de lectura
+    # Almacén en memoria de abends recientes (lo alimenta el ingestor)
+    recent_abends_enabled: bool = False
+    recent_abends_hours: float = 4  # Antigüedad máxima de las filas retenidas
+    recent_abends_max_rows: int = 200000  # Filas máximas retenidas
+    # Stream SSE de abends nuevos (lo alimenta el ingestor)
+    abend_stream_max_clients: int = 200
+    abend_stream_queue_size: int = 100  # Lotes pendientes por cliente antes de desconectarlo
+    abend_stream_heartbeat_seconds: float = 15  # Keepalive para proxies
+    # Top-K aproximado (Space-Saving) de 24h/7d/30d (lo alimenta el ingestor)
+    abend_sketch_capacity: int = 200  # Contadores por sketch (región, intervalo, dimensión)
+    abend_sketch_backfill_days: float = 1  # Historia leída al arrancar (hasta 30)
+    abend_distinct_precision: int = Field(12, ge=11, le=16)  # HyperLogLog: 2^p bytes por sketch, error ~1.04/sqrt(2^p)
+    # Detección de picos de abends (gauges EWMA por región y código, la alimenta el ingestor)
+    abend_anomaly_interval_seconds: int = 60  # Intervalo de conteo
+    abend_anomaly_halflife_minutes: float = 60  # Vida media de la línea base
+    abend_anomaly_warmup: int = 30  # Intervalos antes de emitir puntuaciones
+    abend_anomaly_max_keys: int = 200  # Claves (región, código) exportadas como máximo
+    # Índice local de nombres de programa y transacción (autocompletado y filtros IN)
+    name_index_refresh_seconds: float = 3600  # SELECT DISTINCT periódico (0 desactiva el índice)
+    name_index_max_in: int = 200  # Nombres máximos en un IN; si hay más se usa LIKE
+    # Series temporales: agrupar por intervalo en DVM ({fn TIMESTAMPDIFF}) o con NumPy
+    abend_timeseries_sql_bucketing: bool = True
+    abend_timeseries_max_buckets: int = 2000  # Intervalos máximos por serie
+    abend_timeseries_max_rows: int = 1000000  # Abends máximos leídos al agrupar con NumPy
 
     class Config:
         env_file = ".env"
@@ -92,6 +92,186 @@ db_query_errors_total = Counter(
     ['operation', 'error_type']
 )
 
+db_pool_ready = Gauge(
+    'cics_pa_db_pool_ready',
+    'Indica si el pool ODBC alcanzó el mínimo de conexiones (1) o no (0)'
+)
+
+db_pool_checkout_wait_seconds = Histogram(
+    'cics_pa_db_pool_checkout_wait_seconds',
+    'Tiempo de espera para obtener una conexión del pool',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+db_pool_connection_hold_seconds = Histogram(
+    'cics_pa_db_pool_connection_hold_seconds',
+    'Tiempo que una conexión permanece fuera del pool',
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+db_pool_connections_in_use = Gauge(
+    'cics_pa_db_pool_connections_in_use',
+    'Conexiones del pool actualmente en uso'
+)
+
+db_pool_connections_idle = Gauge(
+    'cics_pa_db_pool_connections_idle',
+    'Conexiones del pool ociosas disponibles'
+)
+
+db_pool_checkout_timeouts_total = Counter(
+    'cics_pa_db_pool_checkout_timeouts_total',
+    'Total de checkouts que agotaron el timeout del pool'
+)
+
+db_open_cursors = Gauge(
+    'cics_pa_db_open_cursors',
+    'Cursores paginados abiertos (cada uno retiene una conexión)'
+)
+
+db_cursors_expired_total = Counter(
+    'cics_pa_db_cursors_expired_total',
+    'Total de cursores paginados cerrados por TTL'
+)
+
+db_executor_queue_depth = Gauge(
+    'cics_pa_db_executor_queue_depth',
+    'Tareas ODBC esperando un thread libre del ejecutor'
+)
+
+db_executor_active_tasks = Gauge(
+    'cics_pa_db_executor_active_tasks',
+    'Tareas ODBC ejecutándose en el pool de threads'
+)
+
+db_executor_wait_seconds = Histogram(
+    'cics_pa_db_executor_wait_seconds',
+    'Tiempo de espera en cola antes de ejecutar una tarea ODBC',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+# ============================================================================
+# Métricas de la caché de resultados
+# ============================================================================
+
+cache_hits_total = Counter(
+    'cics_pa_cache_hits_total',
+    'Total de lecturas servidas desde la caché de resultados',
+    ['cache']
+)
+
+cache_misses_total = Counter(
+    'cics_pa_cache_misses_total',
+    'Total de lecturas que requirieron consultar DVM',
+    ['cache']
+)
+
+cache_coalesced_total = Counter(
+    'cics_pa_cache_coalesced_total',
+    'Total de lecturas que esperaron una consulta idéntica en curso (single-flight)',
+    ['cache']
+)
+
+cache_evictions_total = Counter(
+    'cics_pa_cache_evictions_total',
+    'Total de entradas eliminadas de la caché',
+    ['cache', 'reason']
+)
+
+cache_size_bytes = Gauge(
+    'cics_pa_cache_size_bytes',
+    'Tamaño estimado de la caché de resultados en bytes',
+    ['cache']
+)
+
+cache_entries = Gauge(
+    'cics_pa_cache_entries',
+    'Entradas en la caché de resultados',
+    ['cache']
+)
+
+watermark_probes_total = Counter(
+    'cics_pa_watermark_probes_total',
+    'Total de ejecuciones de la sonda de frescura de abends',
+    ['status']
+)
+
+watermark_region_changes_total = Counter(
+    'cics_pa_watermark_region_changes_total',
+    'Total de cambios de marca de agua detectados por región'
+)
+
+abend_ingest_polls_total = Counter(
+    'cics_pa_abend_ingest_polls_total',
+    'Total de sondeos del ingestor de agregados de abends',
+    ['status']
+)
+
+abend_ingest_rows_total = Counter(
+    'cics_pa_abend_ingest_rows_total',
+    'Total de abends acumulados en los agregados en memoria'
+)
+
+abend_aggregate_keys = Gauge(
+    'cics_pa_abend_aggregate_keys',
+    'Contadores (intervalo, región, programa, código) en los agregados de abends'
+)
+
+abend_sketch_counters = Gauge(
+    'cics_pa_abend_sketch_counters',
+    'Contadores en los sketches de top-K de abends'
+)
+
+abend_distinct_sketches = Gauge(
+    'cics_pa_abend_distinct_sketches',
+    'Sketches HyperLogLog de valores distintos de abends retenidos'
+)
+
+abend_rate = Gauge(
+    'cics_pa_abend_rate',
+    'Abends por segundo en el último intervalo cerrado (abend_code="*" = total de la región)',
+    ['region', 'abend_code']
+)
+
+abend_rate_baseline = Gauge(
+    'cics_pa_abend_rate_baseline',
+    'Línea base EWMA de abends por segundo',
+    ['region', 'abend_code']
+)
+
+abend_anomaly_score = Gauge(
+    'cics_pa_abend_anomaly_score',
+    'Desviaciones del último intervalo respecto de la línea base EWMA',
+    ['region', 'abend_code']
+)
+
+name_index_entries = Gauge(
+    'cics_pa_name_index_entries',
+    'Valores distintos en el índice local de nombres',
+    ['column']
+)
+
+abend_program_filter_total = Counter(
+    'cics_pa_abend_program_filter_total',
+    'Filtros de programa de abends por forma del predicado (in, like)',
+    ['mode']
+)
+
+abend_stream_clients = Gauge(
+    'cics_pa_abend_stream_clients',
+    'Clientes conectados al stream SSE de abends'
+)
+
+abend_stream_events_total = Counter(
+    'cics_pa_abend_stream_events_total',
+    'Total de eventos enviados por el stream SSE de abends'
+)
+
+abend_stream_dropped_total = Counter(
+    'cics_pa_abend_stream_dropped_total',
+    'Total de clientes del stream desconectados por no consumir a tiempo'
+)
+
 # ============================================================================
 # Métricas de negocio - CICS Abends
 # ============================================================================
@@ -127,6 +307,12 @@ application_cpu_usage_percent = Gauge(
     'Uso de CPU de la aplicación en porcentaje'
 )
 
+startup_phase_duration_seconds = Gauge(
+    'cics_pa_startup_phase_duration_seconds',
+    'Duración de cada fase del arranque de la aplicación en segundos',
+    ['phase']
+)
+
 # ============================================================================
 # Métricas de errores
 # ============================================================================
@@ -257,6 +443,17 @@ def record_exception(
     ).inc()
 
 
+def record_startup_phase(phase: str, duration: float) -> None:
+    """
+    Registra la duración de una fase del arranque.
+
+    Args:
+        phase: Nombre de la fase (metrics, pool_warmup, total, etc.)
+        duration: Duración en segundos
+    """
+    startup_phase_duration_seconds.labels(phase=phase).set(duration)
+
+
 def initialize_metrics(app_name: str, version: str) -> None:
     """
     Inicializa las métricas de información de la aplicación.
@@ -293,7 +490,40 @@ __all__ = [
     'db_queries_total',
     'db_connection_errors_total',
     'db_query_errors_total',
+    'db_pool_ready',
+    'db_pool_checkout_wait_seconds',
+    'db_pool_connection_hold_seconds',
+    'db_pool_connections_in_use',
+    'db_pool_connections_idle',
+    'db_pool_checkout_timeouts_total',
+    'db_open_cursors',
+    'db_cursors_expired_total',
+    'db_executor_queue_depth',
+    'db_executor_active_tasks',
+    'db_executor_wait_seconds',
     'record_db_query',
+    # Cache
+    'cache_hits_total',
+    'cache_misses_total',
+    'cache_coalesced_total',
+    'cache_evictions_total',
+    'cache_size_bytes',
+    'cache_entries',
+    'watermark_probes_total',
+    'watermark_region_changes_total',
+    'abend_ingest_polls_total',
+    'abend_ingest_rows_total',
+    'abend_aggregate_keys',
+    'abend_sketch_counters',
+    'abend_distinct_sketches',
+    'abend_rate',
+    'abend_rate_baseline',
+    'abend_anomaly_score',
+    'name_index_entries',
+    'abend_program_filter_total',
+    'abend_stream_clients',
+    'abend_stream_events_total',
+    'abend_stream_dropped_total',
     # CICS Business
     'cics_abends_total',
     'cics_abends_query_total',
@@ -302,6 +532,8 @@ __all__ = [
     # Application
     'application_memory_usage_bytes',
     'application_cpu_usage_percent',
+    'startup_phase_duration_seconds',
+    'record_startup_phase',
     'application_exceptions_total',
     'record_exception',
 ]
@@ -0,0 +1,187 @@
+"""
+Respuestas JSON de alto rendimiento.
+
+Serializa con orjson, que soporta datetime de forma nativa, sin pasar por
+jsonable_encoder ni revalidar cada registro con Pydantic. Incluye el soporte
+de requests condicionales (ETag / Last-Modified / 304).
+"""
+import hashlib
+from datetime import datetime, timezone
+from decimal import Decimal
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def json_default(value: Any) -> Any:
+    """
+    Convierte los tipos que orjson no serializa de forma nativa.
+
+    Args:
+        value: Valor a convertir
+
+    Returns:
+        Valor serializable
+    """
+    if isinstance(value, Decimal):
+        # Igual que jsonable_encoder: enteros sin decimales, float en otro caso
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, BaseModel):
+        # Copia superficial de los campos: los registros no se revalidan
+        return dict(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode(errors="replace")
+    if hasattr(value, "cursor_description"):
+        # pyodbc.Row: se serializa como array, sin crear un diccionario
+        return tuple(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializa un valor a JSON con orjson.
+
+    Args:
+        content: Valor a serializar (dicts, listas, modelos, Rows, etc.)
+
+    Returns:
+        Bytes JSON
+    """
+    return orjson.dumps(content, default=json_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada con orjson.
+
+    Acepta modelos Pydantic construidos con `model_construct` y los
+    serializa campo a campo, sin validación ni jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def weak_etag(*parts: Any) -> str:
+    """
+    ETag débil a partir de un validador barato del contenido.
+
+    Args:
+        parts: Valores que cambian cuando cambia el contenido (por ejemplo
+            número de registros y primer/último registro)
+
+    Returns:
+        ETag con formato W/"..."
+    """
+    digest = hashlib.blake2b(dumps(parts), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Los TIMESTAMP de DVM no tienen zona: se interpretan como UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Evalúa las precondiciones de una request GET condicional.
+
+    If-None-Match tiene prioridad; If-Modified-Since solo se evalúa si el
+    cliente no envió If-None-Match.
+
+    Args:
+        request: Request HTTP
+        etag: ETag actual del recurso
+        last_modified: Última modificación del recurso (opcional)
+
+    Returns:
+        True si se debe responder 304
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+
+    return False
+
+
+def conditional_response(
+    request: Request,
+    content: Any,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    max_age: int = 0,
+    vary: Optional[str] = None
+) -> Response:
+    """
+    Responde 304 si el cliente ya tiene la versión actual, o el JSON completo.
+
+    El 304 se decide antes de serializar, de modo que un dashboard sin
+    cambios no cuesta ni ancho de banda ni CPU de serialización.
+
+    Args:
+        request: Request HTTP
+        content: Contenido a serializar si hay que enviarlo
+        etag: ETag actual
+        last_modified: Última modificación (opcional)
+        max_age: Segundos que el cliente puede reutilizar la respuesta sin
+            revalidar (0 = revalidar siempre)
+        vary: Valor del header Vary (opcional)
+
+    Returns:
+        Response 304 o FastJSONResponse
+    """
+    headers: Dict[str, str] = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}, must-revalidate",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if vary:
+        headers["Vary"] = vary
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content, headers=headers)
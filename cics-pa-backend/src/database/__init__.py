@@ -1,6 +1,26 @@
 """
 Módulo database - Gestión de conexiones ODBC
 """
-from .manager import ODBCManager, ODBCConnectionPool, get_odbc_manager
+from .manager import (
+    ODBCManager,
+    ODBCConnectionPool,
+    PoolTimeoutError,
+    get_odbc_manager,
+)
+from .executor import ODBCExecutor, get_odbc_executor
+from .cursors import CursorRegistry, CursorNotFoundError, CursorLimitError
+from .catalog import TableCatalog, TableNotFoundError
 
-__all__ = ["ODBCManager", "ODBCConnectionPool", "get_odbc_manager"]
+__all__ = [
+    "ODBCManager",
+    "ODBCConnectionPool",
+    "PoolTimeoutError",
+    "get_odbc_manager",
+    "ODBCExecutor",
+    "get_odbc_executor",
+    "CursorRegistry",
+    "CursorNotFoundError",
+    "CursorLimitError",
+    "TableCatalog",
+    "TableNotFoundError",
+]
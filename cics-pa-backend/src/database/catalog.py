@@ -0,0 +1,227 @@
+"""
+Metadata de tablas desde el catálogo ODBC.
+
+Las columnas se obtienen con `cursor.columns()` (SQLColumns), sin ejecutar
+una query contra la tabla, y se cachean por tabla con TTL. Las tablas
+inexistentes también se cachean (caché negativa) con un TTL más corto.
+"""
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import pyodbc
+
+from ..core import get_logger
+from ..core.metrics import (
+    cache_hits_total,
+    cache_misses_total,
+    cache_evictions_total,
+    cache_entries,
+    record_db_query,
+)
+
+if TYPE_CHECKING:
+    from .manager import ODBCConnectionPool
+
+logger = get_logger(__name__)
+
+CACHE_NAME = "table_metadata"
+
+
+class TableNotFoundError(LookupError):
+    """La tabla no existe en el catálogo ODBC"""
+
+
+class _CatalogEntry:
+    """Columnas de una tabla (o None si no existe) con su expiración"""
+
+    __slots__ = ("columns", "expires_at")
+
+    def __init__(self, columns: Optional[List[Dict[str, Any]]], expires_at: float):
+        self.columns = columns
+        self.expires_at = expires_at
+
+
+class _Loader:
+    """Lock de carga de una tabla con el número de threads que lo usan"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class TableCatalog:
+    """
+    Caché thread-safe de columnas de tablas leídas del catálogo ODBC.
+
+    - `ttl`: vigencia de las columnas de una tabla existente.
+    - `negative_ttl`: vigencia de un "no existe".
+    - Las cargas concurrentes de la misma tabla hacen una sola llamada.
+    """
+
+    def __init__(self, pool: "ODBCConnectionPool", ttl: float, negative_ttl: float):
+        self.pool = pool
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[str, _CatalogEntry] = {}
+        self._loading: Dict[str, _Loader] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(table_name: str) -> str:
+        return table_name.strip().upper()
+
+    def _publish(self):
+        cache_entries.labels(cache=CACHE_NAME).set(len(self._entries))
+
+    def lookup(self, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Columnas cacheadas de una tabla, sin acceder a la base de datos.
+
+        Args:
+            table_name: Nombre de la tabla (opcionalmente SCHEMA.TABLA)
+
+        Returns:
+            Lista de columnas, o None si no está en caché
+
+        Raises:
+            TableNotFoundError: Si está cacheado que la tabla no existe
+        """
+        key = self._key(table_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                cache_evictions_total.labels(cache=CACHE_NAME, reason="expired").inc()
+                self._publish()
+                entry = None
+
+        if entry is None:
+            return None
+
+        cache_hits_total.labels(cache=CACHE_NAME).inc()
+        if entry.columns is None:
+            raise TableNotFoundError(f"Tabla no encontrada: {table_name}")
+        return entry.columns
+
+    def get_columns(self, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Columnas de una tabla, desde la caché o desde el catálogo.
+
+        Args:
+            table_name: Nombre de la tabla (opcionalmente SCHEMA.TABLA)
+
+        Returns:
+            Lista de diccionarios con name, type, size y nullable
+
+        Raises:
+            TableNotFoundError: Si la tabla no existe
+        """
+        columns = self.lookup(table_name)
+        if columns is not None:
+            return columns
+
+        key = self._key(table_name)
+        with self._lock:
+            loader = self._loading.get(key)
+            if loader is None:
+                loader = self._loading[key] = _Loader()
+            loader.users += 1
+
+        try:
+            with loader.lock:
+                # Otra request pudo cargarla mientras se esperaba el lock
+                columns = self.lookup(table_name)
+                if columns is not None:
+                    return columns
+
+                cache_misses_total.labels(cache=CACHE_NAME).inc()
+                columns = self._load(table_name)
+                ttl = self.ttl if columns else self.negative_ttl
+                with self._lock:
+                    self._entries[key] = _CatalogEntry(columns or None, time.monotonic() + ttl)
+                    self._publish()
+        finally:
+            # El lock se descarta solo cuando ningún thread lo espera: uno que
+            # llegara después crearía otro y cargaría en paralelo
+            with self._lock:
+                loader.users -= 1
+                if loader.users == 0:
+                    del self._loading[key]
+
+        if not columns:
+            raise TableNotFoundError(f"Tabla no encontrada: {table_name}")
+        return columns
+
+    def _load(self, table_name: str) -> List[Dict[str, Any]]:
+        """Lee las columnas con SQLColumns"""
+        logger.info(f"Leyendo catálogo de columnas: {table_name}")
+
+        schema, _, table = table_name.strip().rpartition(".")
+        start_time = time.perf_counter()
+
+        with self.pool.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                rows = cursor.columns(table=table, schema=schema or None).fetchall()
+                if not rows and (table != table.upper() or schema != schema.upper()):
+                    # Los catálogos de DVM guardan los nombres en mayúsculas
+                    rows = cursor.columns(
+                        table=table.upper(),
+                        schema=schema.upper() or None
+                    ).fetchall()
+
+            except pyodbc.Error as e:
+                record_db_query(
+                    operation="CATALOG",
+                    table=table.upper(),
+                    duration=time.perf_counter() - start_time,
+                    status="error",
+                    error_type=type(e).__name__
+                )
+                logger.error(f"Error leyendo catálogo de {table_name}: {e}")
+                raise
+            finally:
+                cursor.close()
+
+        record_db_query(
+            operation="CATALOG",
+            table=table.upper(),
+            duration=time.perf_counter() - start_time
+        )
+
+        rows = sorted(rows, key=lambda row: row.ordinal_position or 0)
+        return [
+            {
+                "name": row.column_name,
+                "type": row.type_name,
+                "size": row.column_size if row.column_size else None,
+                # SQL_NO_NULLS = 0; SQL_NULLABLE_UNKNOWN se trata como nullable
+                "nullable": row.nullable != 0
+            }
+            for row in rows
+        ]
+
+    def invalidate(self, table_name: Optional[str] = None) -> int:
+        """
+        Descarta la metadata cacheada de una tabla o de todas.
+
+        Args:
+            table_name: Nombre de la tabla; None para vaciar la caché
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        with self._lock:
+            if table_name is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                removed = 1 if self._entries.pop(self._key(table_name), None) else 0
+            self._publish()
+
+        if removed:
+            cache_evictions_total.labels(cache=CACHE_NAME, reason="invalidated").inc(removed)
+        return removed
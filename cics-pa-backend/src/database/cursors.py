@@ -0,0 +1,279 @@
+"""
+Cursores paginados del lado del servidor.
+
+Mantiene abiertos el cursor y la conexión de una query entre requests para
+que las páginas siguientes se lean del mismo resultado, sin volver a
+ejecutar la query. Cada cursor abierto retiene una conexión del pool, por
+lo que el número de cursores está acotado y los inactivos se cierran por TTL.
+"""
+import secrets
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional
+
+from ..core import get_logger
+from ..core.metrics import db_open_cursors, db_cursors_expired_total
+
+if TYPE_CHECKING:
+    from .manager import ResultStream
+
+logger = get_logger(__name__)
+
+
+class CursorNotFoundError(LookupError):
+    """El token de continuación no existe o su cursor expiró"""
+
+
+class CursorLimitError(Exception):
+    """Se alcanzó el máximo de cursores paginados abiertos"""
+
+
+class CursorPage(NamedTuple):
+    """Página leída de un cursor"""
+    columns: List[str]
+    rows: List[Any]
+    continuation_token: Optional[str]
+
+
+class _OpenCursor:
+    """Cursor abierto con su lock y expiración"""
+
+    __slots__ = ("stream", "lock", "expires_at", "lookahead")
+
+    def __init__(self, stream: "ResultStream", ttl: float):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.expires_at = time.monotonic() + ttl
+        # Registro leído de más para saber si quedan páginas
+        self.lookahead: List[Any] = []
+
+
+class CursorRegistry:
+    """
+    Registro de cursores paginados identificados por un token opaco.
+
+    - Como máximo `max_open` cursores abiertos a la vez (incluidos los que
+      se están abriendo), de modo que la paginación no agote el pool.
+    - Un cursor sin actividad durante `ttl` segundos se cierra y su
+      conexión vuelve al pool.
+    - Si la primera página agota el resultado no se registra ningún cursor.
+    """
+
+    def __init__(self, max_open: int, ttl: float):
+        self.max_open = max_open
+        self.ttl = ttl
+        self._cursors: Dict[str, _OpenCursor] = {}
+        self._opening = 0
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+    @property
+    def open_count(self) -> int:
+        """Cursores registrados"""
+        return len(self._cursors)
+
+    def _publish(self):
+        db_open_cursors.set(len(self._cursors))
+
+    def _reserve(self):
+        """Reserva un hueco para abrir un cursor"""
+        with self._lock:
+            if len(self._cursors) + self._opening >= self.max_open:
+                raise CursorLimitError(
+                    f"Máximo de cursores paginados abiertos alcanzado ({self.max_open})"
+                )
+            self._opening += 1
+
+    def _release(self):
+        with self._lock:
+            self._opening -= 1
+
+    @staticmethod
+    def _read_page(entry: _OpenCursor, page_size: int):
+        """
+        Lee una página y un registro de más para saber si quedan páginas.
+
+        Returns:
+            Tupla (registros de la página, True si quedan registros)
+        """
+        stream = entry.stream
+        rows = entry.lookahead + stream.fetch(page_size + 1 - len(entry.lookahead))
+
+        if len(rows) > page_size:
+            entry.lookahead = rows[page_size:]
+            return rows[:page_size], True
+
+        entry.lookahead = []
+        stream.close()
+        return rows, False
+
+    def open(self, open_stream: Callable[[], "ResultStream"], page_size: int) -> CursorPage:
+        """
+        Ejecuta una query y lee su primera página.
+
+        Args:
+            open_stream: Función que ejecuta la query y retorna el ResultStream
+            page_size: Registros por página
+
+        Returns:
+            CursorPage; continuation_token es None si no quedan registros
+
+        Raises:
+            CursorLimitError: Si ya hay `max_open` cursores abiertos
+        """
+        self._reserve()
+        try:
+            stream = open_stream()
+            entry = _OpenCursor(stream, self.ttl)
+            try:
+                rows, more = self._read_page(entry, page_size)
+            except Exception as e:
+                stream.close(error=e)
+                raise
+        except Exception:
+            self._release()
+            raise
+
+        if not more:
+            self._release()
+            return CursorPage(stream.columns, rows, None)
+
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._opening -= 1
+            self._cursors[token] = entry
+            self._publish()
+
+        self.start_sweeper()
+        logger.info(f"Cursor paginado abierto ({self.open_count}/{self.max_open})")
+        return CursorPage(stream.columns, rows, token)
+
+    def fetch(self, token: str, page_size: int) -> CursorPage:
+        """
+        Lee la siguiente página de un cursor abierto.
+
+        Args:
+            token: Token de continuación
+            page_size: Registros por página
+
+        Returns:
+            CursorPage; continuation_token es None en la última página
+
+        Raises:
+            CursorNotFoundError: Si el token no existe o expiró
+        """
+        with self._lock:
+            entry = self._cursors.get(token)
+        if entry is None:
+            raise CursorNotFoundError("Token de continuación inválido o expirado")
+
+        # pyodbc no permite usar un cursor desde dos threads a la vez
+        with entry.lock:
+            if entry.stream.closed:
+                self._remove(token)
+                raise CursorNotFoundError("Token de continuación inválido o expirado")
+
+            try:
+                rows, more = self._read_page(entry, page_size)
+            except Exception as e:
+                entry.stream.close(error=e)
+                self._remove(token)
+                raise
+
+            entry.expires_at = time.monotonic() + self.ttl
+
+        if not more:
+            self._remove(token)
+            return CursorPage(entry.stream.columns, rows, None)
+        return CursorPage(entry.stream.columns, rows, token)
+
+    def _remove(self, token: str) -> Optional[_OpenCursor]:
+        with self._lock:
+            entry = self._cursors.pop(token, None)
+            self._publish()
+        return entry
+
+    def close(self, token: str) -> bool:
+        """
+        Cierra un cursor y devuelve su conexión al pool.
+
+        Args:
+            token: Token de continuación
+
+        Returns:
+            True si el cursor existía
+        """
+        entry = self._remove(token)
+        if entry is None:
+            return False
+
+        with entry.lock:
+            entry.stream.close()
+        return True
+
+    def sweep(self) -> int:
+        """
+        Cierra los cursores sin actividad durante más de `ttl` segundos.
+
+        Los cursores que están leyendo una página se omiten.
+
+        Returns:
+            Número de cursores cerrados
+        """
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for token, entry in list(self._cursors.items()):
+                if entry.expires_at <= now and entry.lock.acquire(blocking=False):
+                    del self._cursors[token]
+                    expired.append(entry)
+            self._publish()
+
+        for entry in expired:
+            try:
+                entry.stream.close()
+            finally:
+                entry.lock.release()
+            db_cursors_expired_total.inc()
+
+        if expired:
+            logger.info(f"Cursores paginados expirados: {len(expired)}")
+        return len(expired)
+
+    def close_all(self):
+        """Cierra todos los cursores y detiene el sweeper"""
+        self.stop_sweeper()
+        with self._lock:
+            tokens = list(self._cursors)
+        for token in tokens:
+            self.close(token)
+
+    def start_sweeper(self):
+        """Arranca el thread que cierra los cursores expirados"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+
+        self._sweeper_stop.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweeper_loop,
+            name="odbc-cursor-sweeper",
+            daemon=True
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Detiene el thread sweeper"""
+        self._sweeper_stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1)
+            self._sweeper = None
+
+    def _sweeper_loop(self):
+        """Revisa los cursores varias veces por TTL"""
+        interval = max(1.0, self.ttl / 4)
+        while not self._sweeper_stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Error en el sweeper de cursores: {e}")
@@ -0,0 +1,151 @@
+"""
+Capa de ejecución asíncrona para operaciones ODBC.
+Ejecuta las llamadas bloqueantes de pyodbc en un pool de threads dedicado
+para no bloquear el event loop de FastAPI.
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from ..core import get_settings, get_logger
+from ..core.metrics import (
+    db_executor_queue_depth,
+    db_executor_active_tasks,
+    db_executor_wait_seconds,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class ODBCExecutor:
+    """
+    Ejecutor acotado para trabajo ODBC.
+
+    El número de workers se alinea con el máximo de conexiones del pool
+    (POOL_SIZE + MAX_OVERFLOW): menos threads dejarían sin usar el overflow
+    en los picos y más solo generarían espera dentro del pool.
+    Publica la profundidad de la cola y el tiempo de espera de cada tarea.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Crea el ThreadPoolExecutor de forma perezosa"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    logger.info(f"Inicializando ejecutor ODBC (workers: {self.max_workers})")
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="odbc-worker"
+                    )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Número de tareas esperando un worker libre"""
+        return self._queued
+
+    @property
+    def active_tasks(self) -> int:
+        """Número de tareas ejecutándose en este momento"""
+        return self._active
+
+    def _wrap(self, func: Callable[..., T], submitted_at: float) -> Callable[[], T]:
+        """Envuelve la función para medir la espera en cola"""
+
+        def runner() -> T:
+            wait = time.perf_counter() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                db_executor_queue_depth.set(self._queued)
+                db_executor_active_tasks.set(self._active)
+            db_executor_wait_seconds.observe(wait)
+
+            try:
+                return func()
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    db_executor_active_tasks.set(self._active)
+
+        return runner
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Ejecuta una función bloqueante en el pool de threads ODBC.
+
+        Args:
+            func: Función síncrona a ejecutar
+            *args: Argumentos posicionales
+            **kwargs: Argumentos con nombre
+
+        Returns:
+            El resultado de la función
+        """
+        call = functools.partial(func, *args, **kwargs)
+
+        with self._lock:
+            self._queued += 1
+            db_executor_queue_depth.set(self._queued)
+
+        try:
+            future = self._get_executor().submit(
+                self._wrap(call, time.perf_counter())
+            )
+        except RuntimeError:
+            # El ejecutor se cerró antes de aceptar la tarea
+            self._dequeue()
+            raise
+
+        # Si la tarea se cancela antes de empezar nunca sale de la cola
+        future.add_done_callback(
+            lambda f: self._dequeue() if f.cancelled() else None
+        )
+        return await asyncio.wrap_future(future)
+
+    def _dequeue(self):
+        """Descuenta una tarea que salió de la cola sin ejecutarse"""
+        with self._lock:
+            self._queued -= 1
+            db_executor_queue_depth.set(self._queued)
+
+    def shutdown(self, wait: bool = True):
+        """Detiene el pool de threads"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            logger.info("Cerrando ejecutor ODBC")
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Instancia global (singleton)
+_odbc_executor: Optional[ODBCExecutor] = None
+
+
+def get_odbc_executor() -> ODBCExecutor:
+    """
+    Obtiene la instancia global del ODBCExecutor.
+    Si no se configura, usa tantos workers como conexiones puede abrir el
+    pool (POOL_SIZE + MAX_OVERFLOW).
+    """
+    global _odbc_executor
+
+    if _odbc_executor is None:
+        settings = get_settings()
+        workers = settings.db_executor_workers or settings.pool_size + settings.max_overflow
+        _odbc_executor = ODBCExecutor(max_workers=workers)
+
+    return _odbc_executor
@@ -0,0 +1,159 @@
+"""
+Paginación keyset (por cursor) sobre columnas ordenadas.
+
+Un cursor codifica los valores de las columnas de orden del último (o
+primer) registro de una página. La página siguiente se pide con un
+predicado de rango sobre esas columnas, que usa el índice en lugar de
+saltar los registros ya vistos como haría un OFFSET.
+"""
+import base64
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, List, Sequence, Tuple
+
+import orjson
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class InvalidCursorError(ValueError):
+    """El cursor de paginación no es válido para la consulta actual"""
+
+
+def parse_keyset_columns(value: str) -> List[str]:
+    """
+    Parsea la lista de columnas de orden separadas por comas.
+
+    Args:
+        value: Por ejemplo "TIMESTAMP,CICS_REGION,TRANSACTION_ID"
+
+    Returns:
+        Lista de nombres de columna
+
+    Raises:
+        ValueError: Si algún nombre no es un identificador SQL válido
+    """
+    columns = [column.strip() for column in value.split(",") if column.strip()]
+    if not columns:
+        raise ValueError("Se requiere al menos una columna de orden")
+    for column in columns:
+        if not _IDENTIFIER.match(column):
+            raise ValueError(f"Nombre de columna inválido: {column}")
+    return columns
+
+
+def ends_in_unique_column(columns: Sequence[str], non_unique: Iterable[str]) -> bool:
+    """
+    Indica si la última columna de orden puede desempatar registros.
+
+    El predicado de keyset es estricto: si la tupla de orden no es única,
+    los registros que comparten todos sus valores y quedan a ambos lados
+    del corte de una página se saltan.
+
+    Args:
+        columns: Columnas de orden
+        non_unique: Columnas que se sabe que no identifican un registro
+
+    Returns:
+        False si la última columna es una de `non_unique`
+    """
+    return columns[-1].upper() not in {column.upper() for column in non_unique}
+
+
+def _encode_value(value: Any) -> Any:
+    """Etiqueta los tipos que JSON no preserva"""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "n" in value:
+            return Decimal(value["n"])
+        raise ValueError(f"Valor de cursor desconocido: {value}")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Codifica los valores de las columnas de orden en un cursor opaco.
+
+    Args:
+        values: Valores en el orden de las columnas de keyset
+
+    Returns:
+        Cursor en base64 url-safe
+    """
+    payload = orjson.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, expected_length: int) -> Tuple[Any, ...]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Args:
+        cursor: Cursor recibido del cliente
+        expected_length: Número de columnas de keyset configuradas
+
+    Returns:
+        Tupla de valores
+
+    Raises:
+        InvalidCursorError: Si el cursor está corrupto o no coincide con las
+            columnas de orden
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != expected_length:
+            raise ValueError("número de valores incorrecto")
+        return tuple(_decode_value(value) for value in values)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Cursor de paginación inválido: {e}") from e
+
+
+def keyset_predicate(
+    columns: Sequence[str],
+    values: Sequence[Any],
+    operator: str
+) -> Tuple[str, List[Any]]:
+    """
+    Construye el predicado de rango (c1, c2, ...) < (v1, v2, ...).
+
+    Se expande como OR de prefijos porque no todos los motores soportan la
+    comparación de tuplas, y se antepone `c1 <= v1` (o `>=`) para que el
+    optimizador pueda usar un rango sobre el índice de la primera columna.
+
+    Args:
+        columns: Columnas de orden
+        values: Valores del cursor
+        operator: "<" para registros posteriores en orden DESC, ">" para
+            anteriores
+
+    Returns:
+        Tupla (SQL del predicado, parámetros)
+    """
+    if operator not in ("<", ">"):
+        raise ValueError(f"Operador de keyset inválido: {operator}")
+
+    branches = []
+    params: List[Any] = []
+    for i, column in enumerate(columns):
+        terms = [f"{prefix} = ?" for prefix in columns[:i]]
+        terms.append(f"{column} {operator} ?")
+        branches.append("(" + " AND ".join(terms) + ")")
+        params.extend(values[:i + 1])
+
+    predicate = f"{columns[0]} {operator}= ? AND ({' OR '.join(branches)})"
+    return predicate, [values[0]] + params
@@ -2,36 +2,187 @@
 Gestor de conexiones ODBC para DVM.
 Maneja el pool de conexiones y la ejecución de queries.
 """
+import heapq
 import pyodbc
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional, Sequence, Tuple, Union
 from contextlib import contextmanager
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
 import threading
-from queue import Queue, Empty
+import traceback
+from datetime import datetime, timedelta
+from types import FrameType
 
 from ..core import get_settings, get_logger
+from .cursors import CursorRegistry, CursorPage
+from .keyset import ends_in_unique_column, keyset_predicate, parse_keyset_columns
+from .catalog import TableCatalog
+from .recent import RecentAbendStore
+from .names import NameIndex
 from ..core.metrics import (
     db_connections_active,
     db_connections_total,
     db_connection_errors_total,
-    record_db_query
+    db_pool_ready,
+    db_pool_checkout_wait_seconds,
+    db_pool_connection_hold_seconds,
+    db_pool_connections_in_use,
+    db_pool_connections_idle,
+    db_pool_checkout_timeouts_total,
+    abend_program_filter_total,
+    record_db_query,
+    record_startup_phase
 )
 
 logger = get_logger(__name__)
 
 
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión del pool dentro del timeout"""
+
+
+def _caller_frames(limit: int) -> List[Tuple[FrameType, int]]:
+    """
+    Frames de quien hace el checkout con su línea actual, sin formatear.
+
+    Recorrer los frames es barato; leer el código fuente y formatear el
+    stack solo se hace si el checkout se reporta como fuga.
+    """
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < limit:
+        frames.append((frame, frame.f_lineno))
+        frame = frame.f_back
+    return frames
+
+
+class _PooledConnection:
+    """Conexión del pool con su metadata de ciclo de vida"""
+
+    __slots__ = (
+        "connection",
+        "created_at",
+        "last_used",
+        "last_validated",
+        "checked_out_at",
+        "checkout_stack",
+        "leak_reported",
+    )
+
+    def __init__(self, connection: pyodbc.Connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_validated = self.created_at
+        self.checked_out_at = 0.0
+        self.checkout_stack: Optional[List[Tuple[FrameType, int]]] = None
+        self.leak_reported = False
+
+    def idle_since(self) -> float:
+        """Último instante en que se sabe que la conexión funcionaba"""
+        return max(self.last_used, self.last_validated)
+
+
 class ODBCConnectionPool:
     """
-    Pool de conexiones ODBC thread-safe.
-    Reutiliza conexiones para mejor rendimiento.
+    Pool de conexiones ODBC thread-safe y elástico.
+
+    - Mantiene hasta `pool_size` conexiones permanentes.
+    - Bajo picos abre hasta `max_overflow` conexiones adicionales, que se
+      cierran cuando quedan ociosas más de `overflow_idle_timeout` segundos.
+    - Recicla las conexiones con más de `recycle` segundos de vida.
+    - Reutiliza primero la última conexión devuelta (LIFO), de modo que las
+      conexiones frías quedan al fondo y son las primeras en recortarse.
+    - Solo valida al hacer checkout las conexiones ociosas más de
+      `validation_idle_seconds`; un reaper en segundo plano sondea y reemplaza
+      las conexiones ociosas fuera del camino de las requests.
     """
 
-    def __init__(self, pool_size: int = 5):
+    def __init__(
+        self,
+        pool_size: int = 5,
+        max_overflow: Optional[int] = None,
+        recycle: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
         self.settings = get_settings()
         self.pool_size = pool_size
-        self._pool: Queue = Queue(maxsize=pool_size)
+        self.max_overflow = (
+            self.settings.max_overflow if max_overflow is None else max_overflow
+        )
+        self.recycle = self.settings.pool_recycle if recycle is None else recycle
+        self.timeout = self.settings.pool_timeout if timeout is None else timeout
+        self.overflow_idle_timeout = self.settings.pool_overflow_idle_timeout
+        self.validation_idle_seconds = self.settings.pool_validation_idle_seconds
+        self.reaper_interval = self.settings.pool_reaper_interval
+        self.min_size = min(self.settings.pool_min_size, pool_size)
+        self.leak_threshold = self.settings.pool_leak_detection_threshold
+
+        self._idle: deque = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
         self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
         self._initialized = False
+        self._init_lock = threading.Lock()
+        self._warmup: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+
+    @property
+    def max_size(self) -> int:
+        """Número máximo de conexiones abiertas simultáneamente"""
+        return self.pool_size + self.max_overflow
+
+    @property
+    def ready(self) -> bool:
+        """True cuando el pool alcanzó `min_size` conexiones abiertas"""
+        return self._ready.is_set()
+
+    def _add_idle(self, pooled: _PooledConnection, cold: bool = False):
+        """
+        Añade una conexión nueva o sondeada a las ociosas.
+
+        Requiere que su hueco ya esté contado en `_size`.
+
+        Args:
+            pooled: Conexión a añadir
+            cold: Si es True se coloca al fondo (se reutilizará la última)
+        """
+        with self._available:
+            if cold:
+                self._idle.appendleft(pooled)
+            else:
+                self._idle.append(pooled)
+            self._available.notify()
+
+        self._publish_gauges()
+        self._update_ready()
+
+    def _update_ready(self):
+        """Activa el flag de readiness al alcanzar `min_size` conexiones"""
+        if self._ready.is_set():
+            return
+
+        with self._lock:
+            established = len(self._idle) + len(self._in_use)
+
+        if established >= self.min_size:
+            self._ready.set()
+            db_pool_ready.set(1)
+            logger.info(f"Pool ODBC listo ({established} conexiones abiertas)")
+
+    def _publish_gauges(self):
+        """Actualiza los gauges de conexiones en uso y ociosas"""
+        with self._lock:
+            in_use = len(self._in_use)
+            idle = len(self._idle)
+        db_pool_connections_in_use.set(in_use)
+        db_pool_connections_idle.set(idle)
 
     def _create_connection(self) -> pyodbc.Connection:
         """Crea una nueva conexión ODBC"""
@@ -65,26 +216,440 @@ class ODBCConnectionPool:
             logger.error(f"Error al crear conexión ODBC: {e}")
             raise
 
+    @staticmethod
+    def _close_connection(pooled: _PooledConnection):
+        """Cierra una conexión que sale definitivamente del pool"""
+        try:
+            pooled.connection.close()
+        except Exception as e:
+            logger.warning(f"Error cerrando conexión ODBC: {e}")
+        finally:
+            db_connections_active.dec()
+
+    @staticmethod
+    def _ping(connection: pyodbc.Connection) -> bool:
+        """
+        Comprueba que una conexión siga viva.
+
+        Returns:
+            True si la conexión respondió
+        """
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Conexión ODBC inválida: {e}")
+            return False
+
+    def _needs_validation(self, pooled: _PooledConnection, now: float) -> bool:
+        """Indica si la conexión lleva ociosa más del umbral de validación"""
+        return now - pooled.idle_since() >= self.validation_idle_seconds
+
+    def _discard(self, pooled: _PooledConnection):
+        """Retira del pool una conexión rota y libera su hueco"""
+        with self._available:
+            self._size -= 1
+            self._available.notify()
+        self._close_connection(pooled)
+
+    def _is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        """Indica si la conexión superó pool_recycle"""
+        return self.recycle > 0 and now - pooled.created_at >= self.recycle
+
+    def _trim_overflow(self, now: float) -> List[_PooledConnection]:
+        """
+        Retira las conexiones de overflow ociosas (requiere el lock).
+
+        Las más frías están al inicio de la deque por el orden LIFO.
+
+        Returns:
+            Conexiones a cerrar fuera del lock
+        """
+        trimmed = []
+        while (
+            self._size > self.pool_size
+            and self._idle
+            and now - self._idle[0].last_used >= self.overflow_idle_timeout
+        ):
+            trimmed.append(self._idle.popleft())
+            self._size -= 1
+        return trimmed
+
     def initialize(self):
-        """Inicializa el pool con conexiones"""
+        """
+        Inicializa el pool abriendo las conexiones en paralelo.
+
+        Tolera fallos parciales: solo falla si no se alcanzan `min_size`
+        conexiones.
+
+        Raises:
+            Exception: Si se abrieron menos de `min_size` conexiones
+        """
         if self._initialized:
             return
 
-        with self._lock:
+        with self._init_lock:
             if self._initialized:
                 return
 
-            logger.info(f"Inicializando pool de conexiones (tamaño: {self.pool_size})")
-            for _ in range(self.pool_size):
-                try:
-                    conn = self._create_connection()
-                    self._pool.put(conn)
-                except Exception as e:
-                    logger.error(f"Error al inicializar pool: {e}")
-                    raise
+            logger.info(
+                f"Inicializando pool de conexiones "
+                f"(tamaño: {self.pool_size}, overflow: {self.max_overflow})"
+            )
+            start_time = time.perf_counter()
+
+            with self._lock:
+                missing = max(0, self.pool_size - self._size)
+                # Reservar los huecos para que el overflow no los ocupe
+                self._size += missing
+
+            errors: List[Exception] = []
+            if missing:
+                with ThreadPoolExecutor(
+                    max_workers=missing,
+                    thread_name_prefix="odbc-warmup"
+                ) as warmup:
+                    futures = [
+                        warmup.submit(self._create_connection)
+                        for _ in range(missing)
+                    ]
+                    for future in as_completed(futures):
+                        try:
+                            self._add_idle(_PooledConnection(future.result()))
+                        except Exception as e:
+                            errors.append(e)
+                            with self._available:
+                                self._size -= 1
+                                self._available.notify()
+
+            duration = time.perf_counter() - start_time
+            record_startup_phase('pool_warmup', duration)
+
+            if errors:
+                logger.error(
+                    f"Error al inicializar pool: {len(errors)} de {missing} "
+                    f"conexiones fallaron ({errors[0]})"
+                )
+            if self._size < self.min_size:
+                raise errors[0] if errors else Exception(
+                    "No se alcanzó el mínimo de conexiones del pool"
+                )
 
             self._initialized = True
-            logger.info("Pool de conexiones inicializado correctamente")
+            logger.info(
+                f"Pool de conexiones inicializado en {duration:.2f}s "
+                f"({self._size} conexiones)"
+            )
+
+        self.start_reaper()
+
+    def ensure_initialized(self):
+        """Inicializa el pool salvo que ya se esté calentando en segundo plano"""
+        if not self._initialized and self._warmup is None:
+            self.initialize()
+
+    def initialize_in_background(self):
+        """
+        Calienta el pool en un thread en segundo plano.
+
+        La aplicación puede atender requests mientras tanto; `ready` pasa a
+        True al alcanzar `min_size` conexiones. Si el calentamiento falla, el
+        reaper sigue intentando reponer conexiones.
+        """
+        if self._initialized or self._warmup is not None:
+            return
+
+        def warmup():
+            try:
+                self.initialize()
+            except Exception as e:
+                logger.error(f"Calentamiento del pool fallido, reintentando en segundo plano: {e}")
+                self.start_reaper()
+
+        self._warmup = threading.Thread(
+            target=warmup,
+            name="odbc-pool-warmup",
+            daemon=True
+        )
+        self._warmup.start()
+
+    def start_reaper(self):
+        """Arranca el thread que mantiene las conexiones ociosas"""
+        if self.reaper_interval <= 0:
+            return
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+
+        self._reaper_stop.clear()
+        self._reaper = threading.Thread(
+            target=self._reaper_loop,
+            name="odbc-pool-reaper",
+            daemon=True
+        )
+        self._reaper.start()
+
+    def stop_reaper(self):
+        """Detiene el thread reaper"""
+        self._reaper_stop.set()
+        if self._reaper is not None:
+            self._reaper.join(timeout=self.reaper_interval + 1)
+            self._reaper = None
+
+    def _reaper_loop(self):
+        """Bucle del reaper: se ejecuta cada `reaper_interval` segundos"""
+        while not self._reaper_stop.wait(self.reaper_interval):
+            try:
+                self.reap()
+                self.detect_leaks()
+            except Exception as e:
+                logger.error(f"Error en el reaper del pool: {e}")
+
+    def detect_leaks(self) -> int:
+        """
+        Registra el stack de los checkouts retenidos más de `leak_threshold`.
+
+        Cada checkout se reporta una sola vez.
+
+        Returns:
+            Número de checkouts reportados en esta pasada
+        """
+        if self.leak_threshold <= 0:
+            return 0
+
+        now = time.monotonic()
+        with self._lock:
+            suspects = [
+                pooled for pooled in self._in_use.values()
+                if not pooled.leak_reported
+                and now - pooled.checked_out_at >= self.leak_threshold
+            ]
+            for pooled in suspects:
+                pooled.leak_reported = True
+
+        for pooled in suspects:
+            held = now - pooled.checked_out_at
+            summary = traceback.StackSummary.extract(pooled.checkout_stack or [])
+            summary.reverse()
+            stack = "".join(summary.format())
+            logger.warning(
+                f"Conexión ODBC retenida {held:.1f}s sin devolver al pool. "
+                f"Checkout realizado en:\n{stack}"
+            )
+
+        return len(suspects)
+
+    def reap(self):
+        """
+        Mantenimiento de conexiones ociosas fuera del camino de las requests.
+
+        - Cierra overflow ocioso y conexiones que superan pool_recycle.
+        - Sondea las conexiones ociosas más de `validation_idle_seconds` y
+          descarta las que no responden.
+        - Repone conexiones hasta `pool_size`.
+        """
+        now = time.monotonic()
+        to_close: List[_PooledConnection] = []
+        to_probe: List[_PooledConnection] = []
+
+        with self._lock:
+            to_close.extend(self._trim_overflow(now))
+            kept = deque()
+            for pooled in self._idle:
+                if self._is_expired(pooled, now):
+                    self._size -= 1
+                    to_close.append(pooled)
+                else:
+                    kept.append(pooled)
+            self._idle = kept
+
+        for pooled in to_close:
+            self._close_connection(pooled)
+
+        # Sondear de una en una para no dejar el pool sin conexiones ociosas
+        while not self._reaper_stop.is_set():
+            with self._lock:
+                pooled = next(
+                    (
+                        candidate for candidate in self._idle
+                        if self._needs_validation(candidate, time.monotonic())
+                        and candidate not in to_probe
+                    ),
+                    None
+                )
+                if pooled is None:
+                    break
+                self._idle.remove(pooled)
+            to_probe.append(pooled)
+
+            if self._ping(pooled.connection):
+                pooled.last_validated = time.monotonic()
+                with self._available:
+                    # Vuelve a su posición fría para no alterar el orden LIFO
+                    self._idle.appendleft(pooled)
+                    self._available.notify()
+            else:
+                logger.warning("Reaper: conexión inválida descartada")
+                self._discard(pooled)
+
+        self._replenish()
+        self._publish_gauges()
+
+    def _replenish(self):
+        """Abre conexiones hasta volver a `pool_size`"""
+        while not self._reaper_stop.is_set():
+            with self._lock:
+                if self._size >= self.pool_size:
+                    return
+                self._size += 1
+
+            try:
+                pooled = _PooledConnection(self._create_connection())
+            except Exception as e:
+                logger.error(f"Reaper: no se pudo reponer conexión: {e}")
+                with self._available:
+                    self._size -= 1
+                return
+
+            self._add_idle(pooled, cold=True)
+
+    def _acquire(self, deadline: float):
+        """
+        Toma una conexión ociosa o reserva un hueco para abrir una nueva.
+
+        Returns:
+            Tupla (conexión, creada) donde `creada` indica si es nueva
+        """
+        to_close: List[_PooledConnection] = []
+        pooled: Optional[_PooledConnection] = None
+
+        try:
+            with self._available:
+                while True:
+                    now = time.monotonic()
+                    to_close.extend(self._trim_overflow(now))
+
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        if self._is_expired(candidate, now):
+                            # Reciclar: se cierra y se intenta con la siguiente
+                            self._size -= 1
+                            to_close.append(candidate)
+                            continue
+                        pooled = candidate
+                        break
+
+                    if self._size < self.max_size:
+                        # Reservar el hueco antes de conectar fuera del lock
+                        self._size += 1
+                        break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        db_pool_checkout_timeouts_total.inc()
+                        logger.error("Timeout esperando conexión del pool")
+                        raise PoolTimeoutError(
+                            "No hay conexiones disponibles en el pool"
+                        )
+                    self._available.wait(remaining)
+        finally:
+            for stale in to_close:
+                self._close_connection(stale)
+
+        if pooled is not None:
+            return pooled, False
+
+        try:
+            return _PooledConnection(self._create_connection()), True
+        except Exception:
+            with self._available:
+                self._size -= 1
+                self._available.notify()
+            raise
+
+    def checkout(self, timeout: Optional[float] = None) -> pyodbc.Connection:
+        """
+        Obtiene una conexión del pool.
+
+        Reutiliza la conexión ociosa más reciente; si no hay ninguna y no se
+        alcanzó `pool_size + max_overflow`, abre una nueva. En otro caso espera
+        a que se devuelva una. Solo se valida con un ping la conexión que lleva
+        ociosa más de `validation_idle_seconds`. Toda conexión obtenida debe
+        devolverse con `checkin`.
+
+        Args:
+            timeout: Segundos máximos de espera (por defecto pool_timeout)
+
+        Returns:
+            Conexión ODBC
+
+        Raises:
+            PoolTimeoutError: Si no hay conexión disponible dentro del timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+
+        while True:
+            pooled, created = self._acquire(deadline)
+            if created or not self._needs_validation(pooled, time.monotonic()):
+                break
+            if self._ping(pooled.connection):
+                pooled.last_validated = time.monotonic()
+                break
+            logger.warning("Conexión inválida descartada, obteniendo otra")
+            self._discard(pooled)
+
+        now = time.monotonic()
+        pooled.checked_out_at = now
+        pooled.leak_reported = False
+        pooled.checkout_stack = _caller_frames(20) if self.leak_threshold > 0 else None
+
+        with self._lock:
+            self._in_use[id(pooled.connection)] = pooled
+
+        db_pool_checkout_wait_seconds.observe(now - start_time)
+        self._publish_gauges()
+        return pooled.connection
+
+    def checkin(self, connection: pyodbc.Connection, discard: bool = False):
+        """
+        Devuelve una conexión al pool.
+
+        Args:
+            connection: Conexión obtenida con `checkout`
+            discard: Si es True, la conexión se cierra en vez de reutilizarse
+        """
+        now = time.monotonic()
+        to_close: List[_PooledConnection] = []
+
+        with self._available:
+            pooled = self._in_use.pop(id(connection), None)
+            if pooled is None:
+                logger.warning("Se devolvió una conexión que no pertenece al pool")
+                return
+
+            pooled.last_used = now
+            pooled.checkout_stack = None
+            if discard or self._is_expired(pooled, now):
+                self._size -= 1
+                to_close.append(pooled)
+            else:
+                self._idle.append(pooled)
+
+            to_close.extend(self._trim_overflow(now))
+            self._available.notify()
+
+        for stale in to_close:
+            self._close_connection(stale)
+
+        db_pool_connection_hold_seconds.observe(now - pooled.checked_out_at)
+        self._publish_gauges()
+        self._update_ready()
 
     @contextmanager
     def get_connection(self):
@@ -96,50 +661,194 @@ class ODBCConnectionPool:
                 cursor = conn.cursor()
                 ...
         """
-        if not self._initialized:
-            self.initialize()
-
-        connection = None
-        try:
-            # Obtener conexión del pool (esperar hasta 10 segundos)
-            connection = self._pool.get(timeout=10)
+        self.ensure_initialized()
 
-            # Verificar que la conexión esté activa
-            try:
-                connection.cursor().execute("SELECT 1")
-            except:
-                logger.warning("Conexión inválida, creando nueva")
-                connection = self._create_connection()
+        connection = self.checkout()
+        broken = False
 
+        try:
             yield connection
-
-        except Empty:
-            logger.error("Timeout esperando conexión del pool")
-            raise Exception("No hay conexiones disponibles en el pool")
-
+        except (pyodbc.OperationalError, pyodbc.InterfaceError):
+            # Errores de comunicación: la conexión no debe reutilizarse
+            broken = True
+            raise
         finally:
             # Devolver conexión al pool
-            if connection:
-                try:
-                    self._pool.put(connection, timeout=1)
-                except:
-                    logger.warning("No se pudo devolver conexión al pool")
+            self.checkin(connection, discard=broken)
+
+    def status(self) -> Dict[str, int]:
+        """
+        Estado actual del pool.
+
+        Returns:
+            Diccionario con conexiones abiertas, ociosas, en uso y de overflow
+        """
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "overflow": max(0, self._size - self.pool_size),
+                "max_size": self.max_size,
+            }
 
     def close_all(self):
-        """Cierra todas las conexiones del pool"""
+        """Cierra todas las conexiones ociosas del pool"""
         logger.info("Cerrando todas las conexiones del pool")
-        connection_count = 0
-        while not self._pool.empty():
-            try:
-                conn = self._pool.get_nowait()
-                conn.close()
-                connection_count += 1
-                # Decrementar contador de conexiones activas
-                db_connections_active.dec()
-            except:
-                pass
-        logger.info(f"Cerradas {connection_count} conexiones")
+        self.stop_reaper()
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+
+        for pooled in idle:
+            self._close_connection(pooled)
+
+        logger.info(f"Cerradas {len(idle)} conexiones")
+        self._publish_gauges()
         self._initialized = False
+        self._warmup = None
+        self._ready.clear()
+        db_pool_ready.set(0)
+
+
+class ResultStream:
+    """
+    Resultado de una query leído por lotes con fetchmany.
+
+    Mantiene la conexión fuera del pool hasta que se agota o se cierra, de
+    modo que la memoria usada es proporcional al tamaño del lote y no al
+    número total de registros.
+
+    Uso:
+        stream = manager.open_stream(query)
+        try:
+            for batch in stream:
+                ...
+        finally:
+            stream.close()
+    """
+
+    def __init__(
+        self,
+        pool: ODBCConnectionPool,
+        connection: pyodbc.Connection,
+        cursor: pyodbc.Cursor,
+        batch_size: int,
+        operation: str,
+        table: str,
+        start_time: float
+    ):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.description = cursor.description
+        self.columns = [column[0] for column in cursor.description]
+        self.row_count = 0
+        self._connection = connection
+        self._cursor = cursor
+        self._operation = operation
+        self._table = table
+        self._start_time = start_time
+        self._closed = False
+        self._broken = False
+
+    @property
+    def closed(self) -> bool:
+        """True si el stream ya devolvió su conexión al pool"""
+        return self._closed
+
+    def fetch(self, size: Optional[int] = None) -> List[pyodbc.Row]:
+        """
+        Lee el siguiente lote de registros.
+
+        Al agotarse el resultado el stream se cierra automáticamente.
+
+        Args:
+            size: Tamaño del lote (por defecto batch_size)
+
+        Returns:
+            Lista de Rows; vacía cuando no quedan registros
+        """
+        if self._closed:
+            return []
+
+        try:
+            rows = self._cursor.fetchmany(size or self.batch_size)
+        except pyodbc.Error as e:
+            self._broken = isinstance(e, (pyodbc.OperationalError, pyodbc.InterfaceError))
+            self.close(error=e)
+            logger.error(f"Error leyendo resultados: {e}")
+            raise
+
+        self.row_count += len(rows)
+        if not rows:
+            self.close()
+        return rows
+
+    def __iter__(self):
+        while True:
+            rows = self.fetch()
+            if not rows:
+                return
+            yield rows
+
+    def close(self, error: Optional[Exception] = None):
+        """
+        Cierra el cursor y devuelve la conexión al pool.
+
+        Args:
+            error: Excepción que provocó el cierre (para métricas)
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            self._cursor.close()
+        except Exception as e:
+            logger.warning(f"Error cerrando cursor: {e}")
+        finally:
+            self.pool.checkin(self._connection, discard=self._broken)
+
+        record_db_query(
+            operation=self._operation,
+            table=self._table,
+            duration=time.perf_counter() - self._start_time,
+            status='error' if error else 'success',
+            error_type=type(error).__name__ if error else None
+        )
+        logger.info(f"Stream cerrado. Registros: {self.row_count}")
+
+
+class AbendsPage(NamedTuple):
+    """Página de abends con las claves de keyset de las páginas vecinas"""
+    columns: List[str]
+    rows: List[Any]
+    next_key: Optional[Tuple[Any, ...]]
+    prev_key: Optional[Tuple[Any, ...]]
+
+
+# Dimensiones del resumen de abends, en el orden de las GROUPING SETS
+ABEND_SUMMARY_DIMENSIONS = ("CICS_REGION", "PROGRAM_NAME", "ABEND_CODE")
+
+# Columnas adicionales que lee la ingesta para los sketches de top-K y distintos
+ABEND_SKETCH_COLUMNS = ("TRANSACTION_ID", "USER_ID", "TERMINAL_ID")
+
+# Columnas con índice local de nombres (autocompletado y filtros IN)
+NAME_INDEX_COLUMNS = ("PROGRAM_NAME", "TRANSACTION_ID")
+
+# Columnas que no identifican un abend: no sirven como último desempate
+# del keyset (TRANSACTION_ID es el código de transacción de 4 caracteres)
+ABEND_NON_UNIQUE_COLUMNS = (
+    "TIMESTAMP", *ABEND_SUMMARY_DIMENSIONS, *ABEND_SKETCH_COLUMNS,
+)
+
+
+def _group_value(value: Any) -> str:
+    """Clave de un grupo: sin el relleno de las columnas CHAR y NULL como UNKNOWN"""
+    if value is None:
+        return "UNKNOWN"
+    return value.strip() if isinstance(value, str) else str(value)
 
 
 class ODBCManager:
@@ -151,11 +860,176 @@ class ODBCManager:
     def __init__(self, pool_size: int = 5):
         self.pool = ODBCConnectionPool(pool_size)
         self.settings = get_settings()
+        self.cursors = CursorRegistry(
+            max_open=self.settings.max_open_cursors or max(1, pool_size // 2),
+            ttl=self.settings.cursor_ttl_seconds
+        )
+        self.abend_keyset_columns = parse_keyset_columns(self.settings.abend_keyset_columns)
+        if not ends_in_unique_column(self.abend_keyset_columns, ABEND_NON_UNIQUE_COLUMNS):
+            logger.warning(
+                f"ABEND_KEYSET_COLUMNS termina en {self.abend_keyset_columns[-1]}, que no es "
+                f"única: los abends con los mismos valores en todas las columnas de orden "
+                f"pueden saltarse entre páginas de /query/abends. Agregue al "
+                f"final una columna única (número de tarea o id de registro)"
+            )
+        self.catalog = TableCatalog(
+            self.pool,
+            ttl=self.settings.table_metadata_ttl_seconds,
+            negative_ttl=self.settings.table_metadata_negative_ttl_seconds
+        )
+        # Abends recientes en memoria; los alimenta el ingestor incremental
+        self.recent: Optional[RecentAbendStore] = None
+        if self.settings.recent_abends_enabled:
+            self.recent = RecentAbendStore(
+                self.abend_keyset_columns,
+                max_rows=self.settings.recent_abends_max_rows,
+                retention=timedelta(hours=self.settings.recent_abends_hours),
+                max_staleness=timedelta(
+                    seconds=self.settings.abend_ingest_lag_seconds
+                    + 3 * self.settings.abend_ingest_interval
+                )
+            )
+        # Nombres distintos para autocompletado y filtros IN; los cargan
+        # NameIndexRefresher y el ingestor incremental
+        self.name_indexes: Dict[str, NameIndex] = {
+            column: NameIndex(column) for column in NAME_INDEX_COLUMNS
+        }
+        # Se desactiva si el driver rechaza GROUPING SETS
+        self.grouping_sets_enabled = self.settings.abend_summary_grouping_sets
+        # Se desactiva si el driver no soporta {fn TIMESTAMPDIFF}
+        self.sql_bucketing_enabled = self.settings.abend_timeseries_sql_bucketing
 
     def initialize(self):
         """Inicializa el gestor"""
         self.pool.initialize()
 
+    def initialize_in_background(self):
+        """Inicializa el gestor sin bloquear (modo lazy)"""
+        self.pool.initialize_in_background()
+
+    @property
+    def ready(self) -> bool:
+        """True cuando el pool tiene las conexiones mínimas"""
+        return self.pool.ready
+
+    def open_stream(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        batch_size: Optional[int] = None
+    ) -> ResultStream:
+        """
+        Ejecuta una query y retorna un stream para leerla por lotes.
+
+        El llamador es responsable de agotar o cerrar el stream.
+
+        Args:
+            query: SQL query a ejecutar
+            params: Parámetros para la query (opcional)
+            batch_size: Registros por lote (por defecto STREAM_BATCH_SIZE)
+
+        Returns:
+            ResultStream con la conexión reservada
+        """
+        logger.info(f"Abriendo stream de query: {query[:100]}...")
+
+        operation = self._extract_operation(query)
+        table = self._extract_table(query)
+        start_time = time.perf_counter()
+
+        self.pool.ensure_initialized()
+        connection = self.pool.checkout()
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+            return ResultStream(
+                pool=self.pool,
+                connection=connection,
+                cursor=cursor,
+                batch_size=batch_size or self.settings.stream_batch_size,
+                operation=operation,
+                table=table,
+                start_time=start_time
+            )
+
+        except Exception as e:
+            if cursor is not None:
+                cursor.close()
+            broken = isinstance(e, (pyodbc.OperationalError, pyodbc.InterfaceError))
+            self.pool.checkin(connection, discard=broken)
+
+            if isinstance(e, pyodbc.Error):
+                record_db_query(
+                    operation=operation,
+                    table=table,
+                    duration=time.perf_counter() - start_time,
+                    status='error',
+                    error_type=type(e).__name__
+                )
+                logger.error(f"Error ejecutando query: {e}")
+            raise
+
+    def open_cursor(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        page_size: int = 1000
+    ) -> CursorPage:
+        """
+        Ejecuta una query y retorna su primera página.
+
+        Si quedan registros, el cursor y su conexión quedan abiertos bajo un
+        token de continuación hasta agotarse, cerrarse o expirar.
+
+        Args:
+            query: SQL query a ejecutar
+            params: Parámetros para la query (opcional)
+            page_size: Registros por página
+
+        Returns:
+            CursorPage con columnas, registros y token de continuación
+
+        Raises:
+            CursorLimitError: Si se alcanzó el máximo de cursores abiertos
+        """
+        return self.cursors.open(
+            lambda: self.open_stream(query, params, batch_size=page_size),
+            page_size
+        )
+
+    def fetch_cursor(self, token: str, page_size: int = 1000) -> CursorPage:
+        """
+        Lee la siguiente página de un cursor abierto con open_cursor.
+
+        Args:
+            token: Token de continuación
+            page_size: Registros por página
+
+        Returns:
+            CursorPage; el token es None en la última página
+
+        Raises:
+            CursorNotFoundError: Si el token no existe o expiró
+        """
+        return self.cursors.fetch(token, page_size)
+
+    def close_cursor(self, token: str) -> bool:
+        """
+        Cierra un cursor abierto antes de agotarlo.
+
+        Args:
+            token: Token de continuación
+
+        Returns:
+            True si el cursor existía
+        """
+        return self.cursors.close(token)
+
     def execute_query(
         self,
         query: str,
@@ -173,6 +1047,34 @@ class ODBCManager:
         Returns:
             Lista de diccionarios con los resultados
         """
+        columns, rows = self.execute_query_rows(query, params, fetch_all)
+
+        # Convertir a lista de diccionarios
+        return [
+            dict(zip(columns, row))
+            for row in rows
+        ]
+
+    def execute_query_rows(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        fetch_all: bool = True
+    ) -> Tuple[List[str], List[pyodbc.Row]]:
+        """
+        Ejecuta una query y retorna columnas y Rows sin convertir.
+
+        Evita crear un diccionario por registro; útil para respuestas
+        columnares.
+
+        Args:
+            query: SQL query a ejecutar
+            params: Parámetros para la query (opcional)
+            fetch_all: Si es True, retorna todos los resultados
+
+        Returns:
+            Tupla (nombres de columnas, lista de Rows)
+        """
         logger.info(f"Ejecutando query: {query[:100]}...")
 
         # Determinar operación y tabla
@@ -200,12 +1102,6 @@ class ODBCManager:
                 else:
                     rows = cursor.fetchmany(1000)  # Limitar a 1000 registros
 
-                # Convertir a lista de diccionarios
-                results = [
-                    dict(zip(columns, row))
-                    for row in rows
-                ]
-
                 # Registrar métrica de query exitosa
                 duration = time.perf_counter() - start_time
                 record_db_query(
@@ -215,8 +1111,8 @@ class ODBCManager:
                     status='success'
                 )
 
-                logger.info(f"Query ejecutada exitosamente. Registros: {len(results)}")
-                return results
+                logger.info(f"Query ejecutada exitosamente. Registros: {len(rows)}")
+                return columns, rows
 
             except pyodbc.Error as e:
                 # Registrar métrica de error
@@ -287,43 +1183,37 @@ class ODBCManager:
         except:
             return 'unknown'
 
-    def get_table_columns(self, table_name: str) -> List[Dict[str, str]]:
+    def get_table_columns(self, table_name: str) -> List[Dict[str, Any]]:
         """
         Obtiene las columnas de una tabla.
 
+        Se leen del catálogo ODBC (SQLColumns) sin ejecutar ninguna query
+        sobre la tabla, y se cachean por TABLE_METADATA_TTL_SECONDS.
+
         Args:
-            table_name: Nombre de la tabla
+            table_name: Nombre de la tabla (opcionalmente SCHEMA.TABLA)
 
         Returns:
             Lista de diccionarios con información de columnas
+
+        Raises:
+            TableNotFoundError: Si la tabla no existe
         """
-        logger.info(f"Obteniendo columnas de tabla: {table_name}")
+        columns = self.catalog.get_columns(table_name)
+        logger.info(f"Columnas obtenidas de {table_name}: {len(columns)}")
+        return columns
 
-        with self.pool.get_connection() as conn:
-            cursor = conn.cursor()
+    def invalidate_table_metadata(self, table_name: Optional[str] = None) -> int:
+        """
+        Descarta la metadata cacheada (por ejemplo, tras cambiar una vista DVM).
 
-            try:
-                # Usar query simple para obtener metadata
-                cursor.execute(f"SELECT TOP 1 * FROM {table_name}")
-
-                columns = [
-                    {
-                        "name": column[0],
-                        "type": str(column[1]),
-                        "size": column[3] if column[3] else None,
-                        "nullable": bool(column[6])
-                    }
-                    for column in cursor.description
-                ]
-
-                logger.info(f"Columnas obtenidas: {len(columns)}")
-                return columns
+        Args:
+            table_name: Nombre de la tabla; None para todas
 
-            except pyodbc.Error as e:
-                logger.error(f"Error obteniendo columnas: {e}")
-                raise
-            finally:
-                cursor.close()
+        Returns:
+            Número de tablas descartadas
+        """
+        return self.catalog.invalidate(table_name)
 
     def get_abends(
         self,
@@ -342,30 +1232,532 @@ class ODBCManager:
         Returns:
             Lista de abends
         """
+        query, params = self.build_abends_query(region, program, limit)
+        return self.execute_query(query, params)
+
+    def get_abends_page(
+        self,
+        region: Optional[str] = None,
+        program: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Sequence[Any]] = None,
+        before: Optional[Sequence[Any]] = None
+    ) -> AbendsPage:
+        """
+        Obtiene una página de abends con paginación keyset.
+
+        Sin cursor retorna los abends más recientes. Con `after` retorna los
+        anteriores (más antiguos) al registro del cursor y con `before` los
+        posteriores (más recientes), siempre ordenados de más reciente a más
+        antiguo. Se pide un registro de más para saber si quedan páginas.
+
+        Si el almacén de abends recientes cubre la página, se responde desde
+        memoria sin consultar DVM.
+
+        Args:
+            region: Región CICS (opcional)
+            program: Nombre del programa (opcional)
+            limit: Registros por página
+            after: Valores de keyset del último registro de la página anterior
+            before: Valores de keyset del primer registro de la página siguiente
+
+        Returns:
+            AbendsPage con columnas, Rows y claves de las páginas vecinas
+        """
+        result = None
+        if self.recent is not None:
+            result = self.recent.query(region, program, limit + 1, after, before)
+        if result is None:
+            query, params = self.build_abends_query(region, program, limit + 1, after, before)
+            result = self.execute_query_rows(query, params)
+        columns, rows = result
+
+        has_more = len(rows) > limit
+        rows = list(rows[:limit])
+        if before is not None:
+            # La query de `before` recorre el índice en orden ascendente
+            rows.reverse()
+
+        return self._abends_page_result(columns, rows, has_more, after, before)
+
+    def _abends_page_result(
+        self,
+        columns: List[str],
+        rows: List[Any],
+        has_more: bool,
+        after: Optional[Sequence[Any]],
+        before: Optional[Sequence[Any]]
+    ) -> AbendsPage:
+        """Página con los cursores vecinos de registros ya ordenados (DESC)"""
+        if not rows:
+            return AbendsPage(columns, rows, None, None)
+
+        indexes = self._keyset_indexes(columns)
+
+        def key(row) -> Tuple[Any, ...]:
+            return tuple(row[i] for i in indexes)
+
+        if before is not None:
+            next_key = key(rows[-1])
+            prev_key = key(rows[0]) if has_more else None
+        else:
+            next_key = key(rows[-1]) if has_more else None
+            prev_key = key(rows[0]) if after is not None else None
+
+        return AbendsPage(columns, rows, next_key, prev_key)
+
+    def merge_abends_pages(
+        self,
+        pages: Sequence[AbendsPage],
+        limit: int,
+        after: Optional[Sequence[Any]] = None,
+        before: Optional[Sequence[Any]] = None
+    ) -> AbendsPage:
+        """
+        Mezcla las páginas de varias regiones en una sola página.
+
+        Cada página viene ordenada de más reciente a más antiguo por las
+        columnas de keyset, así que una mezcla k-way (heapq.merge) da el
+        orden global y se detiene tras `limit` registros. Con `before` se
+        mezcla desde el cursor hacia los más recientes. Los cursores de la
+        página mezclada valen como `after`/`before` para todas las regiones.
+
+        Args:
+            pages: Páginas de cada región pedidas con el mismo cursor y límite
+            limit: Registros por página
+            after: Valores de keyset del cursor `after` (opcional)
+            before: Valores de keyset del cursor `before` (opcional)
+
+        Returns:
+            AbendsPage con columnas, Rows y claves de las páginas vecinas
+        """
+        filled = [page for page in pages if page.rows]
+        if not filled:
+            return AbendsPage(pages[0].columns if pages else [], [], None, None)
+
+        columns = filled[0].columns
+        indexes = self._keyset_indexes(columns)
+
+        def key(row) -> Tuple[Any, ...]:
+            return tuple(row[i] for i in indexes)
+
+        if before is not None:
+            # Los registros más cercanos al cursor están al final de cada página
+            merged = heapq.merge(*(reversed(page.rows) for page in filled), key=key)
+            rows = list(islice(merged, limit))
+            rows.reverse()
+            has_more = any(page.prev_key is not None for page in filled)
+        else:
+            merged = heapq.merge(*(page.rows for page in filled), key=key, reverse=True)
+            rows = list(islice(merged, limit))
+            has_more = any(page.next_key is not None for page in filled)
+        has_more = has_more or sum(len(page.rows) for page in filled) > limit
+
+        return self._abends_page_result(columns, rows, has_more, after, before)
+
+    def get_abend_watermarks(self, since: datetime) -> Dict[str, Tuple[Any, int]]:
+        """
+        Marca de agua de abends por región: TIMESTAMP más reciente y total
+        desde `since`.
+
+        Es una query de agregación pequeña que sirve para detectar si una
+        región tiene abends nuevos sin volver a leerlos. El rango de
+        TIMESTAMP la limita a los abends recientes sobre el índice en lugar
+        de recorrer toda la tabla.
+
+        Args:
+            since: TIMESTAMP mínimo contado (fijo entre sondas para que el
+                total solo cambie con abends nuevos)
+
+        Returns:
+            Diccionario región -> (MAX(TIMESTAMP), COUNT(*))
+        """
         table = self.settings.abend_table_name
-        query = f"SELECT TOP {limit} * FROM {table}"
+        query = (
+            f"SELECT CICS_REGION, MAX(TIMESTAMP), COUNT(*) FROM {table} "
+            f"WHERE TIMESTAMP >= ? GROUP BY CICS_REGION"
+        )
+        _, rows = self.execute_query_rows(query, (since,))
+        return {
+            (row[0] or "").strip(): (row[1], row[2])
+            for row in rows
+        }
+
+    def _abends_window_filter(
+        self,
+        region: Optional[str],
+        since: datetime
+    ) -> Tuple[str, List[Any]]:
+        """WHERE común de las agregaciones del resumen"""
+        conditions = ["TIMESTAMP >= ?"]
+        params: List[Any] = [since]
+        if region:
+            conditions.append("CICS_REGION = ?")
+            params.append(region)
+        return " WHERE " + " AND ".join(conditions), params
 
-        conditions = []
-        params = []
+    def get_abend_counts(
+        self,
+        dimension: str,
+        region: Optional[str],
+        since: datetime
+    ) -> Dict[str, int]:
+        """
+        Cuenta abends por una dimensión con GROUP BY en DVM.
+
+        Solo viajan los conteos agregados, no los registros.
+
+        Args:
+            dimension: Columna de ABEND_SUMMARY_DIMENSIONS
+            region: Región CICS (opcional)
+            since: Inicio de la ventana de tiempo
+
+        Returns:
+            Diccionario valor -> número de abends
+        """
+        if dimension not in ABEND_SUMMARY_DIMENSIONS:
+            raise ValueError(f"Dimensión de resumen inválida: {dimension}")
+
+        where, params = self._abends_window_filter(region, since)
+        query = (
+            f"SELECT {dimension}, COUNT(*) FROM {self.settings.abend_table_name}"
+            f"{where} GROUP BY {dimension}"
+        )
+        _, rows = self.execute_query_rows(query, tuple(params))
+
+        counts: Dict[str, int] = {}
+        for value, count in rows:
+            key = _group_value(value)
+            counts[key] = counts.get(key, 0) + int(count)
+        return counts
+
+    def get_abend_counts_grouping_sets(
+        self,
+        region: Optional[str],
+        since: datetime
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Cuenta abends por todas las dimensiones en una sola query.
+
+        Usa GROUP BY GROUPING SETS; GROUPING() distingue el grupo de un
+        valor NULL real de las filas agregadas de las otras dimensiones.
 
+        Args:
+            region: Región CICS (opcional)
+            since: Inicio de la ventana de tiempo
+
+        Returns:
+            Diccionario dimensión -> (valor -> número de abends)
+        """
+        dimensions = ABEND_SUMMARY_DIMENSIONS
+        where, params = self._abends_window_filter(region, since)
+        query = (
+            f"SELECT {', '.join(dimensions)}, "
+            f"{', '.join(f'GROUPING({d})' for d in dimensions)}, COUNT(*) "
+            f"FROM {self.settings.abend_table_name}{where} "
+            f"GROUP BY GROUPING SETS ({', '.join(f'({d})' for d in dimensions)})"
+        )
+        _, rows = self.execute_query_rows(query, tuple(params))
+
+        counts: Dict[str, Dict[str, int]] = {d: {} for d in dimensions}
+        width = len(dimensions)
+        for row in rows:
+            grouping = row[width:2 * width]
+            for i, dimension in enumerate(dimensions):
+                if not grouping[i]:
+                    key = _group_value(row[i])
+                    group = counts[dimension]
+                    group[key] = group.get(key, 0) + int(row[-1])
+                    break
+        return counts
+
+    def _abends_range_filter(
+        self,
+        start: datetime,
+        end: datetime,
+        region: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        """WHERE de un rango [start, end) de TIMESTAMP"""
+        conditions = ["TIMESTAMP >= ?", "TIMESTAMP < ?"]
+        params: List[Any] = [start, end]
         if region:
             conditions.append("CICS_REGION = ?")
             params.append(region)
+        return " WHERE " + " AND ".join(conditions), params
+
+    def get_abend_timeseries(
+        self,
+        start: datetime,
+        end: datetime,
+        bucket_seconds: int,
+        dimension: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> List[pyodbc.Row]:
+        """
+        Cuenta abends por intervalo de tiempo agrupando en DVM.
+
+        El índice de intervalo se calcula con la función escalar ODBC
+        TIMESTAMPDIFF; el inicio y el tamaño van como literales porque
+        muchos motores no aceptan parámetros en el GROUP BY.
+
+        Args:
+            start: Inicio del primer intervalo
+            end: Fin del rango (exclusivo)
+            bucket_seconds: Tamaño de cada intervalo
+            dimension: Columna de ABEND_SUMMARY_DIMENSIONS para separar
+                series (opcional)
+            region: Región CICS (opcional)
+
+        Returns:
+            Rows (intervalo, [valor de la dimensión], número de abends)
+        """
+        if dimension is not None and dimension not in ABEND_SUMMARY_DIMENSIONS:
+            raise ValueError(f"Dimensión de serie inválida: {dimension}")
+
+        bucket = (
+            f"{{fn TIMESTAMPDIFF(SQL_TSI_SECOND, "
+            f"{{ts '{start.strftime('%Y-%m-%d %H:%M:%S')}'}}, TIMESTAMP)}} "
+            f"/ {int(bucket_seconds)}"
+        )
+        groups = [bucket] + ([dimension] if dimension else [])
+        where, params = self._abends_range_filter(start, end, region)
+        query = (
+            f"SELECT {', '.join(groups)}, COUNT(*) "
+            f"FROM {self.settings.abend_table_name}{where} "
+            f"GROUP BY {', '.join(groups)}"
+        )
+        _, rows = self.execute_query_rows(query, tuple(params))
+        return rows
+
+    def get_abend_timestamps(
+        self,
+        start: datetime,
+        end: datetime,
+        dimension: Optional[str] = None,
+        region: Optional[str] = None,
+        limit: int = 1000000
+    ) -> List[pyodbc.Row]:
+        """
+        Lee solo TIMESTAMP (y la dimensión) de los abends de un rango.
+
+        Alternativa a get_abend_timeseries cuando el driver no puede
+        agrupar por intervalo: el agrupamiento se hace en la aplicación.
+
+        Args:
+            start: Inicio del rango
+            end: Fin del rango (exclusivo)
+            dimension: Columna de ABEND_SUMMARY_DIMENSIONS (opcional)
+            region: Región CICS (opcional)
+            limit: Registros máximos a leer
+
+        Returns:
+            Rows (TIMESTAMP, [valor de la dimensión])
+
+        Raises:
+            ValueError: Si la dimensión no es válida o el rango tiene más de
+                `limit` abends (una serie truncada sería incorrecta)
+        """
+        if dimension is not None and dimension not in ABEND_SUMMARY_DIMENSIONS:
+            raise ValueError(f"Dimensión de serie inválida: {dimension}")
+
+        columns = ["TIMESTAMP"] + ([dimension] if dimension else [])
+        where, params = self._abends_range_filter(start, end, region)
+        query = (
+            f"SELECT TOP {int(limit) + 1} {', '.join(columns)} "
+            f"FROM {self.settings.abend_table_name}{where}"
+        )
+        _, rows = self.execute_query_rows(query, tuple(params))
+        if len(rows) > limit:
+            raise ValueError(
+                f"El rango tiene más de {limit} abends para agrupar en la aplicación; "
+                f"use un rango menor o filtre por región"
+            )
+        return rows
+
+    def get_new_abends(
+        self,
+        until: datetime,
+        since: Optional[datetime] = None,
+        after: Optional[datetime] = None,
+        limit: Optional[int] = 5000,
+        all_columns: bool = False
+    ) -> Tuple[List[str], List[pyodbc.Row]]:
+        """
+        Lee abends nuevos en orden ascendente de keyset para la ingesta.
+
+        Solo se leen las columnas de keyset, las dimensiones del resumen y
+        las columnas de los sketches (ABEND_SKETCH_COLUMNS).
+        Con `after` se continúa desde el TIMESTAMP del último registro ya
+        ingerido; el índice de keyset convierte la lectura en un rango. El
+        predicado es solo sobre TIMESTAMP (y no sobre todo el keyset) para
+        no saltar abends empatados cuando la última columna no es única: el
+        ingestor corta cada lote en un cambio de TIMESTAMP.
+
+        Args:
+            until: TIMESTAMP máximo a leer (excluye registros aún por llegar)
+            since: TIMESTAMP mínimo cuando no hay registro previo (opcional)
+            after: TIMESTAMP del último registro ingerido (opcional)
+            limit: Registros por lote (None: sin límite)
+            all_columns: Leer todas las columnas (para el almacén de abends
+                recientes)
+
+        Returns:
+            Tupla (nombres de columnas, lista de Rows)
+        """
+        columns = list(self.abend_keyset_columns)
+        columns += [
+            d for d in (*ABEND_SUMMARY_DIMENSIONS, *ABEND_SKETCH_COLUMNS) if d not in columns
+        ]
+        if all_columns:
+            columns = ["*"]
+
+        conditions = ["TIMESTAMP <= ?"]
+        params: List[Any] = [until]
+        if after is not None:
+            conditions.append("TIMESTAMP > ?")
+            params.append(after)
+        elif since is not None:
+            conditions.append("TIMESTAMP >= ?")
+            params.append(since)
+
+        top = f"TOP {int(limit)} " if limit is not None else ""
+        query = (
+            f"SELECT {top}{', '.join(columns)} "
+            f"FROM {self.settings.abend_table_name} "
+            f"WHERE {' AND '.join(conditions)} "
+            f"ORDER BY {', '.join(f'{c} ASC' for c in self.abend_keyset_columns)}"
+        )
+        return self.execute_query_rows(query, tuple(params))
+
+    def get_distinct_values(self, column: str) -> List[Any]:
+        """
+        Valores distintos de una columna indexada de la tabla de abends.
+
+        Args:
+            column: Columna de NAME_INDEX_COLUMNS
+
+        Returns:
+            Lista de valores (con el relleno CHAR de DVM)
+        """
+        if column not in self.name_indexes:
+            raise ValueError(f"Columna sin índice de nombres: {column}")
+        query = f"SELECT DISTINCT {column} FROM {self.settings.abend_table_name}"
+        _, rows = self.execute_query_rows(query)
+        return [row[0] for row in rows]
+
+    def _program_filter(self, program: str) -> Tuple[str, List[Any]]:
+        """
+        Predicado del filtro por subcadena del nombre de programa.
+
+        `PROGRAM_NAME LIKE '%x%'` no puede usar un índice. Con el índice de
+        nombres completo se traduce en un IN con los nombres que contienen
+        x; los abends posteriores a la cobertura del índice, cuyos nombres
+        quizá aún no estén indexados, se siguen filtrando con LIKE sobre un
+        rango corto de TIMESTAMP. Si el filtro usa comodines SQL o coincide
+        con demasiados nombres se usa solo LIKE.
+        """
+        like = ("PROGRAM_NAME LIKE ?", [f"%{program}%"])
+        if "%" in program or "_" in program:
+            abend_program_filter_total.labels(mode="like").inc()
+            return like
+
+        index = self.name_indexes["PROGRAM_NAME"]
+        # La cobertura solo avanza: se lee antes que los nombres
+        covered_until = index.covered_until
+        names = index.containing(program) if covered_until is not None else None
+        if names is None or len(names) > self.settings.name_index_max_in:
+            abend_program_filter_total.labels(mode="like").inc()
+            return like
+
+        abend_program_filter_total.labels(mode="in").inc()
+        recent = "(TIMESTAMP > ? AND PROGRAM_NAME LIKE ?)"
+        recent_params = [covered_until, f"%{program}%"]
+        if not names:
+            return recent, recent_params
+        placeholders = ", ".join("?" * len(names))
+        return (
+            f"(PROGRAM_NAME IN ({placeholders}) OR {recent})",
+            [*names, *recent_params]
+        )
+
+    def _keyset_indexes(self, columns: List[str]) -> List[int]:
+        """Posición de cada columna de keyset en el resultado"""
+        positions = {column.upper(): i for i, column in enumerate(columns)}
+        try:
+            return [positions[column.upper()] for column in self.abend_keyset_columns]
+        except KeyError as e:
+            raise ValueError(f"Columna de keyset no presente en el resultado: {e}") from e
+
+    def build_abends_query(
+        self,
+        region: Optional[Union[str, Sequence[str]]] = None,
+        program: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Sequence[Any]] = None,
+        before: Optional[Sequence[Any]] = None
+    ) -> Tuple[str, Optional[tuple]]:
+        """
+        Construye la query de abends con sus parámetros.
+
+        El orden es siempre por las columnas de keyset
+        (ABEND_KEYSET_COLUMNS), de modo que un cursor se traduce en un
+        predicado de rango sobre el índice.
+
+        Args:
+            region: Región CICS o lista de regiones (opcional)
+            program: Nombre del programa (opcional)
+            limit: Límite de registros
+            after: Valores de keyset: registros anteriores a este (opcional)
+            before: Valores de keyset: registros posteriores a este (opcional)
+
+        Returns:
+            Tupla (query, parámetros)
+        """
+        if after is not None and before is not None:
+            raise ValueError("No se pueden usar 'after' y 'before' a la vez")
+
+        table = self.settings.abend_table_name
+        query = f"SELECT TOP {int(limit)} * FROM {table}"
+
+        conditions = []
+        params = []
+
+        regions = [r for r in ([region] if isinstance(region, str) else region or []) if r]
+        if len(regions) == 1:
+            conditions.append("CICS_REGION = ?")
+        elif regions:
+            conditions.append(f"CICS_REGION IN ({', '.join('?' * len(regions))})")
+        params.extend(regions)
 
         if program:
-            conditions.append("PROGRAM_NAME LIKE ?")
-            params.append(f"%{program}%")
+            predicate, program_params = self._program_filter(program)
+            conditions.append(predicate)
+            params.extend(program_params)
+
+        direction = "DESC"
+        if after is not None:
+            predicate, keyset_params = keyset_predicate(self.abend_keyset_columns, after, "<")
+            conditions.append(predicate)
+            params.extend(keyset_params)
+        elif before is not None:
+            predicate, keyset_params = keyset_predicate(self.abend_keyset_columns, before, ">")
+            conditions.append(predicate)
+            params.extend(keyset_params)
+            direction = "ASC"
 
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
 
-        query += " ORDER BY TIMESTAMP DESC"
+        query += " ORDER BY " + ", ".join(
+            f"{column} {direction}" for column in self.abend_keyset_columns
+        )
 
-        return self.execute_query(query, tuple(params) if params else None)
+        return query, tuple(params) if params else None
 
     def close(self):
         """Cierra el gestor y todas sus conexiones"""
         logger.info("Cerrando ODBCManager")
+        self.cursors.close_all()
         self.pool.close_all()
 
 
@@ -383,6 +1775,9 @@ def get_odbc_manager() -> ODBCManager:
     if _odbc_manager is None:
         settings = get_settings()
         _odbc_manager = ODBCManager(pool_size=settings.pool_size)
-        _odbc_manager.initialize()
+        if settings.pool_lazy_init:
+            _odbc_manager.initialize_in_background()
+        else:
+            _odbc_manager.initialize()
 
     return _odbc_manager
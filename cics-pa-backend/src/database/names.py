@@ -0,0 +1,157 @@
+"""
+Índice local de nombres de programa y de transacción.
+
+Guarda los valores distintos vistos en CICS_ABENDS en una lista ordenada
+(búsqueda por prefijo con bisect) y en un índice de trigramas (búsqueda
+por subcadena). Permite responder el autocompletado sin consultar DVM y
+traducir el filtro `PROGRAM_NAME LIKE '%x%'`, que ningún índice puede
+resolver, en un `PROGRAM_NAME IN (...)` sobre los nombres que contienen x.
+
+Se llena con un SELECT DISTINCT periódico y con los valores nuevos que ve
+el ingestor incremental. Los nombres no se eliminan: un nombre sin abends
+en un IN no cambia el resultado.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..core.metrics import name_index_entries
+
+
+def _trigrams(value: str) -> Set[str]:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class NameIndex:
+    """
+    Valores distintos de una columna con búsqueda por prefijo y subcadena.
+
+    `covered_until` indica hasta qué TIMESTAMP están todos los valores de
+    la tabla en el índice (None hasta la primera carga completa). Los
+    abends posteriores pueden tener nombres aún no indexados.
+
+    Thread-safe: se actualiza desde el event loop y se consulta desde los
+    workers ODBC al construir queries.
+    """
+
+    def __init__(self, column: str):
+        self.column = column
+        self._lock = threading.Lock()
+        self._names: List[str] = []  # Ordenados
+        self._known: Set[str] = set()
+        self._trigrams: Dict[str, Set[str]] = {}
+        self.covered_until: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def ready(self) -> bool:
+        """True si el índice tuvo al menos una carga completa"""
+        return self.covered_until is not None
+
+    def add(self, values: Iterable[Optional[str]]) -> int:
+        """
+        Agrega valores (sin relleno CHAR; None y vacíos se ignoran).
+
+        Returns:
+            Número de valores nuevos
+        """
+        new = {str(value).strip() for value in values if value is not None} - self._known
+        new.discard("")
+        if not new:
+            return 0
+
+        with self._lock:
+            for name in new:
+                if name in self._known:
+                    continue
+                self._known.add(name)
+                insort(self._names, name)
+                for trigram in _trigrams(name):
+                    self._trigrams.setdefault(trigram, set()).add(name)
+            name_index_entries.labels(column=self.column).set(len(self._names))
+        return len(new)
+
+    def load(self, values: Iterable[Optional[str]], covered_until: datetime) -> int:
+        """
+        Carga completa: agrega todos los valores distintos de la tabla.
+
+        Args:
+            values: Resultado de SELECT DISTINCT
+            covered_until: TIMESTAMP hasta el que la carga es completa
+
+        Returns:
+            Número de valores nuevos
+        """
+        added = self.add(values)
+        self.advance(covered_until, force=True)
+        return added
+
+    def advance(self, until: datetime, force: bool = False):
+        """
+        Extiende la cobertura con valores ya agregados hasta `until`.
+
+        Sin `force` solo tiene efecto tras una carga completa: el ingestor
+        aporta los nombres nuevos pero no los anteriores a su backfill.
+        """
+        with self._lock:
+            if self.covered_until is None and not force:
+                return
+            if self.covered_until is None or until > self.covered_until:
+                self.covered_until = until
+
+    def _containing(self, term: str) -> List[str]:
+        """Nombres que contienen `term` (con el lock tomado)"""
+        if len(term) < 3:
+            candidates: Iterable[str] = self._names
+        else:
+            sets = []
+            for trigram in _trigrams(term):
+                names = self._trigrams.get(trigram)
+                if not names:
+                    return []
+                sets.append(names)
+            sets.sort(key=len)
+            candidates = set.intersection(*sets)
+        return sorted(name for name in candidates if term in name)
+
+    def containing(self, term: str) -> Optional[List[str]]:
+        """
+        Nombres que contienen `term`.
+
+        Returns:
+            Lista ordenada, o None si el índice aún no está completo
+        """
+        with self._lock:
+            if self.covered_until is None:
+                return None
+            return self._containing(term)
+
+    def suggest(self, term: str, limit: int = 20) -> List[str]:
+        """
+        Autocompletado: primero los nombres que empiezan por `term` y luego
+        el resto de los que lo contienen, en orden alfabético.
+
+        Args:
+            term: Texto escrito por el usuario
+            limit: Sugerencias máximas
+
+        Returns:
+            Lista de nombres
+        """
+        with self._lock:
+            names = self._names
+            suggestions = []
+            i = bisect_left(names, term)
+            while i < len(names) and len(suggestions) < limit and names[i].startswith(term):
+                suggestions.append(names[i])
+                i += 1
+
+            if len(suggestions) < limit and term:
+                suggestions += [
+                    name for name in self._containing(term) if not name.startswith(term)
+                ][:limit - len(suggestions)]
+
+        return suggestions
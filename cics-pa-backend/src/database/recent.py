@@ -0,0 +1,354 @@
+"""
+Almacén en memoria de los abends recientes.
+
+Guarda las filas de las últimas horas de CICS_ABENDS en un buffer circular
+columnar: TIMESTAMP como array datetime64 ordenado, región/programa/código
+codificados con diccionario y el resto de columnas como arrays de objetos.
+Índices secundarios por región, programa y código de abend permiten
+responder las páginas de abends sin consultar DVM.
+
+Las filas llegan del ingestor incremental en orden ascendente de keyset,
+por lo que el contenido es siempre un rango contiguo de keyset: una página
+es exacta si se completa con filas del almacén.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core import get_logger
+from ..core.metrics import cache_hits_total, cache_misses_total, cache_entries
+
+logger = get_logger(__name__)
+
+CACHE_NAME = "recent_abends"
+
+# Columnas codificadas con diccionario, con índice secundario
+ENCODED_COLUMNS = ("CICS_REGION", "PROGRAM_NAME", "ABEND_CODE")
+
+_INITIAL_CAPACITY = 1024
+
+
+class _Dictionary:
+    """Codificación valor <-> código de una columna de baja cardinalidad"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+
+    def encode(self, column: Sequence[Any]) -> np.ndarray:
+        codes = self.codes
+        values = self.values
+        encoded = np.empty(len(column), dtype=np.int32)
+        for i, value in enumerate(column):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(values)
+                values.append(value)
+            encoded[i] = code
+        return encoded
+
+    def matching(self, predicate) -> List[int]:
+        """Códigos cuyo valor (sin relleno CHAR) cumple el predicado"""
+        return [
+            code for code, value in enumerate(self.values)
+            if value is not None and predicate(str(value).strip())
+        ]
+
+
+class RecentAbendStore:
+    """
+    Buffer circular columnar de abends recientes con índices secundarios.
+
+    - `max_rows`: filas máximas; al superarlas se descartan las más antiguas.
+    - `retention`: antigüedad máxima de las filas respecto del horizonte.
+    - `max_staleness`: si el ingestor no avanza el horizonte en este
+      tiempo, el almacén deja de responder.
+
+    Thread-safe: el ingestor escribe desde el event loop y las consultas se
+    ejecutan en los workers ODBC.
+    """
+
+    def __init__(
+        self,
+        keyset_columns: Sequence[str],
+        max_rows: int,
+        retention: timedelta,
+        max_staleness: timedelta
+    ):
+        self.keyset_columns = [column.upper() for column in keyset_columns]
+        self.max_rows = max_rows
+        self.retention = retention
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._columns: Optional[List[str]] = None
+        self._arrays: List[np.ndarray] = []
+        self._dictionaries: Dict[int, _Dictionary] = {}
+        # Índice secundario: columna -> código -> ids absolutos ascendentes
+        self._index: Dict[int, Dict[int, List[int]]] = {}
+        self._timestamp_index = 0
+        self._keyset_indexes: List[int] = []
+        self._base = 0  # id absoluto de la posición 0 de los arrays
+        self._start = 0
+        self._end = 0
+        self._horizon: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def clear(self):
+        """Descarta todas las filas"""
+        with self._lock:
+            self._reset()
+            cache_entries.labels(cache=CACHE_NAME).set(0)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def _initialize(self, columns: List[str]):
+        upper = [column.upper() for column in columns]
+        self._columns = list(columns)
+        self._timestamp_index = upper.index("TIMESTAMP")
+        self._keyset_indexes = [upper.index(column) for column in self.keyset_columns]
+        self._arrays = []
+        # La capacidad nunca supera max_rows: un array lleno implica descartar
+        capacity = min(_INITIAL_CAPACITY, self.max_rows)
+        for i, column in enumerate(upper):
+            if i == self._timestamp_index:
+                dtype = "datetime64[us]"
+            elif column in ENCODED_COLUMNS:
+                dtype = np.int32
+                self._dictionaries[i] = _Dictionary()
+                self._index[i] = {}
+            else:
+                dtype = object
+            self._arrays.append(np.empty(capacity, dtype=dtype))
+
+    def _make_room(self, count: int):
+        """Compacta, crece o descarta las filas más antiguas para `count` filas"""
+        capacity = len(self._arrays[0])
+        if self._end + count <= capacity:
+            return
+
+        overflow = len(self) + count - self.max_rows
+        if overflow > 0:
+            self._start += min(overflow, len(self))
+
+        size = len(self)
+        needed = size + count
+        if needed > capacity:
+            capacity = min(self.max_rows, max(capacity * 2, needed))
+            self._arrays = [
+                np.concatenate([array[self._start:self._end], np.empty(capacity - size, array.dtype)])
+                for array in self._arrays
+            ]
+        else:
+            for array in self._arrays:
+                array[:size] = array[self._start:self._end]
+
+        self._base += self._start
+        self._start, self._end = 0, size
+        self._trim_indexes()
+
+    def _trim_indexes(self):
+        """Elimina de los índices los ids ya descartados"""
+        first = self._base + self._start
+        for index in self._index.values():
+            for code in list(index):
+                ids = index[code]
+                cut = bisect_left(ids, first)
+                if cut == len(ids):
+                    del index[code]
+                elif cut:
+                    del ids[:cut]
+
+    def append(self, columns: List[str], rows: Sequence[Sequence[Any]]):
+        """
+        Agrega filas nuevas, en orden ascendente de keyset.
+
+        Args:
+            columns: Nombres de columnas de las filas
+            rows: Filas (pyodbc.Row o tuplas)
+        """
+        if not rows:
+            return
+
+        with self._lock:
+            if self._columns != list(columns):
+                if self._columns is not None:
+                    logger.info("Columnas de abends distintas: se reinicia el almacén reciente")
+                self._reset()
+                self._initialize(list(columns))
+
+            rows = rows[-self.max_rows:]
+            count = len(rows)
+            self._make_room(count)
+
+            first_id = self._base + self._end
+            ids = np.arange(first_id, first_id + count)
+            values = list(zip(*rows))
+            target = slice(self._end, self._end + count)
+
+            for i, column in enumerate(values):
+                dictionary = self._dictionaries.get(i)
+                if dictionary is not None:
+                    codes = dictionary.encode(column)
+                    self._arrays[i][target] = codes
+                    index = self._index[i]
+                    for code in np.unique(codes).tolist():
+                        index.setdefault(code, []).extend(ids[codes == code].tolist())
+                elif i == self._timestamp_index:
+                    self._arrays[i][target] = np.asarray(column, dtype="datetime64[us]")
+                else:
+                    self._arrays[i][target] = column
+
+            self._end += count
+            cache_entries.labels(cache=CACHE_NAME).set(len(self))
+
+    def advance(self, horizon: datetime):
+        """
+        Registra hasta qué TIMESTAMP está completo el almacén y descarta
+        las filas fuera de la retención.
+
+        Args:
+            horizon: Horizonte del último sondeo del ingestor
+        """
+        with self._lock:
+            self._horizon = horizon
+            if not len(self):
+                return
+            timestamps = self._arrays[self._timestamp_index][self._start:self._end]
+            cutoff = np.datetime64(horizon - self.retention, "us")
+            expired = int(np.searchsorted(timestamps, cutoff, side="left"))
+            if expired:
+                self._start += expired
+                cache_entries.labels(cache=CACHE_NAME).set(len(self))
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def _value(self, column: int, position: int) -> Any:
+        value = self._arrays[column][position]
+        dictionary = self._dictionaries.get(column)
+        if dictionary is not None:
+            return dictionary.values[value]
+        if column == self._timestamp_index:
+            return value.item()
+        return value
+
+    def _key(self, position: int) -> Tuple[Any, ...]:
+        return tuple(self._value(column, position) for column in self._keyset_indexes)
+
+    def _row(self, position: int) -> Tuple[Any, ...]:
+        return tuple(self._value(column, position) for column in range(len(self._columns)))
+
+    def _indexed_positions(self, column: int, codes: List[int]) -> np.ndarray:
+        """Posiciones vigentes de las filas con alguno de los códigos"""
+        first = self._base + self._start
+        index = self._index[column]
+        parts = []
+        for code in codes:
+            ids = index.get(code)
+            if ids:
+                parts.append(np.asarray(ids[bisect_left(ids, first):], dtype=np.int64))
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        ids = parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+        return ids - self._base
+
+    def _candidates(self, region: Optional[str], program: Optional[str]) -> Sequence[int]:
+        """Posiciones ordenadas por keyset que cumplen los filtros"""
+        upper = [column.upper() for column in self._columns]
+        positions: Optional[np.ndarray] = None
+
+        if region:
+            column = upper.index("CICS_REGION")
+            wanted = region.strip()
+            codes = self._dictionaries[column].matching(lambda value: value == wanted)
+            positions = self._indexed_positions(column, codes)
+
+        if program:
+            column = upper.index("PROGRAM_NAME")
+            codes = self._dictionaries[column].matching(lambda value: program in value)
+            matches = self._indexed_positions(column, codes)
+            positions = matches if positions is None else np.intersect1d(
+                positions, matches, assume_unique=True
+            )
+
+        if positions is None:
+            return range(self._start, self._end)
+        return positions.tolist()
+
+    def _fresh(self) -> bool:
+        if self._horizon is None or not len(self):
+            return False
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return now - self._horizon <= self.max_staleness
+
+    def query(
+        self,
+        region: Optional[str] = None,
+        program: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Sequence[Any]] = None,
+        before: Optional[Sequence[Any]] = None
+    ) -> Optional[Tuple[List[str], List[Tuple[Any, ...]]]]:
+        """
+        Responde la misma consulta que ODBCManager.build_abends_query.
+
+        Retorna None si el almacén no puede garantizar el resultado exacto
+        (no está al día, la página llega más atrás que la fila más antigua
+        retenida o el filtro de programa usa comodines SQL).
+
+        Args:
+            region: Región CICS (opcional)
+            program: Subcadena del nombre de programa (opcional)
+            limit: Filas máximas
+            after: Filas anteriores a esta clave de keyset, en orden DESC
+            before: Filas posteriores a esta clave de keyset, en orden ASC
+
+        Returns:
+            Tupla (columnas, filas) o None
+        """
+        if program and ("%" in program or "_" in program):
+            return None
+
+        with self._lock:
+            if not self._fresh():
+                cache_misses_total.labels(cache=CACHE_NAME).inc()
+                return None
+
+            candidates = self._candidates(region, program)
+
+            if before is not None:
+                # Todas las filas posteriores a `before` están retenidas solo si
+                # `before` no es anterior a la primera fila del almacén
+                if tuple(before) < self._key(self._start):
+                    cache_misses_total.labels(cache=CACHE_NAME).inc()
+                    return None
+                low = bisect_right(candidates, tuple(before), key=self._key)
+                selected = candidates[low:low + limit]
+            else:
+                high = len(candidates)
+                if after is not None:
+                    high = bisect_left(candidates, tuple(after), key=self._key)
+                if high < limit:
+                    # Puede haber filas más antiguas que la retención
+                    cache_misses_total.labels(cache=CACHE_NAME).inc()
+                    return None
+                selected = candidates[high - limit:high][::-1]
+
+            rows = [self._row(position) for position in selected]
+            columns = list(self._columns)
+
+        cache_hits_total.labels(cache=CACHE_NAME).inc()
+        return columns, rows
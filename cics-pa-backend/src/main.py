@@ -7,15 +7,19 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from datetime import datetime
+import time
 
 from .core import get_settings, get_logger
-from .core.metrics import initialize_metrics
+from .core.metrics import initialize_metrics, record_startup_phase
 from .core.middleware import (
     PrometheusMetricsMiddleware,
     SystemMetricsMiddleware,
     RequestLoggingMiddleware
 )
-from .database import get_odbc_manager
+from .database import get_odbc_manager, get_odbc_executor
+from .services.freshness import get_watermark_probe
+from .services.ingest import get_abend_ingester
+from .services.names import get_name_index_refresher
 from .api import health, tables, query, metrics
 
 logger = get_logger(__name__)
@@ -31,29 +35,54 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("=== Iniciando CICS PA Backend ===")
     settings = get_settings()
+    startup_time = time.perf_counter()
 
     try:
         # Inicializar métricas de Prometheus
         logger.info("Inicializando métricas de Prometheus...")
+        phase_time = time.perf_counter()
         initialize_metrics(settings.app_name, settings.app_version)
+        record_startup_phase('metrics', time.perf_counter() - phase_time)
         logger.info("Métricas inicializadas correctamente")
 
         # Inicializar pool de conexiones ODBC
+        # Con POOL_LAZY_INIT el pool se calienta en segundo plano
         logger.info("Inicializando pool de conexiones ODBC...")
+        phase_time = time.perf_counter()
         odbc_manager = get_odbc_manager()
-        logger.info("Pool ODBC inicializado correctamente")
+        record_startup_phase('odbc_manager', time.perf_counter() - phase_time)
+        if settings.pool_lazy_init:
+            logger.info("Pool ODBC calentándose en segundo plano")
+        else:
+            logger.info("Pool ODBC inicializado correctamente")
+
+        # Sonda de frescura: invalida la caché de abends por región
+        get_watermark_probe().start()
+        # Agregados de abends en memoria para el resumen
+        get_abend_ingester().start()
+        # Índice de nombres para el autocompletado y los filtros de programa
+        get_name_index_refresher().start()
 
     except Exception as e:
         logger.error(f"Error inicializando aplicación: {e}")
         raise
 
-    logger.info(f"Aplicación iniciada: {settings.app_name} v{settings.app_version}")
+    startup_duration = time.perf_counter() - startup_time
+    record_startup_phase('total', startup_duration)
+    logger.info(
+        f"Aplicación iniciada: {settings.app_name} v{settings.app_version} "
+        f"en {startup_duration:.2f}s"
+    )
 
     yield
 
     # Shutdown
     logger.info("=== Cerrando CICS PA Backend ===")
     try:
+        await get_watermark_probe().stop()
+        await get_abend_ingester().stop()
+        await get_name_index_refresher().stop()
+        get_odbc_executor().shutdown()
         odbc_manager = get_odbc_manager()
         odbc_manager.close()
         logger.info("Conexiones cerradas correctamente")
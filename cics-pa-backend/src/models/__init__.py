@@ -2,27 +2,55 @@
 Módulo models - Modelos Pydantic para validación
 """
 from .schemas import (
+    ResponseFormat,
+    ExportFormat,
+    TimeseriesGroupBy,
+    TopAbendsWindow,
+    TopAbendsDimension,
+    NameField,
     QueryRequest,
+    ContinueQueryRequest,
     AbendsFilterRequest,
     TableInfoRequest,
     ColumnInfo,
     TableInfoResponse,
     QueryResponse,
+    ColumnarQueryResponse,
     AbendRecord,
     AbendsResponse,
+    ColumnarAbendsResponse,
+    TimeseriesResponse,
+    HeavyHitterItem,
+    TopAbendsResponse,
+    DistinctCountsResponse,
+    NameSuggestionsResponse,
     HealthResponse,
     ErrorResponse,
 )
 
 __all__ = [
+    "ResponseFormat",
+    "ExportFormat",
+    "TimeseriesGroupBy",
+    "TopAbendsWindow",
+    "TopAbendsDimension",
+    "NameField",
     "QueryRequest",
+    "ContinueQueryRequest",
     "AbendsFilterRequest",
     "TableInfoRequest",
     "ColumnInfo",
     "TableInfoResponse",
     "QueryResponse",
+    "ColumnarQueryResponse",
     "AbendRecord",
     "AbendsResponse",
+    "ColumnarAbendsResponse",
+    "TimeseriesResponse",
+    "HeavyHitterItem",
+    "TopAbendsResponse",
+    "DistinctCountsResponse",
+    "NameSuggestionsResponse",
     "HealthResponse",
     "ErrorResponse",
 ]
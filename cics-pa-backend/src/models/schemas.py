@@ -3,8 +3,53 @@ Modelos Pydantic para validación de requests y responses.
 Define la estructura de datos de la API.
 """
 from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
+from enum import Enum
+
+
+# ========== Enums ==========
+
+class ResponseFormat(str, Enum):
+    """Formas de la respuesta JSON"""
+    JSON = "json"  # Lista de objetos (una clave por columna en cada registro)
+    COLUMNAR = "columnar"  # Columnas una sola vez y registros como arrays
+
+
+class ExportFormat(str, Enum):
+    """Formatos de exportación en streaming"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+    ARROW = "arrow"  # Apache Arrow IPC stream (requiere pyarrow)
+    PARQUET = "parquet"  # Apache Parquet (requiere pyarrow)
+
+
+class TimeseriesGroupBy(str, Enum):
+    """Dimensión por la que se separan las series de abends"""
+    NONE = "none"  # Una sola serie con el total
+    REGION = "region"
+    PROGRAM = "program"
+    ABEND_CODE = "abend_code"
+
+
+class TopAbendsWindow(str, Enum):
+    """Ventana del top-K aproximado de abends"""
+    DAY = "24h"
+    WEEK = "7d"
+    MONTH = "30d"
+
+
+class TopAbendsDimension(str, Enum):
+    """Dimensión del top-K aproximado de abends"""
+    PROGRAM = "program"
+    TRANSACTION = "transaction"
+    ABEND_CODE = "abend_code"
+
+
+class NameField(str, Enum):
+    """Columna del autocompletado de nombres"""
+    PROGRAM = "program"
+    TRANSACTION = "transaction"
 
 
 # ========== Request Models ==========
@@ -13,7 +58,16 @@ class QueryRequest(BaseModel):
     """Request para ejecutar una query personalizada"""
     query: str = Field(..., description="SQL query a ejecutar", min_length=1)
     params: Optional[List[Any]] = Field(None, description="Parámetros de la query")
-    fetch_all: bool = Field(True, description="Traer todos los resultados")
+    fetch_all: bool = Field(
+        True,
+        description="Traer todos los resultados; si es False se pagina con continuation_token"
+    )
+    page_size: int = Field(
+        1000,
+        description="Registros por página cuando fetch_all es False",
+        ge=1,
+        le=10000
+    )
 
     @validator('query')
     def validate_query(cls, v):
@@ -37,18 +91,38 @@ class QueryRequest(BaseModel):
         }
 
 
+class ContinueQueryRequest(BaseModel):
+    """Request para leer la siguiente página de una query paginada"""
+    continuation_token: str = Field(..., description="Token de la respuesta anterior", min_length=1)
+    page_size: int = Field(1000, description="Registros por página", ge=1, le=10000)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "continuation_token": "mJ3c2Vf0n0aXQpZ3V1rX8Kx0d5bQyV7e",
+                "page_size": 1000
+            }
+        }
+
+
 class AbendsFilterRequest(BaseModel):
     """Request para filtrar abends"""
-    region: Optional[str] = Field(None, description="Región CICS")
+    region: Optional[Union[str, List[str]]] = Field(
+        None,
+        description="Región CICS o lista de regiones (consultadas en paralelo)"
+    )
     program: Optional[str] = Field(None, description="Nombre del programa")
     limit: int = Field(100, description="Límite de registros", ge=1, le=1000)
+    after: Optional[str] = Field(None, description="next_cursor de la página anterior")
+    before: Optional[str] = Field(None, description="prev_cursor de la página anterior")
 
     class Config:
         json_schema_extra = {
             "example": {
                 "region": "PROD01",
                 "program": "PAYROLL",
-                "limit": 50
+                "limit": 50,
+                "after": None
             }
         }
 
@@ -70,7 +144,7 @@ class TableInfoRequest(BaseModel):
 class ColumnInfo(BaseModel):
     """Información de una columna"""
     name: str = Field(..., description="Nombre de la columna")
-    type: str = Field(..., description="Tipo de dato")
+    type: str = Field(..., description="Tipo de dato SQL según el catálogo ODBC")
     size: Optional[int] = Field(None, description="Tamaño de la columna")
     nullable: bool = Field(..., description="Permite valores NULL")
 
@@ -88,13 +162,13 @@ class TableInfoResponse(BaseModel):
                 "columns": [
                     {
                         "name": "TIMESTAMP",
-                        "type": "datetime",
+                        "type": "TIMESTAMP",
                         "size": None,
                         "nullable": False
                     },
                     {
                         "name": "CICS_REGION",
-                        "type": "str",
+                        "type": "CHAR",
                         "size": 8,
                         "nullable": False
                     }
@@ -110,6 +184,10 @@ class QueryResponse(BaseModel):
     data: List[Dict[str, Any]] = Field(..., description="Datos retornados")
     row_count: int = Field(..., description="Número de registros")
     execution_time_ms: Optional[float] = Field(None, description="Tiempo de ejecución en ms")
+    continuation_token: Optional[str] = Field(
+        None,
+        description="Token para leer la siguiente página; None si no quedan registros"
+    )
 
     class Config:
         json_schema_extra = {
@@ -124,7 +202,35 @@ class QueryResponse(BaseModel):
                     }
                 ],
                 "row_count": 1,
-                "execution_time_ms": 125.5
+                "execution_time_ms": 125.5,
+                "continuation_token": None
+            }
+        }
+
+
+class ColumnarQueryResponse(BaseModel):
+    """Response de query en formato columnar"""
+    success: bool = Field(..., description="Indicador de éxito")
+    columns: List[str] = Field(..., description="Nombres de columnas")
+    rows: List[List[Any]] = Field(..., description="Registros como arrays en el orden de columns")
+    row_count: int = Field(..., description="Número de registros")
+    execution_time_ms: Optional[float] = Field(None, description="Tiempo de ejecución en ms")
+    continuation_token: Optional[str] = Field(
+        None,
+        description="Token para leer la siguiente página; None si no quedan registros"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "columns": ["TIMESTAMP", "CICS_REGION", "PROGRAM_NAME", "ABEND_CODE"],
+                "rows": [
+                    ["2024-11-09T10:30:00", "PROD01", "PAYROLL", "ASRA"]
+                ],
+                "row_count": 1,
+                "execution_time_ms": 125.5,
+                "continuation_token": None
             }
         }
 
@@ -161,6 +267,14 @@ class AbendsResponse(BaseModel):
     abends: List[Dict[str, Any]]
     total: int
     filters_applied: Dict[str, Any]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor `after` para la página de abends más antiguos"
+    )
+    prev_cursor: Optional[str] = Field(
+        None,
+        description="Cursor `before` para la página de abends más recientes"
+    )
 
     class Config:
         json_schema_extra = {
@@ -179,11 +293,192 @@ class AbendsResponse(BaseModel):
                     "region": "PROD01",
                     "program": None,
                     "limit": 100
+                },
+                "next_cursor": "W3siZHQiOiIyMDI0LTExLTA5VDEwOjMwOjAwIn0sIlBST0QwMSIsIlBBWTEiXQ",
+                "prev_cursor": None
+            }
+        }
+
+
+class ColumnarAbendsResponse(BaseModel):
+    """Response para listado de abends en formato columnar"""
+    success: bool
+    columns: List[str]
+    rows: List[List[Any]]
+    total: int
+    filters_applied: Dict[str, Any]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor `after` para la página de abends más antiguos"
+    )
+    prev_cursor: Optional[str] = Field(
+        None,
+        description="Cursor `before` para la página de abends más recientes"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "columns": ["TIMESTAMP", "CICS_REGION", "PROGRAM_NAME", "ABEND_CODE"],
+                "rows": [
+                    ["2024-11-09T10:30:00", "PROD01", "PAYROLL", "ASRA"]
+                ],
+                "total": 1,
+                "filters_applied": {
+                    "region": "PROD01",
+                    "program": None,
+                    "limit": 100
+                },
+                "next_cursor": "W3siZHQiOiIyMDI0LTExLTA5VDEwOjMwOjAwIn0sIlBST0QwMSIsIlBBWTEiXQ",
+                "prev_cursor": None
+            }
+        }
+
+
+class TimeseriesResponse(BaseModel):
+    """Response para la serie temporal de abends"""
+    success: bool
+    bucket_seconds: int = Field(..., description="Tamaño de cada intervalo en segundos")
+    start: datetime = Field(..., description="Inicio del primer intervalo (UTC)")
+    end: datetime = Field(..., description="Fin del último intervalo (UTC, exclusivo)")
+    group_by: TimeseriesGroupBy
+    buckets: List[datetime] = Field(..., description="Inicio de cada intervalo")
+    series: Dict[str, List[int]] = Field(
+        ...,
+        description="Conteos por grupo, un valor por intervalo (0 si no hubo abends)"
+    )
+    total: int = Field(..., description="Total de abends en el rango")
+    source: str = Field(..., description="Dónde se agrupó: 'sql' o 'numpy'")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "bucket_seconds": 3600,
+                "start": "2024-11-09T08:00:00",
+                "end": "2024-11-09T11:00:00",
+                "group_by": "region",
+                "buckets": [
+                    "2024-11-09T08:00:00",
+                    "2024-11-09T09:00:00",
+                    "2024-11-09T10:00:00"
+                ],
+                "series": {
+                    "PROD01": [4, 0, 7],
+                    "PROD02": [1, 2, 0]
+                },
+                "total": 14,
+                "source": "sql"
+            }
+        }
+
+
+class HeavyHitterItem(BaseModel):
+    """Elemento del top-K con su cota de error"""
+    name: str
+    count: int = Field(..., description="Conteo estimado (cota superior)")
+    error: int = Field(..., description="Error máximo: el conteo real es al menos count - error")
+    guaranteed: bool = Field(..., description="Seguro dentro del top-K pese al error")
+
+
+class TopAbendsResponse(BaseModel):
+    """Response para el top-K aproximado de abends"""
+    success: bool
+    window: TopAbendsWindow
+    dimension: TopAbendsDimension
+    region: Optional[str] = None
+    start: datetime = Field(..., description="Inicio de la ventana, alineado a hora o día (UTC)")
+    end: datetime = Field(..., description="Horizonte de ingesta (UTC)")
+    complete: bool = Field(
+        ...,
+        description="False si la ingesta empezó después del inicio de la ventana"
+    )
+    capacity: int = Field(..., description="Contadores por sketch")
+    items: List[HeavyHitterItem]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "window": "7d",
+                "dimension": "program",
+                "region": "PROD01",
+                "start": "2024-11-03T00:00:00",
+                "end": "2024-11-09T10:15:00",
+                "complete": True,
+                "capacity": 200,
+                "items": [
+                    {"name": "PAYMT01", "count": 5120, "error": 0, "guaranteed": True},
+                    {"name": "ACCTINQ", "count": 987, "error": 12, "guaranteed": True}
+                ]
+            }
+        }
+
+
+class DistinctCountsResponse(BaseModel):
+    """Response para el conteo aproximado de valores distintos de abends"""
+    success: bool
+    region: Optional[str] = None
+    hours: int = Field(..., description="Ventana solicitada en horas")
+    start: datetime = Field(..., description="Inicio efectivo, alineado a hora o día (UTC)")
+    end: datetime = Field(..., description="Horizonte de ingesta (UTC)")
+    complete: bool = Field(
+        ...,
+        description="False si la ventana empieza antes de la ingesta o de la retención (30 días)"
+    )
+    relative_error: float = Field(..., description="Error relativo típico de cada conteo")
+    counts: Dict[str, int] = Field(
+        ...,
+        description="Valores distintos de programs, transactions, users y terminals"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "region": "PROD01",
+                "hours": 168,
+                "start": "2024-11-02T00:00:00",
+                "end": "2024-11-09T10:15:00",
+                "complete": True,
+                "relative_error": 0.01625,
+                "counts": {
+                    "programs": 412,
+                    "transactions": 1380,
+                    "users": 9750,
+                    "terminals": 2214
                 }
             }
         }
 
 
+class NameSuggestionsResponse(BaseModel):
+    """Response para el autocompletado de nombres de programa o transacción"""
+    success: bool
+    field: NameField
+    query: str = Field(..., description="Texto buscado")
+    names: List[str] = Field(
+        ...,
+        description="Nombres que empiezan por el texto y luego los que lo contienen"
+    )
+    complete: bool = Field(
+        ...,
+        description="False si el índice aún no tuvo una carga completa desde DVM"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "field": "program",
+                "query": "PAY",
+                "names": ["PAYROLL", "PAYSLIP", "EMPPAY01"],
+                "complete": True
+            }
+        }
+
+
 class HealthResponse(BaseModel):
     """Response para health check"""
     status: str = Field(..., description="Estado del servicio")
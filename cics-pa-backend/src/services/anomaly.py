@@ -0,0 +1,208 @@
+"""
+Detección incremental de picos en la tasa de abends.
+
+Cuenta los abends ingeridos por (región, código de abend) en intervalos
+fijos según su TIMESTAMP. Al cerrarse cada intervalo actualiza, en O(1)
+por clave, una media y una varianza con pesos exponenciales (EWMA) y
+calcula la puntuación de anomalía del intervalo frente a esa línea base.
+Los resultados se exportan como gauges de Prometheus para que Alertmanager
+avise de tormentas de abends sin ejecutar consultas.
+
+Los totales por región se exportan con abend_code="*".
+"""
+import math
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from ..core import get_logger
+from ..core.metrics import abend_rate, abend_rate_baseline, abend_anomaly_score
+
+logger = get_logger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Código de abend de los totales por región
+ALL_CODES = "*"
+
+# Claves con una media menor que esta (abends por intervalo) se dejan de seguir
+_MIN_MEAN = 0.01
+
+# Clave de una línea base: (región, código de abend)
+RateKey = Tuple[str, str]
+
+
+class RateBaseline:
+    """Media y varianza EWMA de los abends por intervalo de una clave"""
+
+    __slots__ = ("mean", "variance", "samples", "score")
+
+    def __init__(self, samples: int = 0):
+        self.mean = 0.0
+        self.variance = 0.0
+        self.samples = samples
+        self.score = 0.0
+
+    def update(self, count: int, alpha: float, warmup: int) -> float:
+        """
+        Incorpora el conteo de un intervalo cerrado.
+
+        La puntuación compara el conteo con la línea base previa. La
+        desviación tiene como mínimo la de Poisson (sqrt de la media, y al
+        menos un abend) para que un abend aislado no parezca un pico.
+
+        Returns:
+            Puntuación de anomalía (0 durante el calentamiento)
+        """
+        deviation = max(math.sqrt(self.variance), math.sqrt(max(self.mean, 1.0)))
+        self.score = (count - self.mean) / deviation if self.samples >= warmup else 0.0
+
+        diff = count - self.mean
+        increment = alpha * diff
+        self.mean += increment
+        self.variance = (1 - alpha) * (self.variance + diff * increment)
+        self.samples += 1
+        return self.score
+
+
+class AbendRateDetector:
+    """
+    Líneas base EWMA de la tasa de abends por región y código.
+
+    - `interval_seconds`: tamaño de los intervalos de conteo.
+    - `halflife_minutes`: vida media de los pesos de la línea base.
+    - `warmup`: intervalos antes de emitir puntuaciones.
+    - `max_keys`: claves (región, código) seguidas como máximo; limita la
+      cardinalidad de los gauges.
+
+    Pensado para usarse desde el event loop: no es thread-safe.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int,
+        halflife_minutes: float,
+        warmup: int,
+        max_keys: int
+    ):
+        self.interval_seconds = interval_seconds
+        self.alpha = 1 - 0.5 ** (interval_seconds / (halflife_minutes * 60))
+        self.warmup = warmup
+        self.max_keys = max_keys
+        self._baselines: Dict[RateKey, RateBaseline] = {}
+        self._counts: Dict[RateKey, int] = {}
+        self._bucket: Optional[int] = None  # Intervalo abierto
+        self._closed = 0  # Intervalos cerrados desde el inicio
+
+    @property
+    def key_count(self) -> int:
+        """Número de claves seguidas"""
+        return len(self._baselines)
+
+    def bucket_of(self, timestamp: datetime) -> int:
+        """Inicio del intervalo de un TIMESTAMP, en segundos desde epoch"""
+        seconds = int((timestamp - _EPOCH).total_seconds())
+        return seconds - seconds % self.interval_seconds
+
+    def observe(self, timestamp: datetime, region: str, abend_code: str):
+        """
+        Cuenta un abend; los abends deben llegar en orden de TIMESTAMP.
+
+        Args:
+            timestamp: TIMESTAMP del abend
+            region: Región CICS
+            abend_code: Código de abend
+        """
+        bucket = self.bucket_of(timestamp)
+        if self._bucket is None:
+            self._bucket = bucket
+        elif bucket > self._bucket:
+            self._close_until(bucket)
+        # Un abend de un intervalo ya cerrado cuenta en el abierto
+
+        counts = self._counts
+        for key in ((region, abend_code), (region, ALL_CODES)):
+            counts[key] = counts.get(key, 0) + 1
+
+    def advance(self, horizon: datetime):
+        """
+        Cierra los intervalos que terminan antes del horizonte de ingesta.
+
+        Args:
+            horizon: TIMESTAMP hasta el que se ingirieron todos los abends
+        """
+        if self._bucket is None:
+            return
+        self._close_until(self.bucket_of(horizon))
+
+    def _close_until(self, bucket: int):
+        """Cierra el intervalo abierto y los vacíos hasta `bucket`"""
+        while self._bucket < bucket:
+            self._close()
+            self._bucket += self.interval_seconds
+            if not self._baselines:
+                # Sin claves que decaer los intervalos vacíos no cambian nada
+                self._bucket = bucket
+
+    def _close(self):
+        """Actualiza las líneas base con los conteos del intervalo abierto"""
+        counts = self._counts
+        # Tras el calentamiento, una clave nueva tenía tasa 0 en los
+        # intervalos anteriores: puntúa desde su primer intervalo
+        samples = self.warmup if self._closed >= self.warmup else 0
+        for key in counts:
+            if key not in self._baselines:
+                self._baselines[key] = RateBaseline(samples)
+
+        expired = []
+        for key, baseline in self._baselines.items():
+            count = counts.get(key, 0)
+            baseline.update(count, self.alpha, self.warmup)
+            if count == 0 and baseline.mean < _MIN_MEAN:
+                expired.append(key)
+                continue
+            region, code = key
+            abend_rate.labels(region=region, abend_code=code).set(count / self.interval_seconds)
+            abend_rate_baseline.labels(region=region, abend_code=code).set(
+                baseline.mean / self.interval_seconds
+            )
+            abend_anomaly_score.labels(region=region, abend_code=code).set(baseline.score)
+
+        for key in expired:
+            self._forget(key)
+        self._evict()
+        self._counts = {}
+        self._closed += 1
+
+    def _evict(self):
+        """Deja de seguir las claves por código de menor media si sobran"""
+        excess = len(self._baselines) - self.max_keys
+        if excess <= 0:
+            return
+        candidates = sorted(
+            (baseline.mean, key)
+            for key, baseline in self._baselines.items() if key[1] != ALL_CODES
+        )
+        for _, key in candidates[:excess]:
+            self._forget(key)
+        logger.debug(f"Detector de abends: {excess} claves descartadas por ABEND_ANOMALY_MAX_KEYS")
+
+    def _forget(self, key: RateKey):
+        del self._baselines[key]
+        region, code = key
+        for gauge in (abend_rate, abend_rate_baseline, abend_anomaly_score):
+            try:
+                gauge.remove(region, code)
+            except KeyError:
+                pass
+
+    def baseline(self, region: str, abend_code: str = ALL_CODES) -> Optional[RateBaseline]:
+        """Línea base de una clave (None si no se sigue)"""
+        return self._baselines.get((region, abend_code))
+
+    def clear(self):
+        """Descarta las líneas base y sus gauges"""
+        for key in list(self._baselines):
+            self._forget(key)
+        self._counts = {}
+        self._bucket = None
+        self._closed = 0
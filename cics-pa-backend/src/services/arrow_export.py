@@ -0,0 +1,216 @@
+"""
+Exportación de resultados en Apache Arrow IPC y Parquet.
+
+Construye RecordBatches tipados a partir de los lotes de fetchmany,
+usando `cursor.description` para los tipos de columna. pyarrow es una
+dependencia opcional: si no está instalada estos formatos no están
+disponibles.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pq = None
+
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Filas por row group de Parquet: los lotes de fetchmany son pequeños y un
+# row group por lote degradaría la compresión y la lectura
+PARQUET_ROW_GROUP_ROWS = 65536
+
+
+def arrow_available() -> bool:
+    """Indica si pyarrow está instalado"""
+    return pa is not None
+
+
+def arrow_type(column: Sequence[Any]):
+    """
+    Tipo Arrow de una columna a partir de su entrada en cursor.description.
+
+    Args:
+        column: Tupla (name, type_code, display_size, internal_size,
+            precision, scale, null_ok)
+
+    Returns:
+        Tipo de pyarrow
+    """
+    type_code = column[1]
+    precision, scale = column[4], column[5]
+
+    if type_code is bool:
+        return pa.bool_()
+    if type_code is int:
+        return pa.int64()
+    if type_code is float:
+        return pa.float64()
+    if type_code is Decimal:
+        if precision and 0 < precision <= 38 and scale is not None:
+            return pa.decimal128(precision, scale)
+        return pa.string()
+    if type_code is datetime:
+        return pa.timestamp("us")
+    if type_code is date:
+        return pa.date32()
+    if type_code is time:
+        return pa.time64("us")
+    if type_code in (bytes, bytearray):
+        return pa.binary()
+    return pa.string()
+
+
+def arrow_schema(description: Sequence[Sequence[Any]]):
+    """
+    Esquema Arrow de un resultado.
+
+    Args:
+        description: cursor.description
+
+    Returns:
+        pyarrow.Schema
+    """
+    return pa.schema([
+        pa.field(column[0], arrow_type(column), nullable=True)
+        for column in description
+    ])
+
+
+class _ChunkSink:
+    """
+    Destino de escritura en memoria que se vacía tras cada lote.
+
+    Lleva la posición para que ParquetWriter pueda calcular offsets sin
+    necesitar un archivo con seek.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        """Retorna y descarta lo escrito desde la última llamada"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ArrowStreamEncoder:
+    """
+    Codificador incremental de lotes de Rows a Arrow IPC o Parquet.
+
+    Uso:
+        encoder = ArrowStreamEncoder(stream.description, parquet=False)
+        yield encoder.start()
+        for rows in stream:
+            yield encoder.encode(rows)
+        yield encoder.finish()
+    """
+
+    def __init__(self, description: Sequence[Sequence[Any]], parquet: bool = False):
+        if pa is None:
+            raise ImportError("pyarrow no está instalado: formatos Arrow/Parquet no disponibles")
+
+        self.schema = arrow_schema(description)
+        self.parquet = parquet
+        self._sink = _ChunkSink()
+        self._pending: List[Any] = []
+        self._pending_rows = 0
+
+        if parquet:
+            self._writer = pq.ParquetWriter(self._sink, self.schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_stream(
+                self._sink,
+                self.schema,
+                options=pa.ipc.IpcWriteOptions(compression="zstd")
+            )
+
+    def start(self) -> bytes:
+        """
+        Bytes iniciales del stream (esquema Arrow o magic de Parquet).
+
+        Returns:
+            Bytes listos para escribir
+        """
+        return self._sink.drain()
+
+    def _record_batch(self, rows: Sequence[Sequence[Any]]):
+        """Transpone un lote de Rows y lo convierte en un RecordBatch tipado"""
+        columns = list(zip(*rows)) if rows else [()] * len(self.schema)
+        arrays = []
+        for field, values in zip(self.schema, columns):
+            if pa.types.is_string(field.type):
+                values = [None if v is None else str(v) for v in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.record_batch(arrays, schema=self.schema)
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        """
+        Codifica un lote de registros.
+
+        Args:
+            rows: Lote de Rows de fetchmany
+
+        Returns:
+            Bytes listos para escribir (puede ser vacío en Parquet mientras
+            se completa un row group)
+        """
+        batch = self._record_batch(rows)
+
+        if not self.parquet:
+            self._writer.write_batch(batch)
+            return self._sink.drain()
+
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        if self._pending_rows >= PARQUET_ROW_GROUP_ROWS:
+            self._flush_row_group()
+        return self._sink.drain()
+
+    def _flush_row_group(self):
+        """Escribe los lotes acumulados como un row group de Parquet"""
+        if self._pending:
+            self._writer.write_table(pa.Table.from_batches(self._pending, schema=self.schema))
+            self._pending = []
+            self._pending_rows = 0
+
+    def finish(self) -> bytes:
+        """
+        Cierra el writer (footer de Parquet o fin del stream IPC).
+
+        Returns:
+            Bytes restantes
+        """
+        if self.parquet:
+            self._flush_row_group()
+        self._writer.close()
+        return self._sink.drain()
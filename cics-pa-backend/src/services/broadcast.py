@@ -0,0 +1,208 @@
+"""
+Difusión en vivo de abends nuevos por Server-Sent Events.
+
+El ingestor incremental es el único que consulta DVM; cada lote de abends
+nuevos se reparte a todos los clientes conectados según sus filtros de
+región y programa. La carga sobre DVM no depende del número de clientes.
+"""
+import asyncio
+from typing import Any, AsyncIterator, List, Optional, Sequence, Set
+
+from ..core import get_settings, get_logger
+from ..core.metrics import (
+    abend_stream_clients,
+    abend_stream_events_total,
+    abend_stream_dropped_total,
+)
+from ..core.responses import dumps
+from ..database.keyset import encode_cursor, parse_keyset_columns
+
+logger = get_logger(__name__)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Milisegundos que espera EventSource antes de reconectar
+SSE_RETRY_MS = 5000
+
+
+class StreamLimitError(Exception):
+    """Se alcanzó el máximo de clientes conectados al stream"""
+
+
+class AbendSubscriber:
+    """Cliente conectado con sus filtros y su cola de lotes pendientes"""
+
+    __slots__ = ("region", "program", "queue")
+
+    def __init__(self, region: Optional[str], program: Optional[str], queue_size: int):
+        self.region = region.strip() if region else None
+        self.program = program or None
+        # None en la cola indica que el cliente se desconectó por lento
+        self.queue: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue(maxsize=queue_size)
+
+    def matches(self, region: Any, program: Any) -> bool:
+        """Aplica los mismos filtros que /query/abends"""
+        if self.region is not None and (region or "").strip() != self.region:
+            return False
+        if self.program is not None and self.program not in (program or ""):
+            return False
+        return True
+
+
+def format_event(event: str, data: bytes, event_id: Optional[str] = None) -> bytes:
+    """
+    Formatea un evento SSE.
+
+    Args:
+        event: Nombre del evento
+        data: Payload JSON (una sola línea)
+        event_id: id del evento (opcional)
+
+    Returns:
+        Bytes del evento
+    """
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + data + b"\n\n"
+
+
+class AbendBroadcaster:
+    """
+    Reparte lotes de abends nuevos a los clientes suscritos.
+
+    Cada cliente tiene una cola acotada: si no consume a tiempo se le
+    desconecta en lugar de acumular memoria o frenar al resto. Pensado
+    para usarse desde el event loop: no es thread-safe.
+    """
+
+    def __init__(
+        self,
+        keyset_columns: Sequence[str],
+        max_clients: int,
+        queue_size: int,
+        heartbeat: float
+    ):
+        self.keyset_columns = [column.upper() for column in keyset_columns]
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._subscribers: Set[AbendSubscriber] = set()
+
+    @property
+    def clients(self) -> int:
+        """Número de clientes conectados"""
+        return len(self._subscribers)
+
+    def subscribe(
+        self,
+        region: Optional[str] = None,
+        program: Optional[str] = None
+    ) -> AbendSubscriber:
+        """
+        Registra un cliente.
+
+        Raises:
+            StreamLimitError: Si se alcanzó ABEND_STREAM_MAX_CLIENTS
+        """
+        if len(self._subscribers) >= self.max_clients:
+            raise StreamLimitError(
+                f"Máximo de clientes del stream alcanzado ({self.max_clients})"
+            )
+        subscriber = AbendSubscriber(region, program, self.queue_size)
+        self._subscribers.add(subscriber)
+        abend_stream_clients.set(len(self._subscribers))
+        return subscriber
+
+    def unsubscribe(self, subscriber: AbendSubscriber):
+        """Elimina un cliente"""
+        self._subscribers.discard(subscriber)
+        abend_stream_clients.set(len(self._subscribers))
+
+    def _drop(self, subscriber: AbendSubscriber):
+        """Desconecta un cliente lento dejándole solo el aviso de cierre"""
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+        self.unsubscribe(subscriber)
+        abend_stream_dropped_total.inc()
+        logger.warning("Cliente del stream de abends desconectado por no consumir a tiempo")
+
+    def publish(self, columns: List[str], rows: Sequence[Sequence[Any]]):
+        """
+        Reparte un lote de abends nuevos (en orden ascendente de keyset).
+
+        Args:
+            columns: Nombres de columnas
+            rows: Filas
+        """
+        if not self._subscribers or not rows:
+            return
+
+        upper = [column.upper() for column in columns]
+        region_index = upper.index("CICS_REGION")
+        program_index = upper.index("PROGRAM_NAME")
+        keyset_indexes = [upper.index(column) for column in self.keyset_columns]
+
+        for subscriber in list(self._subscribers):
+            matched = [
+                row for row in rows
+                if subscriber.matches(row[region_index], row[program_index])
+            ]
+            if not matched:
+                continue
+            try:
+                subscriber.queue.put_nowait((columns, matched, keyset_indexes))
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    async def events(self, subscriber: AbendSubscriber) -> AsyncIterator[bytes]:
+        """
+        Genera el stream SSE de un cliente hasta que se desconecta.
+
+        Cada evento `abends` lleva las filas nuevas en formato columnar y,
+        como id, el cursor de la más reciente: sirve como `before` en
+        GET /query/abends para recuperar lo perdido tras una reconexión.
+        Entre eventos se envían comentarios keepalive.
+        """
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+
+                if item is None:
+                    yield format_event("overflow", b'{"reason":"slow_consumer"}')
+                    return
+
+                columns, rows, keyset_indexes = item
+                last_key = tuple(rows[-1][i] for i in keyset_indexes)
+                abend_stream_events_total.inc()
+                yield format_event(
+                    "abends",
+                    dumps({"columns": columns, "rows": rows}),
+                    event_id=encode_cursor(last_key)
+                )
+        finally:
+            self.unsubscribe(subscriber)
+
+
+# Instancia global (singleton)
+_abend_broadcaster: Optional[AbendBroadcaster] = None
+
+
+def get_abend_broadcaster() -> AbendBroadcaster:
+    """Obtiene el difusor global de abends"""
+    global _abend_broadcaster
+
+    if _abend_broadcaster is None:
+        settings = get_settings()
+        _abend_broadcaster = AbendBroadcaster(
+            keyset_columns=parse_keyset_columns(settings.abend_keyset_columns),
+            max_clients=settings.abend_stream_max_clients,
+            queue_size=settings.abend_stream_queue_size,
+            heartbeat=settings.abend_stream_heartbeat_seconds
+        )
+
+    return _abend_broadcaster
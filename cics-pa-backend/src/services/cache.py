@@ -0,0 +1,336 @@
+"""
+Caché de resultados en proceso.
+
+Evita repetir contra DVM las mismas consultas de abends que hacen los
+dashboards en polling: los resultados se guardan con TTL en un LRU acotado
+por tamaño estimado en bytes, y las consultas idénticas concurrentes
+comparten una sola ejecución (single-flight).
+"""
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from ..core import get_settings, get_logger
+from ..core.metrics import (
+    cache_hits_total,
+    cache_misses_total,
+    cache_coalesced_total,
+    cache_evictions_total,
+    cache_size_bytes,
+    cache_entries,
+)
+
+logger = get_logger(__name__)
+
+# En colecciones grandes el tamaño se extrapola a partir de una muestra
+_SIZE_SAMPLE = 100
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estima la memoria ocupada por un resultado.
+
+    Recorre colecciones anidadas (listas de Rows, diccionarios) y, en las
+    grandes, extrapola a partir de una muestra de elementos.
+
+    Args:
+        value: Valor a medir
+
+    Returns:
+        Tamaño aproximado en bytes
+    """
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+
+    if isinstance(value, dict):
+        items = list(value.items())
+        if not items:
+            return size
+        sample = items[:_SIZE_SAMPLE]
+        sampled = sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in sample
+        )
+        return size + sampled * len(items) // len(sample)
+
+    if isinstance(value, (list, tuple)) or hasattr(value, "cursor_description"):
+        length = len(value)
+        if not length:
+            return size
+        sample = value[:_SIZE_SAMPLE]
+        sampled = sum(estimate_size(item, _depth + 1) for item in sample)
+        return size + sampled * length // len(sample)
+
+    return size
+
+
+class _CacheEntry:
+    """Resultado cacheado con su tamaño, expiración y etiquetas"""
+
+    __slots__ = ("value", "size", "expires_at", "tags")
+
+    def __init__(self, value: Any, size: int, expires_at: float, tags: Tuple[Hashable, ...]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class ResultCache:
+    """
+    Caché LRU con TTL, acotada por bytes y con single-flight.
+
+    Cada entrada puede llevar etiquetas (por ejemplo la región CICS) para
+    invalidar de una vez todos los resultados afectados por un cambio.
+
+    Pensada para usarse desde el event loop: no es thread-safe.
+
+    Uso:
+        rows = await cache.get_or_load(key, lambda: executor.run(...))
+    """
+
+    def __init__(self, name: str, ttl: float, max_bytes: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._inflight_tags: Dict[Hashable, Tuple[Hashable, ...]] = {}
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Tamaño estimado de los resultados cacheados en bytes"""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _publish(self):
+        cache_size_bytes.labels(cache=self.name).set(self._size)
+        cache_entries.labels(cache=self.name).set(len(self._entries))
+
+    def _evict(self, key: Hashable, reason: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+            for tag in entry.tags:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+            cache_evictions_total.labels(cache=self.name, reason=reason).inc()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Retorna el valor cacheado si sigue vigente.
+
+        Args:
+            key: Clave del resultado
+
+        Returns:
+            Valor cacheado o None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._evict(key, "expired")
+            self._publish()
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[Hashable] = (),
+        ttl: Optional[float] = None
+    ):
+        """
+        Guarda un resultado y aplica los límites de tamaño.
+
+        Los resultados mayores que `max_bytes` no se cachean.
+
+        Args:
+            key: Clave del resultado
+            value: Valor a guardar
+            tags: Etiquetas para invalidate_tag
+            ttl: Vigencia en segundos (por defecto la de la caché)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if self.ttl <= 0 or ttl <= 0:
+            return
+
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Resultado de {size} bytes excede la caché '{self.name}'")
+            return
+
+        if key in self._entries:
+            self._evict(key, "replaced")
+
+        tags = tuple(tags)
+        self._entries[key] = _CacheEntry(value, size, time.monotonic() + ttl, tags)
+        self._size += size
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        if self._size > self.max_bytes:
+            self.purge_expired()
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._evict(oldest, "size")
+
+        self._publish()
+
+    def purge_expired(self) -> int:
+        """
+        Elimina las entradas expiradas.
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._evict(key, "expired")
+        self._publish()
+        return len(expired)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Iterable[Hashable] = (),
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Retorna el resultado cacheado o lo carga una sola vez.
+
+        Si ya hay una carga en curso para la misma clave se espera su
+        resultado en lugar de lanzar otra consulta. La carga sigue aunque
+        la request que la inició se cancele. Los errores no se cachean.
+
+        Args:
+            key: Clave del resultado (hashable)
+            loader: Función que retorna el awaitable que carga el resultado
+            tags: Etiquetas del resultado
+            ttl: Vigencia en segundos (por defecto la de la caché)
+
+        Returns:
+            Resultado cacheado o recién cargado
+        """
+        value = self.get(key)
+        if value is not None:
+            cache_hits_total.labels(cache=self.name).inc()
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            cache_coalesced_total.labels(cache=self.name).inc()
+            return await asyncio.shield(task)
+
+        cache_misses_total.labels(cache=self.name).inc()
+        tags = tuple(tags)
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        self._inflight_tags[key] = tags
+        task.add_done_callback(lambda done: self._on_loaded(key, done, tags, ttl))
+        return await asyncio.shield(task)
+
+    def _on_loaded(
+        self,
+        key: Hashable,
+        task: asyncio.Future,
+        tags: Tuple[Hashable, ...],
+        ttl: Optional[float]
+    ):
+        """Guarda el resultado de una carga si no fue invalidada mientras tanto"""
+        if self._inflight.get(key) is not task:
+            # Invalidada durante la carga: el resultado puede estar obsoleto
+            if not task.cancelled():
+                task.exception()
+            return
+
+        del self._inflight[key]
+        self._inflight_tags.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.set(key, task.result(), tags=tags, ttl=ttl)
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Elimina un resultado y descarta la carga en curso de esa clave.
+
+        Args:
+            key: Clave del resultado
+
+        Returns:
+            True si había un resultado cacheado
+        """
+        self._inflight.pop(key, None)
+        self._inflight_tags.pop(key, None)
+        existed = key in self._entries
+        self._evict(key, "invalidated")
+        self._publish()
+        return existed
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """
+        Elimina los resultados con una etiqueta y descarta sus cargas en curso.
+
+        Args:
+            tag: Etiqueta
+
+        Returns:
+            Número de resultados eliminados
+        """
+        for key, tags in list(self._inflight_tags.items()):
+            if tag in tags:
+                self._inflight.pop(key, None)
+                del self._inflight_tags[key]
+
+        keys = list(self._tags.get(tag, ()))
+        for key in keys:
+            self._evict(key, "invalidated")
+        self._publish()
+        return len(keys)
+
+    def clear(self):
+        """Vacía la caché"""
+        self._inflight.clear()
+        self._inflight_tags.clear()
+        for key in list(self._entries):
+            self._evict(key, "invalidated")
+        self._publish()
+
+
+# Instancia global (singleton)
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Obtiene la caché global de resultados de abends.
+
+    Con CACHE_ENABLED=False no guarda resultados, pero sigue agrupando las
+    consultas idénticas concurrentes.
+    """
+    global _result_cache
+
+    if _result_cache is None:
+        settings = get_settings()
+        _result_cache = ResultCache(
+            name="abends",
+            ttl=settings.cache_ttl_seconds if settings.cache_enabled else 0,
+            max_bytes=settings.cache_max_bytes
+        )
+
+    return _result_cache
@@ -0,0 +1,169 @@
+"""
+Invalidación de la caché de abends por marca de agua.
+
+Una sonda periódica consulta por región el TIMESTAMP más reciente y el
+número de abends desde un inicio fijo reciente. Solo cuando esa marca
+cambia se invalidan los resultados cacheados de la región, de modo que las
+regiones sin actividad se sirven desde caché y las activas se refrescan en
+segundos.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core import get_settings, get_logger
+from ..core.metrics import watermark_probes_total, watermark_region_changes_total
+from ..database import get_odbc_manager, get_odbc_executor, ODBCManager, ODBCExecutor
+from .cache import ResultCache, get_result_cache
+from .ingest import utc_now
+
+logger = get_logger(__name__)
+
+# Etiqueta de los resultados sin filtro de región: cambian con cualquier región
+ALL_REGIONS = "*"
+
+
+def region_tag(region: Optional[str]) -> Tuple[str, str]:
+    """
+    Etiqueta de caché de los resultados de una región.
+
+    Args:
+        region: Región CICS, o None para resultados de todas las regiones
+
+    Returns:
+        Etiqueta para ResultCache
+    """
+    if not region:
+        return ("region", ALL_REGIONS)
+    return ("region", region.strip().upper())
+
+
+class WatermarkProbe:
+    """
+    Sonda de frescura que invalida la caché cuando cambia una región.
+
+    Mientras la sonda tiene una marca de referencia (`active`), los
+    resultados pueden cachearse durante CACHE_WATERMARK_TTL_SECONDS; si la
+    sonda falla se vacía la caché y se vuelve al TTL normal.
+
+    Las marcas se cuentan desde un inicio fijo `window_hours` atrás, que se
+    adelanta cuando queda a más del doble de esa ventana: la query recorre
+    solo un rango reciente del índice de TIMESTAMP y el total no cambia
+    porque los abends antiguos salgan de una ventana móvil.
+    """
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        manager: ODBCManager,
+        executor: ODBCExecutor,
+        interval: float,
+        window_hours: float = 24
+    ):
+        self.cache = cache
+        self.manager = manager
+        self.executor = executor
+        self.interval = interval
+        self.window = timedelta(hours=window_hours)
+        self._since: Optional[datetime] = None
+        self._watermarks: Optional[Dict[str, Tuple[Any, int]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        """True si la sonda tiene una marca de referencia vigente"""
+        return self._watermarks is not None
+
+    async def probe(self) -> List[str]:
+        """
+        Consulta las marcas de agua e invalida las regiones que cambiaron.
+
+        Returns:
+            Regiones cuya marca cambió desde la sonda anterior
+        """
+        now = utc_now()
+        if self._since is None or now - self._since > 2 * self.window:
+            self._since = now - self.window
+            if self._watermarks is not None:
+                # Con otro inicio las marcas no son comparables: se parte de cero
+                self._watermarks = None
+                self.cache.clear()
+                logger.info("Sonda de frescura: inicio de la ventana adelantado, caché vaciada")
+
+        try:
+            current = await self.executor.run(self.manager.get_abend_watermarks, self._since)
+        except Exception as e:
+            watermark_probes_total.labels(status='error').inc()
+            logger.warning(f"Sonda de frescura fallida: {e}")
+            if self._watermarks is not None:
+                # Sin sonda no se puede garantizar la frescura de lo cacheado
+                self._watermarks = None
+                self.cache.clear()
+            return []
+
+        watermark_probes_total.labels(status='success').inc()
+        previous, self._watermarks = self._watermarks, current
+        if previous is None:
+            logger.info(f"Sonda de frescura activa: {len(current)} regiones")
+            return []
+
+        changed = [
+            region for region in previous.keys() | current.keys()
+            if previous.get(region) != current.get(region)
+        ]
+        if changed:
+            for region in changed:
+                self.cache.invalidate_tag(region_tag(region))
+            self.cache.invalidate_tag(region_tag(None))
+            watermark_region_changes_total.inc(len(changed))
+            logger.info(f"Regiones con abends nuevos: {', '.join(sorted(changed))}")
+
+        return changed
+
+    async def _run(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Arranca la sonda en el event loop actual"""
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="abends-watermark-probe")
+
+    async def stop(self):
+        """Detiene la sonda"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._since = None
+        self._watermarks = None
+
+
+# Instancia global (singleton)
+_watermark_probe: Optional[WatermarkProbe] = None
+
+
+def get_watermark_probe() -> WatermarkProbe:
+    """
+    Obtiene la sonda global de frescura.
+    Con CACHE_ENABLED=False la sonda queda desactivada.
+    """
+    global _watermark_probe
+
+    if _watermark_probe is None:
+        settings = get_settings()
+        _watermark_probe = WatermarkProbe(
+            cache=get_result_cache(),
+            manager=get_odbc_manager(),
+            executor=get_odbc_executor(),
+            interval=settings.watermark_probe_interval if settings.cache_enabled else 0,
+            window_hours=settings.watermark_probe_window_hours
+        )
+
+    return _watermark_probe
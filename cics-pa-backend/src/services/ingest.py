@@ -0,0 +1,467 @@
+"""
+Agregados de abends materializados en memoria.
+
+Un ingestor en segundo plano lee periódicamente los abends posteriores al
+último TIMESTAMP ingerido (marca de agua) y los acumula en conteos
+por región, programa, código de abend e intervalo de tiempo. El resumen se
+responde desde esos conteos: cada sondeo cuesta O(registros nuevos) en
+lugar de O(ventana).
+"""
+import asyncio
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core import get_settings, get_logger
+from ..core.metrics import (
+    abend_ingest_polls_total,
+    abend_ingest_rows_total,
+    abend_aggregate_keys,
+    abend_sketch_counters,
+    abend_distinct_sketches,
+)
+from ..database import get_odbc_manager, get_odbc_executor, ODBCManager, ODBCExecutor
+from ..database.manager import ABEND_SUMMARY_DIMENSIONS, ABEND_SKETCH_COLUMNS, _group_value
+from .broadcast import AbendBroadcaster, get_abend_broadcaster
+from .sketches import WindowedDistinct, WindowedSketches
+from .anomaly import AbendRateDetector
+
+logger = get_logger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Clave de los conteos de un intervalo: (región, programa, código de abend)
+AggregateKey = Tuple[str, str, str]
+
+# Filas acumuladas entre cesiones del event loop: un lote completo se
+# acumula en varios tramos para no bloquear /health/ping ni /metrics
+FOLD_SLICE_ROWS = 500
+
+
+def _distinct_value(value: Any) -> Optional[str]:
+    """Valor sin relleno CHAR; NULL y vacío no cuentan como distintos"""
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def utc_now() -> datetime:
+    """Hora actual UTC sin zona, como los TIMESTAMP de DVM"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class AbendAggregates:
+    """
+    Conteos de abends por intervalo de tiempo y (región, programa, código).
+
+    La memoria depende del número de intervalos retenidos y de
+    combinaciones distintas, no del número de abends. Pensado para usarse
+    desde el event loop: no es thread-safe.
+    """
+
+    def __init__(self, bucket_seconds: int, retention: timedelta):
+        self.bucket_seconds = bucket_seconds
+        self.retention = retention
+        self._buckets: Dict[int, Counter] = {}
+
+    @property
+    def key_count(self) -> int:
+        """Número de contadores (intervalo, región, programa, código)"""
+        return sum(len(counts) for counts in self._buckets.values())
+
+    def bucket_of(self, timestamp: datetime) -> int:
+        """Inicio del intervalo de un TIMESTAMP, en segundos desde epoch"""
+        seconds = int((timestamp - _EPOCH).total_seconds())
+        return seconds - seconds % self.bucket_seconds
+
+    def bucket_start(self, timestamp: datetime) -> datetime:
+        """Inicio del intervalo de un TIMESTAMP"""
+        return _EPOCH + timedelta(seconds=self.bucket_of(timestamp))
+
+    def add(self, timestamp: datetime, key: AggregateKey, count: int = 1):
+        """
+        Suma abends a un intervalo.
+
+        Args:
+            timestamp: TIMESTAMP del abend
+            key: (región, programa, código de abend)
+            count: Número de abends
+        """
+        bucket = self.bucket_of(timestamp)
+        counts = self._buckets.get(bucket)
+        if counts is None:
+            counts = self._buckets[bucket] = Counter()
+        counts[key] += count
+
+    def prune(self, now: datetime) -> int:
+        """
+        Descarta los intervalos fuera de la retención.
+
+        Args:
+            now: Referencia temporal (el horizonte de ingesta)
+
+        Returns:
+            Número de intervalos descartados
+        """
+        oldest = self.bucket_of(now - self.retention)
+        expired = [bucket for bucket in self._buckets if bucket < oldest]
+        for bucket in expired:
+            del self._buckets[bucket]
+        return len(expired)
+
+    def counts(
+        self,
+        since: datetime,
+        region: Optional[str] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Conteos por dimensión desde el intervalo que contiene `since`.
+
+        Args:
+            since: Inicio de la ventana
+            region: Región CICS (opcional)
+
+        Returns:
+            Diccionario dimensión -> (valor -> número de abends), con las
+            mismas claves que ABEND_SUMMARY_DIMENSIONS
+        """
+        first = self.bucket_of(since)
+        region = region.strip() if region else None
+        by_region: Counter = Counter()
+        by_program: Counter = Counter()
+        by_code: Counter = Counter()
+
+        for bucket, counts in self._buckets.items():
+            if bucket < first:
+                continue
+            for (reg, program, code), count in counts.items():
+                if region is not None and reg != region:
+                    continue
+                by_region[reg] += count
+                by_program[program] += count
+                by_code[code] += count
+
+        return dict(zip(ABEND_SUMMARY_DIMENSIONS, (by_region, by_program, by_code)))
+
+    def clear(self):
+        """Descarta todos los conteos"""
+        self._buckets.clear()
+
+
+class AbendIngester:
+    """
+    Ingestor incremental de abends.
+
+    - Lee solo registros con TIMESTAMP anterior a `now - lag`, para no
+      perder abends que DVM publica con retraso.
+    - Continúa desde el TIMESTAMP del último registro ingerido, en lotes
+      de `batch_size` que terminan en un cambio de TIMESTAMP: los abends
+      empatados en todas las columnas de keyset no se saltan aunque la
+      última no sea única. Los lotes se acumulan en tramos cediendo el
+      event loop entre uno y otro.
+    - El primer sondeo carga la retención completa (backfill), o
+      `sketch_backfill_days` si es mayor: los días anteriores a la
+      retención solo alimentan los sketches de top-K y de distintos.
+    - Alimenta el detector de picos de abends (si se configura), que
+      exporta las tasas y sus líneas base como gauges.
+    - Si el almacén de abends recientes está habilitado o hay clientes en
+      el stream, lee todas las columnas y les entrega las filas nuevas.
+    """
+
+    def __init__(
+        self,
+        manager: ODBCManager,
+        executor: ODBCExecutor,
+        interval: float,
+        retention_hours: int,
+        bucket_seconds: int,
+        lag_seconds: float,
+        batch_size: int,
+        broadcaster: Optional[AbendBroadcaster] = None,
+        sketch_capacity: int = 200,
+        sketch_backfill_days: float = 1,
+        distinct_precision: int = 12,
+        detector: Optional[AbendRateDetector] = None
+    ):
+        self.manager = manager
+        self.broadcaster = broadcaster
+        self.executor = executor
+        self.interval = interval
+        self.lag = timedelta(seconds=lag_seconds)
+        self.batch_size = batch_size
+        # Margen sobre la ventana servida: el intervalo parcial en que empieza
+        # el backfill, un intervalo más y el retraso de ingesta. Así una
+        # ventana de exactamente `retention_hours` hacia atrás desde ahora
+        # sigue cubierta entre sondeos
+        slack = timedelta(seconds=2 * bucket_seconds) + self.lag
+        self.aggregates = AbendAggregates(
+            bucket_seconds, timedelta(hours=retention_hours) + slack
+        )
+        self.sketches = WindowedSketches(sketch_capacity)
+        self.distinct = WindowedDistinct(distinct_precision)
+        self.detector = detector
+        self.sketch_backfill = timedelta(days=sketch_backfill_days)
+        # Límite superior del sondeo en curso
+        self._until: Optional[datetime] = None
+        # TIMESTAMP del último registro ingerido: todos los anteriores o
+        # iguales ya están en los agregados
+        self._last_timestamp: Optional[datetime] = None
+        self._horizon: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """True si la ingesta está en marcha"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def horizon(self) -> Optional[datetime]:
+        """TIMESTAMP hasta el que los agregados están completos"""
+        return self._horizon
+
+    def covers(self, since: datetime) -> bool:
+        """
+        Indica si los agregados pueden responder una ventana desde `since`.
+
+        Requiere que el backfill haya terminado, que la ventana esté dentro
+        de la retención y que el último sondeo no sea demasiado antiguo. Los
+        conteos se leen desde el intervalo que contiene `since`, que debe ser
+        posterior al más antiguo retenido (puede estar incompleto).
+        """
+        if self._horizon is None:
+            return False
+        max_staleness = self.lag + timedelta(seconds=3 * self.interval)
+        if utc_now() - self._horizon > max_staleness:
+            return False
+        aggregates = self.aggregates
+        oldest = aggregates.bucket_of(self._horizon - aggregates.retention)
+        return aggregates.bucket_of(since) > oldest
+
+    def _fold(self, columns: List[str], rows: List[Any]):
+        """Acumula un tramo de registros en los agregados y los sketches"""
+        positions = {column.upper(): i for i, column in enumerate(columns)}
+        timestamp_index = positions["TIMESTAMP"]
+        region_index, program_index, code_index = (
+            positions[dimension] for dimension in ABEND_SUMMARY_DIMENSIONS
+        )
+        transaction_index, user_index, terminal_index = (
+            positions[column] for column in ABEND_SKETCH_COLUMNS
+        )
+
+        keys = [
+            (
+                _group_value(row[region_index]),
+                _group_value(row[program_index]),
+                _group_value(row[code_index]),
+            )
+            for row in rows
+        ]
+        self.sketches.add_batch(
+            (
+                (row[timestamp_index], region, program, _group_value(row[transaction_index]), code)
+                for row, (region, program, code) in zip(rows, keys)
+            ),
+            now=self._until
+        )
+        self.distinct.add_batch(
+            (
+                (
+                    row[timestamp_index],
+                    region,
+                    program,
+                    _distinct_value(row[transaction_index]),
+                    _distinct_value(row[user_index]),
+                    _distinct_value(row[terminal_index]),
+                )
+                for row, (region, program, _) in zip(rows, keys)
+            ),
+            now=self._until
+        )
+
+        # Las filas llegan ordenadas por TIMESTAMP: las del backfill extendido
+        # de los sketches forman un prefijo del lote que no entra en los
+        # agregados ni en el almacén reciente
+        first = 0
+        if self._until is not None:
+            first = bisect_left(
+                rows,
+                self._until - self.aggregates.retention,
+                key=lambda row: row[timestamp_index]
+            )
+        for row, key in zip(rows[first:], keys[first:]):
+            self.aggregates.add(row[timestamp_index], key)
+        if self.detector is not None:
+            for row, (region, _, code) in zip(rows[first:], keys[first:]):
+                self.detector.observe(row[timestamp_index], region, code)
+
+        # Nombres nuevos para el índice local (también los del backfill extendido)
+        for column, index in self.manager.name_indexes.items():
+            index.add(row[positions[column]] for row in rows)
+
+        self._last_timestamp = rows[-1][timestamp_index]
+        if self.manager.recent is not None and first < len(rows):
+            self.manager.recent.append(columns, rows[first:])
+        if self.broadcaster is not None and self._horizon is not None:
+            # El backfill inicial no se difunde: solo los abends nuevos
+            self.broadcaster.publish(columns, rows)
+
+    async def _fold_batch(self, columns: List[str], rows: List[Any]):
+        """Acumula un lote en tramos de FOLD_SLICE_ROWS, cediendo el event loop entre tramos"""
+        for start in range(0, len(rows), FOLD_SLICE_ROWS):
+            if start:
+                await asyncio.sleep(0)
+            self._fold(columns, rows[start:start + FOLD_SLICE_ROWS])
+
+    def _all_columns(self) -> bool:
+        """Si hay que leer las filas completas y no solo las dimensiones"""
+        if self.manager.recent is not None:
+            return True
+        return self.broadcaster is not None and self.broadcaster.clients > 0
+
+    async def poll(self) -> int:
+        """
+        Ingiere los abends nuevos hasta `now - lag`.
+
+        Returns:
+            Número de registros ingeridos
+        """
+        until = utc_now() - self.lag
+        self._until = until
+        since = until - max(self.aggregates.retention, self.sketch_backfill)
+        if self._horizon is None:
+            self.sketches.since = since
+            self.distinct.since = since
+        ingested = 0
+
+        while True:
+            all_columns = self._all_columns()
+            columns, rows = await self.executor.run(
+                self.manager.get_new_abends,
+                until,
+                since,
+                self._last_timestamp,
+                self.batch_size,
+                all_columns
+            )
+            full = len(rows) >= self.batch_size
+            if full:
+                # El lote puede cortar un grupo de abends con el mismo
+                # TIMESTAMP: se deja entero para el lote siguiente
+                timestamp_index = [c.upper() for c in columns].index("TIMESTAMP")
+                last = rows[-1][timestamp_index]
+                cut = bisect_left(rows, last, key=lambda row: row[timestamp_index])
+                if cut:
+                    rows = rows[:cut]
+                else:
+                    # Todo el lote comparte TIMESTAMP: se lee el grupo completo
+                    columns, rows = await self.executor.run(
+                        self.manager.get_new_abends,
+                        last,
+                        since,
+                        self._last_timestamp,
+                        None,
+                        all_columns
+                    )
+            if rows:
+                await self._fold_batch(columns, rows)
+                ingested += len(rows)
+                abend_ingest_rows_total.inc(len(rows))
+            if not full:
+                break
+
+        if self._horizon is None:
+            logger.info(f"Backfill de agregados de abends completo: {ingested} registros")
+        self._horizon = until
+        self.aggregates.prune(until)
+        self.sketches.prune(until)
+        self.distinct.prune(until)
+        if self.detector is not None:
+            self.detector.advance(until)
+        if self.manager.recent is not None:
+            self.manager.recent.advance(until)
+        for index in self.manager.name_indexes.values():
+            index.advance(until)
+        abend_aggregate_keys.set(self.aggregates.key_count)
+        abend_sketch_counters.set(self.sketches.counters)
+        abend_distinct_sketches.set(self.distinct.sketch_count)
+        return ingested
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+                abend_ingest_polls_total.labels(status='success').inc()
+            except Exception as e:
+                # Se reintenta desde el último registro ingerido
+                abend_ingest_polls_total.labels(status='error').inc()
+                logger.warning(f"Ingesta de abends fallida: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Arranca la ingesta en el event loop actual"""
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        if self.manager.abend_keyset_columns[0].upper() != "TIMESTAMP":
+            logger.warning(
+                "Ingesta de abends desactivada: ABEND_KEYSET_COLUMNS debe empezar por TIMESTAMP"
+            )
+            return
+        self._task = asyncio.create_task(self._run(), name="abends-ingester")
+
+    async def stop(self):
+        """Detiene la ingesta y descarta los agregados"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._horizon = None
+        self._until = None
+        self._last_timestamp = None
+        self.aggregates.clear()
+        self.sketches.clear()
+        self.distinct.clear()
+        if self.detector is not None:
+            self.detector.clear()
+        if self.manager.recent is not None:
+            self.manager.recent.clear()
+
+
+# Instancia global (singleton)
+_abend_ingester: Optional[AbendIngester] = None
+
+
+def get_abend_ingester() -> AbendIngester:
+    """
+    Obtiene el ingestor global de abends.
+    Con ABEND_INGEST_INTERVAL=0 la ingesta queda desactivada.
+    """
+    global _abend_ingester
+
+    if _abend_ingester is None:
+        settings = get_settings()
+        _abend_ingester = AbendIngester(
+            manager=get_odbc_manager(),
+            executor=get_odbc_executor(),
+            interval=settings.abend_ingest_interval,
+            retention_hours=settings.abend_ingest_retention_hours,
+            bucket_seconds=settings.abend_ingest_bucket_seconds,
+            lag_seconds=settings.abend_ingest_lag_seconds,
+            batch_size=settings.abend_ingest_batch_size,
+            broadcaster=get_abend_broadcaster(),
+            sketch_capacity=settings.abend_sketch_capacity,
+            sketch_backfill_days=settings.abend_sketch_backfill_days,
+            distinct_precision=settings.abend_distinct_precision,
+            detector=AbendRateDetector(
+                interval_seconds=settings.abend_anomaly_interval_seconds,
+                halflife_minutes=settings.abend_anomaly_halflife_minutes,
+                warmup=settings.abend_anomaly_warmup,
+                max_keys=settings.abend_anomaly_max_keys
+            )
+        )
+
+    return _abend_ingester
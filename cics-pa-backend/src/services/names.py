@@ -0,0 +1,106 @@
+"""
+Carga periódica del índice local de nombres.
+
+Un SELECT DISTINCT por columna indexada recorre el índice de la columna y
+devuelve solo los valores distintos (cientos o miles), no los abends. Entre
+cargas, el ingestor incremental agrega los nombres nuevos que ve y extiende
+la cobertura del índice.
+"""
+import asyncio
+from datetime import timedelta
+from typing import Optional
+
+from ..core import get_settings, get_logger
+from ..database import get_odbc_manager, get_odbc_executor, ODBCManager, ODBCExecutor
+from .ingest import utc_now
+
+logger = get_logger(__name__)
+
+
+class NameIndexRefresher:
+    """
+    Recarga los índices de nombres del gestor cada `interval` segundos.
+
+    La cobertura de cada carga es su hora de inicio menos `lag_seconds`:
+    los abends publicados con retraso pueden traer nombres que la carga no
+    vio.
+    """
+
+    def __init__(
+        self,
+        manager: ODBCManager,
+        executor: ODBCExecutor,
+        interval: float,
+        lag_seconds: float
+    ):
+        self.manager = manager
+        self.executor = executor
+        self.interval = interval
+        self.lag = timedelta(seconds=lag_seconds)
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> int:
+        """
+        Carga los valores distintos de todas las columnas indexadas.
+
+        Returns:
+            Número de nombres nuevos
+        """
+        added = 0
+        for column, index in self.manager.name_indexes.items():
+            covered_until = utc_now() - self.lag
+            values = await self.executor.run(self.manager.get_distinct_values, column)
+            added += index.load(values, covered_until)
+            logger.debug(f"Índice de nombres {column}: {len(index)} valores")
+        return added
+
+    async def _run(self):
+        while True:
+            try:
+                added = await self.refresh()
+                if added:
+                    logger.info(f"Índice de nombres actualizado: {added} nombres nuevos")
+            except Exception as e:
+                # Los índices conservan la cobertura de la carga anterior
+                logger.warning(f"Carga del índice de nombres fallida: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Arranca las cargas en el event loop actual"""
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="name-index-refresher")
+
+    async def stop(self):
+        """Detiene las cargas"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Instancia global (singleton)
+_name_index_refresher: Optional[NameIndexRefresher] = None
+
+
+def get_name_index_refresher() -> NameIndexRefresher:
+    """
+    Obtiene el cargador global de índices de nombres.
+    Con NAME_INDEX_REFRESH_SECONDS=0 los filtros usan siempre LIKE.
+    """
+    global _name_index_refresher
+
+    if _name_index_refresher is None:
+        settings = get_settings()
+        _name_index_refresher = NameIndexRefresher(
+            manager=get_odbc_manager(),
+            executor=get_odbc_executor(),
+            interval=settings.name_index_refresh_seconds,
+            lag_seconds=settings.abend_ingest_lag_seconds
+        )
+
+    return _name_index_refresher
@@ -2,20 +2,80 @@
 Servicio de queries - Lógica de negocio para operaciones de base de datos.
 Capa intermedia entre los endpoints y el gestor de ODBC.
 """
+import asyncio
+import heapq
 import time
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, AsyncIterator, Sequence, Tuple, Union
 
-from ..database import get_odbc_manager
-from ..core import get_logger
+from ..database import get_odbc_manager, get_odbc_executor
+from ..database.manager import ResultStream, ABEND_SUMMARY_DIMENSIONS
+from ..database.keyset import encode_cursor, decode_cursor
+from ..core import get_logger, get_settings
 from ..models import (
     QueryResponse,
+    ColumnarQueryResponse,
     TableInfoResponse,
     ColumnInfo,
     AbendsResponse,
+    ColumnarAbendsResponse,
+    ExportFormat,
+    TimeseriesGroupBy,
+    TimeseriesResponse,
+    TopAbendsWindow,
+    TopAbendsDimension,
+    TopAbendsResponse,
+    HeavyHitterItem,
+    DistinctCountsResponse,
+    NameField,
+    NameSuggestionsResponse,
 )
+from .serializers import NDJSONEncoder, CSVEncoder
+from .cache import get_result_cache
+from .freshness import get_watermark_probe, region_tag
+from .ingest import get_abend_ingester, utc_now
+from .arrow_export import ArrowStreamEncoder
+from .timeseries import align_range, bucket_indexes, bucket_starts, dense_series
+from .sketches import SketchesUnavailableError
 
 logger = get_logger(__name__)
 
+# Columna de cada dimensión de las series temporales
+TIMESERIES_DIMENSIONS = {
+    TimeseriesGroupBy.NONE: None,
+    TimeseriesGroupBy.REGION: "CICS_REGION",
+    TimeseriesGroupBy.PROGRAM: "PROGRAM_NAME",
+    TimeseriesGroupBy.ABEND_CODE: "ABEND_CODE",
+}
+
+# Columna de cada dimensión del top-K aproximado
+TOP_ABENDS_DIMENSIONS = {
+    TopAbendsDimension.PROGRAM: "PROGRAM_NAME",
+    TopAbendsDimension.TRANSACTION: "TRANSACTION_ID",
+    TopAbendsDimension.ABEND_CODE: "ABEND_CODE",
+}
+
+# Campo de la respuesta para cada dimensión con conteo de distintos
+DISTINCT_FIELDS = {
+    "PROGRAM_NAME": "programs",
+    "TRANSACTION_ID": "transactions",
+    "USER_ID": "users",
+    "TERMINAL_ID": "terminals",
+}
+
+# Columna de cada campo del autocompletado de nombres
+NAME_FIELDS = {
+    NameField.PROGRAM: "PROGRAM_NAME",
+    NameField.TRANSACTION: "TRANSACTION_ID",
+}
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """Convierte a UTC sin zona, como los TIMESTAMP de DVM"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 class QueryService:
     """
@@ -25,20 +85,34 @@ class QueryService:
 
     def __init__(self):
         self.odbc_manager = get_odbc_manager()
+        # Las llamadas a pyodbc son bloqueantes: se ejecutan fuera del event loop
+        self.executor = get_odbc_executor()
+        # Resultados de abends compartidos entre requests (TTL + single-flight)
+        self.cache = get_result_cache()
+        self.watermarks = get_watermark_probe()
+        # Agregados de abends en memoria mantenidos en segundo plano
+        self.ingester = get_abend_ingester()
+        self.settings = get_settings()
 
     async def execute_custom_query(
         self,
         query: str,
         params: Optional[List[Any]] = None,
-        fetch_all: bool = True
+        fetch_all: bool = True,
+        page_size: int = 1000
     ) -> QueryResponse:
         """
         Ejecuta una query personalizada.
 
+        Con fetch_all=False retorna la primera página de `page_size`
+        registros y, si quedan más, un continuation_token para leer las
+        siguientes con continue_query.
+
         Args:
             query: SQL query
             params: Parámetros de la query
             fetch_all: Si traer todos los resultados
+            page_size: Registros por página cuando fetch_all es False
 
         Returns:
             QueryResponse con los resultados
@@ -49,28 +123,286 @@ class QueryService:
             # Convertir params a tuple si existe
             params_tuple = tuple(params) if params else None
 
-            # Ejecutar query
-            data = self.odbc_manager.execute_query(
-                query=query,
-                params=params_tuple,
-                fetch_all=fetch_all
-            )
+            token = None
+            if fetch_all:
+                # Ejecutar query
+                data = await self.executor.run(
+                    self.odbc_manager.execute_query,
+                    query=query,
+                    params=params_tuple,
+                    fetch_all=True
+                )
+            else:
+                page = await self.executor.run(
+                    self.odbc_manager.open_cursor,
+                    query=query,
+                    params=params_tuple,
+                    page_size=page_size
+                )
+                data = [dict(zip(page.columns, row)) for row in page.rows]
+                token = page.continuation_token
 
             execution_time = (time.time() - start_time) * 1000  # ms
 
             logger.info(f"Query ejecutada: {len(data)} registros en {execution_time:.2f}ms")
 
-            return QueryResponse(
+            # Los registros vienen del driver: no se revalidan uno a uno
+            return QueryResponse.model_construct(
                 success=True,
                 data=data,
                 row_count=len(data),
-                execution_time_ms=execution_time
+                execution_time_ms=execution_time,
+                continuation_token=token
             )
 
         except Exception as e:
             logger.error(f"Error ejecutando query: {e}")
             raise
 
+    async def execute_custom_query_columnar(
+        self,
+        query: str,
+        params: Optional[List[Any]] = None,
+        fetch_all: bool = True,
+        page_size: int = 1000
+    ) -> ColumnarQueryResponse:
+        """
+        Ejecuta una query personalizada y retorna el resultado columnar.
+
+        Las columnas se envían una sola vez y cada registro como array,
+        directamente desde los Rows de pyodbc (sin diccionario por registro
+        ni validación por registro).
+
+        Args:
+            query: SQL query
+            params: Parámetros de la query
+            fetch_all: Si traer todos los resultados
+            page_size: Registros por página cuando fetch_all es False
+
+        Returns:
+            ColumnarQueryResponse con los resultados
+        """
+        try:
+            start_time = time.time()
+            params_tuple = tuple(params) if params else None
+
+            token = None
+            if fetch_all:
+                columns, rows = await self.executor.run(
+                    self.odbc_manager.execute_query_rows,
+                    query=query,
+                    params=params_tuple,
+                    fetch_all=True
+                )
+            else:
+                columns, rows, token = await self.executor.run(
+                    self.odbc_manager.open_cursor,
+                    query=query,
+                    params=params_tuple,
+                    page_size=page_size
+                )
+
+            execution_time = (time.time() - start_time) * 1000  # ms
+
+            logger.info(f"Query ejecutada: {len(rows)} registros en {execution_time:.2f}ms")
+
+            return ColumnarQueryResponse.model_construct(
+                success=True,
+                columns=columns,
+                rows=rows,
+                row_count=len(rows),
+                execution_time_ms=execution_time,
+                continuation_token=token
+            )
+
+        except Exception as e:
+            logger.error(f"Error ejecutando query: {e}")
+            raise
+
+    async def continue_query(self, token: str, page_size: int = 1000) -> QueryResponse:
+        """
+        Lee la siguiente página de una query paginada.
+
+        La query no se vuelve a ejecutar: se lee del cursor que quedó abierto.
+
+        Args:
+            token: continuation_token de la respuesta anterior
+            page_size: Registros por página
+
+        Returns:
+            QueryResponse con la página; continuation_token es None en la última
+        """
+        start_time = time.time()
+
+        page = await self.executor.run(self.odbc_manager.fetch_cursor, token, page_size)
+        data = [dict(zip(page.columns, row)) for row in page.rows]
+
+        execution_time = (time.time() - start_time) * 1000  # ms
+        logger.info(f"Página leída: {len(data)} registros en {execution_time:.2f}ms")
+
+        return QueryResponse.model_construct(
+            success=True,
+            data=data,
+            row_count=len(data),
+            execution_time_ms=execution_time,
+            continuation_token=page.continuation_token
+        )
+
+    async def continue_query_columnar(
+        self,
+        token: str,
+        page_size: int = 1000
+    ) -> ColumnarQueryResponse:
+        """
+        Lee la siguiente página de una query paginada en formato columnar.
+
+        Args:
+            token: continuation_token de la respuesta anterior
+            page_size: Registros por página
+
+        Returns:
+            ColumnarQueryResponse con la página
+        """
+        start_time = time.time()
+
+        columns, rows, next_token = await self.executor.run(
+            self.odbc_manager.fetch_cursor, token, page_size
+        )
+
+        execution_time = (time.time() - start_time) * 1000  # ms
+        logger.info(f"Página leída: {len(rows)} registros en {execution_time:.2f}ms")
+
+        return ColumnarQueryResponse.model_construct(
+            success=True,
+            columns=columns,
+            rows=rows,
+            row_count=len(rows),
+            execution_time_ms=execution_time,
+            continuation_token=next_token
+        )
+
+    async def close_cursor(self, token: str) -> bool:
+        """
+        Cierra una query paginada antes de leer todas sus páginas.
+
+        Args:
+            token: continuation_token
+
+        Returns:
+            True si el cursor existía
+        """
+        return await self.executor.run(self.odbc_manager.close_cursor, token)
+
+    async def stream_custom_query(
+        self,
+        query: str,
+        params: Optional[List[Any]] = None,
+        export_format: ExportFormat = ExportFormat.NDJSON
+    ) -> AsyncIterator[bytes]:
+        """
+        Ejecuta una query y retorna sus resultados codificados por lotes.
+
+        La query se ejecuta antes de retornar, de modo que los errores de SQL
+        se reportan antes de empezar a escribir la respuesta.
+
+        Args:
+            query: SQL query
+            params: Parámetros de la query
+            export_format: Formato de salida (ndjson, csv)
+
+        Returns:
+            Iterador asíncrono de bloques de bytes
+        """
+        try:
+            stream = await self.executor.run(
+                self.odbc_manager.open_stream,
+                query=query,
+                params=tuple(params) if params else None
+            )
+            return self._iter_stream(stream, export_format)
+
+        except Exception as e:
+            logger.error(f"Error abriendo stream de query: {e}")
+            raise
+
+    async def stream_abends(
+        self,
+        region: Optional[Union[str, Sequence[str]]] = None,
+        program: Optional[str] = None,
+        limit: int = 10000,
+        export_format: ExportFormat = ExportFormat.NDJSON
+    ) -> AsyncIterator[bytes]:
+        """
+        Exporta abends filtrados por lotes.
+
+        Args:
+            region: Región CICS o lista de regiones (una sola query con IN)
+            program: Nombre del programa
+            limit: Límite de registros
+            export_format: Formato de salida (ndjson, csv)
+
+        Returns:
+            Iterador asíncrono de bloques de bytes
+        """
+        logger.info(f"Exportando abends: region={region}, program={program}, limit={limit}")
+
+        regions = self._abends_regions(region)
+        query, params = self.odbc_manager.build_abends_query(regions, program, limit)
+        return await self.stream_custom_query(query, params, export_format)
+
+    async def _iter_stream(
+        self,
+        stream: ResultStream,
+        export_format: ExportFormat
+    ) -> AsyncIterator[bytes]:
+        """
+        Lee un ResultStream lote a lote en el ejecutor ODBC.
+
+        La lectura y la codificación de cada lote se hacen en el ejecutor.
+        Solo un lote está en memoria a la vez (o un row group en Parquet). Si el cliente se desconecta,
+        el stream se cierra y la conexión vuelve al pool.
+        """
+        def next_chunk() -> Optional[bytes]:
+            rows = stream.fetch()
+            return encoder.encode(rows) if rows else None
+
+        try:
+            encoder = await self.executor.run(self._make_encoder, stream, export_format)
+            yield encoder.start()
+
+            while True:
+                chunk = await self.executor.run(next_chunk)
+                if chunk is None:
+                    break
+                if chunk:
+                    yield chunk
+
+            yield await self.executor.run(encoder.finish)
+
+        finally:
+            if not stream.closed:
+                await asyncio.shield(self.executor.run(stream.close))
+
+    @staticmethod
+    def _make_encoder(stream: ResultStream, export_format: ExportFormat):
+        """
+        Crea el codificador incremental del formato pedido.
+
+        Args:
+            stream: Stream con la descripción de columnas
+            export_format: Formato de salida
+
+        Returns:
+            Codificador con start(), encode(rows) y finish()
+        """
+        if export_format == ExportFormat.CSV:
+            return CSVEncoder(stream.columns)
+        if export_format == ExportFormat.ARROW:
+            return ArrowStreamEncoder(stream.description, parquet=False)
+        if export_format == ExportFormat.PARQUET:
+            return ArrowStreamEncoder(stream.description, parquet=True)
+        return NDJSONEncoder(stream.columns)
+
     async def get_table_info(self, table_name: str) -> TableInfoResponse:
         """
         Obtiene información de una tabla.
@@ -80,11 +412,20 @@ class QueryService:
 
         Returns:
             TableInfoResponse con la información
+
+        Raises:
+            TableNotFoundError: Si la tabla no existe
         """
         try:
             logger.info(f"Obteniendo información de tabla: {table_name}")
 
-            columns_data = self.odbc_manager.get_table_columns(table_name)
+            # Un acierto de caché no necesita un thread del ejecutor
+            columns_data = self.odbc_manager.catalog.lookup(table_name)
+            if columns_data is None:
+                columns_data = await self.executor.run(
+                    self.odbc_manager.get_table_columns,
+                    table_name
+                )
 
             # Convertir a modelos Pydantic
             columns = [
@@ -107,41 +448,215 @@ class QueryService:
             logger.error(f"Error obteniendo información de tabla: {e}")
             raise
 
+    async def invalidate_table_info(self, table_name: Optional[str] = None) -> int:
+        """
+        Descarta la metadata cacheada de una tabla o de todas.
+
+        Args:
+            table_name: Nombre de la tabla; None para todas
+
+        Returns:
+            Número de tablas descartadas
+        """
+        logger.info(f"Invalidando metadata de tabla: {table_name or 'todas'}")
+        return self.odbc_manager.invalidate_table_metadata(table_name)
+
+    def _abends_keys(
+        self,
+        after: Optional[str],
+        before: Optional[str]
+    ) -> Tuple[Optional[tuple], Optional[tuple]]:
+        """Decodifica los cursores de paginación de abends"""
+        length = len(self.odbc_manager.abend_keyset_columns)
+        return (
+            decode_cursor(after, length) if after else None,
+            decode_cursor(before, length) if before else None,
+        )
+
+    def _abends_regions(self, region: Optional[Union[str, Sequence[str]]]) -> List[str]:
+        """
+        Regiones pedidas, sin repetir; admite listas y valores separados por comas.
+
+        Raises:
+            ValueError: Si se piden más de ABEND_FANOUT_MAX_REGIONS regiones
+        """
+        values = [region] if isinstance(region, str) else region or []
+        regions: List[str] = []
+        for value in values:
+            for name in value.split(","):
+                name = name.strip()
+                if name and name not in regions:
+                    regions.append(name)
+
+        max_regions = self.settings.abend_fanout_max_regions
+        if len(regions) > max_regions:
+            raise ValueError(f"Se admiten como máximo {max_regions} regiones por request")
+        return regions
+
+    @staticmethod
+    def _regions_filter(regions: List[str]) -> Union[None, str, List[str]]:
+        """Valor de `region` en filters_applied"""
+        if len(regions) > 1:
+            return regions
+        return regions[0] if regions else None
+
+    async def _abends_page(
+        self,
+        regions: List[str],
+        program: Optional[str],
+        limit: int,
+        after: Optional[str],
+        before: Optional[str]
+    ):
+        """
+        Página de abends de una, varias o todas las regiones.
+
+        Con varias regiones se lanza una query por región en paralelo, cada
+        una en su propia conexión del pool y con su propia entrada de caché,
+        y las páginas ya ordenadas se mezclan por keyset: la latencia es la
+        de la región más lenta y no la suma de todas.
+        """
+        if len(regions) <= 1:
+            region = regions[0] if regions else None
+            return await self._region_abends_page(region, program, limit, after, before)
+
+        after_key, before_key = self._abends_keys(after, before)
+        pages = await asyncio.gather(*[
+            self._region_abends_page(region, program, limit, after, before)
+            for region in regions
+        ])
+        return self.odbc_manager.merge_abends_pages(pages, limit, after_key, before_key)
+
+    async def _region_abends_page(
+        self,
+        region: Optional[str],
+        program: Optional[str],
+        limit: int,
+        after: Optional[str],
+        before: Optional[str]
+    ):
+        """Página de abends de una región desde la caché o desde DVM"""
+        after_key, before_key = self._abends_keys(after, before)
+        key = ("abends", region, program, limit, after_key, before_key)
+
+        return await self.cache.get_or_load(
+            key,
+            lambda: self.executor.run(
+                self.odbc_manager.get_abends_page,
+                region=region,
+                program=program,
+                limit=limit,
+                after=after_key,
+                before=before_key
+            ),
+            tags=(region_tag(region),),
+            ttl=self._cache_ttl()
+        )
+
+    def _cache_ttl(self) -> Optional[float]:
+        """
+        Vigencia de un resultado que empieza a cargarse ahora.
+
+        Con la sonda de frescura activa los resultados viven hasta que cambia
+        la marca de agua de su región (con CACHE_WATERMARK_TTL_SECONDS como
+        tope); sin ella se usa el TTL normal de la caché.
+        """
+        if self.watermarks.active:
+            return self.settings.cache_watermark_ttl_seconds
+        return None
+
     async def get_abends(
         self,
-        region: Optional[str] = None,
+        region: Optional[Union[str, Sequence[str]]] = None,
         program: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None
     ) -> AbendsResponse:
         """
         Obtiene abends filtrados.
 
+        Las páginas se cachean por (region, program, limit, cursor) y las
+        requests idénticas concurrentes comparten una sola consulta. Con
+        varias regiones se consultan en paralelo y se mezclan por TIMESTAMP;
+        los cursores recorren todas las regiones a la vez.
+
         Args:
-            region: Región CICS
+            region: Región CICS o lista de regiones (también separadas por comas)
             program: Nombre del programa
             limit: Límite de registros
+            after: Cursor next_cursor de una página anterior (abends más antiguos)
+            before: Cursor prev_cursor de una página anterior (abends más recientes)
 
         Returns:
-            AbendsResponse con los abends
+            AbendsResponse con los abends y los cursores de las páginas vecinas
+
+        Raises:
+            InvalidCursorError: Si un cursor no es válido
         """
         try:
             logger.info(f"Obteniendo abends: region={region}, program={program}, limit={limit}")
 
-            abends = self.odbc_manager.get_abends(
-                region=region,
-                program=program,
-                limit=limit
-            )
+            regions = self._abends_regions(region)
+            page = await self._abends_page(regions, program, limit, after, before)
+            abends = [dict(zip(page.columns, row)) for row in page.rows]
 
-            return AbendsResponse(
+            return AbendsResponse.model_construct(
                 success=True,
                 abends=abends,
                 total=len(abends),
                 filters_applied={
-                    "region": region,
+                    "region": self._regions_filter(regions),
                     "program": program,
                     "limit": limit
-                }
+                },
+                next_cursor=encode_cursor(page.next_key) if page.next_key else None,
+                prev_cursor=encode_cursor(page.prev_key) if page.prev_key else None
+            )
+
+        except Exception as e:
+            logger.error(f"Error obteniendo abends: {e}")
+            raise
+
+    async def get_abends_columnar(
+        self,
+        region: Optional[Union[str, Sequence[str]]] = None,
+        program: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None
+    ) -> ColumnarAbendsResponse:
+        """
+        Obtiene abends filtrados en formato columnar.
+
+        Args:
+            region: Región CICS o lista de regiones
+            program: Nombre del programa
+            limit: Límite de registros
+            after: Cursor next_cursor de una página anterior
+            before: Cursor prev_cursor de una página anterior
+
+        Returns:
+            ColumnarAbendsResponse con los abends
+        """
+        try:
+            logger.info(f"Obteniendo abends (columnar): region={region}, program={program}, limit={limit}")
+
+            regions = self._abends_regions(region)
+            page = await self._abends_page(regions, program, limit, after, before)
+
+            return ColumnarAbendsResponse.model_construct(
+                success=True,
+                columns=page.columns,
+                rows=page.rows,
+                total=len(page.rows),
+                filters_applied={
+                    "region": self._regions_filter(regions),
+                    "program": program,
+                    "limit": limit
+                },
+                next_cursor=encode_cursor(page.next_key) if page.next_key else None,
+                prev_cursor=encode_cursor(page.prev_key) if page.prev_key else None
             )
 
         except Exception as e:
@@ -151,63 +666,375 @@ class QueryService:
     async def get_abends_summary(
         self,
         region: Optional[str] = None,
-        limit: int = 1000
+        hours: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Obtiene resumen estadístico de abends.
+        Obtiene resumen estadístico de abends de una ventana de tiempo.
+
+        Si los agregados en memoria del ingestor cubren la ventana, el
+        resumen se responde desde ellos sin consultar DVM. En otro caso los
+        conteos se calculan en DVM con GROUP BY sobre toda la ventana; el
+        inicio se redondea al minuto para que las requests de un mismo
+        minuto compartan el resultado cacheado, que se invalida además
+        cuando cambia la marca de agua de la región.
 
         Args:
             region: Región CICS
-            limit: Límite de registros a analizar
+            hours: Horas hacia atrás desde ahora (por defecto
+                ABEND_SUMMARY_HOURS)
 
         Returns:
             Diccionario con estadísticas
         """
-        try:
-            logger.info(f"Generando resumen de abends: region={region}")
+        hours = hours or self.settings.abend_summary_hours
+        # Los TIMESTAMP de DVM no tienen zona y se interpretan como UTC
+        now = utc_now().replace(second=0, microsecond=0)
+        since = now - timedelta(hours=hours)
 
-            abends = self.odbc_manager.get_abends(
-                region=region,
-                limit=limit
+        if self.ingester.covers(since):
+            aggregates = self.ingester.aggregates
+            return self._summary_from_counts(
+                aggregates.counts(since, region),
+                hours,
+                aggregates.bucket_start(since),
+                source="aggregates"
             )
 
-            # Calcular estadísticas
-            total = len(abends)
-            by_region = {}
-            by_program = {}
-            by_abend_code = {}
-
-            for abend in abends:
-                # Por región
-                reg = abend.get('CICS_REGION', 'UNKNOWN')
-                by_region[reg] = by_region.get(reg, 0) + 1
-
-                # Por programa
-                prog = abend.get('PROGRAM_NAME', 'UNKNOWN')
-                by_program[prog] = by_program.get(prog, 0) + 1
-
-                # Por código de abend
-                code = abend.get('ABEND_CODE', 'UNKNOWN')
-                by_abend_code[code] = by_abend_code.get(code, 0) + 1
-
-            # Top 10 de cada categoría
-            summary = {
-                "total_abends": total,
-                "top_regions": dict(sorted(by_region.items(), key=lambda x: x[1], reverse=True)[:10]),
-                "top_programs": dict(sorted(by_program.items(), key=lambda x: x[1], reverse=True)[:10]),
-                "top_abend_codes": dict(sorted(by_abend_code.items(), key=lambda x: x[1], reverse=True)[:10]),
-                "unique_regions": len(by_region),
-                "unique_programs": len(by_program),
-                "unique_abend_codes": len(by_abend_code),
-            }
+        return await self.cache.get_or_load(
+            ("abends_summary", region, hours, since),
+            lambda: self._build_abends_summary(region, hours, since),
+            tags=(region_tag(region),),
+            ttl=self._cache_ttl()
+        )
 
-            logger.info(f"Resumen generado: {total} abends analizados")
+    async def _abend_counts(
+        self,
+        region: Optional[str],
+        since: datetime
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Conteos por dimensión: una query GROUPING SETS o una GROUP BY por
+        dimensión ejecutadas en paralelo, cada una en su propia conexión.
+        """
+        manager = self.odbc_manager
+        if manager.grouping_sets_enabled:
+            try:
+                return await self.executor.run(
+                    manager.get_abend_counts_grouping_sets, region, since
+                )
+            except Exception as e:
+                manager.grouping_sets_enabled = False
+                logger.warning(
+                    f"GROUPING SETS no disponible, se usan queries por dimensión: {e}"
+                )
+
+        results = await asyncio.gather(*[
+            self.executor.run(manager.get_abend_counts, dimension, region, since)
+            for dimension in ABEND_SUMMARY_DIMENSIONS
+        ])
+        return dict(zip(ABEND_SUMMARY_DIMENSIONS, results))
+
+    async def _build_abends_summary(
+        self,
+        region: Optional[str],
+        hours: int,
+        since: datetime
+    ) -> Dict[str, Any]:
+        """Calcula el resumen de abends con agregaciones en DVM"""
+        try:
+            logger.info(f"Generando resumen de abends: region={region}, hours={hours}")
+
+            counts = await self._abend_counts(region, since)
+            summary = self._summary_from_counts(counts, hours, since, source="query")
+
+            logger.info(f"Resumen generado: {summary['total_abends']} abends en {hours}h")
             return summary
 
         except Exception as e:
             logger.error(f"Error generando resumen: {e}")
             raise
 
+    @staticmethod
+    def _summary_from_counts(
+        counts: Dict[str, Dict[str, int]],
+        hours: int,
+        since: datetime,
+        source: str
+    ) -> Dict[str, Any]:
+        """Arma el resumen (top 10 y únicos) a partir de los conteos por dimensión"""
+        by_region = counts["CICS_REGION"]
+        by_program = counts["PROGRAM_NAME"]
+        by_abend_code = counts["ABEND_CODE"]
+
+        def top(counter: Dict[str, int]) -> Dict[str, int]:
+            return dict(heapq.nlargest(10, counter.items(), key=lambda item: item[1]))
+
+        # Top 10 de cada categoría; cada abend pertenece a un solo grupo de región
+        return {
+            "total_abends": sum(by_region.values()),
+            "top_regions": top(by_region),
+            "top_programs": top(by_program),
+            "top_abend_codes": top(by_abend_code),
+            "unique_regions": len(by_region),
+            "unique_programs": len(by_program),
+            "unique_abend_codes": len(by_abend_code),
+            "window_hours": hours,
+            "since": since,
+            "source": source,
+        }
+
+    async def get_abends_timeseries(
+        self,
+        bucket_seconds: int = 3600,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        group_by: TimeseriesGroupBy = TimeseriesGroupBy.NONE,
+        region: Optional[str] = None,
+        max_series: int = 10
+    ) -> TimeseriesResponse:
+        """
+        Obtiene abends por intervalo de tiempo como series densas.
+
+        El rango se alinea a múltiplos de `bucket_seconds`, de modo que las
+        requests del mismo intervalo comparten el resultado cacheado.
+
+        Args:
+            bucket_seconds: Tamaño de cada intervalo
+            start: Inicio del rango (por defecto 24 horas antes de `end`)
+            end: Fin del rango (por defecto ahora)
+            group_by: Dimensión por la que separar las series
+            region: Región CICS (opcional)
+            max_series: Series máximas; el resto se suma en OTHER
+
+        Returns:
+            TimeseriesResponse con un conteo por intervalo y serie
+
+        Raises:
+            ValueError: Si el rango está vacío o tiene demasiados intervalos
+        """
+        # Los TIMESTAMP de DVM no tienen zona y se interpretan como UTC
+        end = _as_naive_utc(end) if end else utc_now()
+        start = _as_naive_utc(start) if start else end - timedelta(hours=24)
+        if start >= end:
+            raise ValueError("'start' debe ser anterior a 'end'")
+
+        start, count = align_range(start, end, bucket_seconds)
+        max_buckets = self.settings.abend_timeseries_max_buckets
+        if count > max_buckets:
+            raise ValueError(
+                f"El rango tiene {count} intervalos (máximo {max_buckets}); "
+                f"use un intervalo mayor"
+            )
+
+        return await self.cache.get_or_load(
+            ("abends_timeseries", region, group_by, bucket_seconds, start, count, max_series),
+            lambda: self._build_timeseries(
+                bucket_seconds, start, count, group_by, region, max_series
+            ),
+            tags=(region_tag(region),),
+            ttl=self._cache_ttl()
+        )
+
+    async def _build_timeseries(
+        self,
+        bucket_seconds: int,
+        start: datetime,
+        count: int,
+        group_by: TimeseriesGroupBy,
+        region: Optional[str],
+        max_series: int
+    ) -> TimeseriesResponse:
+        """Agrupa por intervalo en DVM o, si no es posible, con NumPy"""
+        manager = self.odbc_manager
+        dimension = TIMESERIES_DIMENSIONS[group_by]
+        end = start + timedelta(seconds=bucket_seconds * count)
+
+        try:
+            logger.info(
+                f"Generando serie de abends: bucket={bucket_seconds}s, "
+                f"group_by={group_by.value}, region={region}"
+            )
+
+            rows = None
+            if manager.sql_bucketing_enabled:
+                try:
+                    rows = await self.executor.run(
+                        manager.get_abend_timeseries,
+                        start, end, bucket_seconds, dimension, region
+                    )
+                except Exception as e:
+                    manager.sql_bucketing_enabled = False
+                    logger.warning(
+                        f"Agrupación por intervalo en SQL no disponible, se usa NumPy: {e}"
+                    )
+
+            if rows is not None:
+                source = "sql"
+                columns = list(zip(*rows)) or [()] * (3 if dimension else 2)
+                indexes, weights = columns[0], columns[-1]
+            else:
+                source = "numpy"
+                rows = await self.executor.run(
+                    manager.get_abend_timestamps,
+                    start, end, dimension, region,
+                    self.settings.abend_timeseries_max_rows
+                )
+                columns = list(zip(*rows)) or [()] * (2 if dimension else 1)
+                indexes = bucket_indexes(columns[0], start, bucket_seconds)
+                weights = None
+
+            series = dense_series(
+                indexes,
+                count,
+                labels=columns[1] if dimension else None,
+                weights=weights,
+                max_series=max_series
+            )
+
+            return TimeseriesResponse.model_construct(
+                success=True,
+                bucket_seconds=bucket_seconds,
+                start=start,
+                end=end,
+                group_by=group_by,
+                buckets=bucket_starts(start, count, bucket_seconds),
+                series=series,
+                total=sum(sum(values) for values in series.values()),
+                source=source
+            )
+
+        except Exception as e:
+            logger.error(f"Error generando serie de abends: {e}")
+            raise
+
+    async def get_top_abends(
+        self,
+        window: TopAbendsWindow = TopAbendsWindow.DAY,
+        dimension: TopAbendsDimension = TopAbendsDimension.PROGRAM,
+        region: Optional[str] = None,
+        k: int = 10
+    ) -> TopAbendsResponse:
+        """
+        Obtiene el top-K aproximado de una dimensión en 24h, 7d o 30d.
+
+        Se responde desde los sketches Space-Saving que mantiene el
+        ingestor, sin consultar DVM. Cada conteo lleva su cota de error.
+
+        Args:
+            window: Ventana de tiempo
+            dimension: Programa, transacción o código de abend
+            region: Región CICS (opcional)
+            k: Elementos a retornar (como máximo ABEND_SKETCH_CAPACITY)
+
+        Returns:
+            TopAbendsResponse
+
+        Raises:
+            SketchesUnavailableError: Si la ingesta no completó el backfill
+        """
+        horizon = self.ingester.horizon
+        if horizon is None:
+            raise SketchesUnavailableError(
+                "Top-K no disponible: la ingesta de abends no completó el backfill"
+            )
+
+        sketches = self.ingester.sketches
+        start = sketches.window_start(window.value, horizon)
+        region = region.strip() if region else None
+        items = sketches.top(
+            window.value,
+            TOP_ABENDS_DIMENSIONS[dimension],
+            horizon,
+            region=region,
+            k=min(k, sketches.capacity)
+        )
+
+        return TopAbendsResponse(
+            success=True,
+            window=window,
+            dimension=dimension,
+            region=region,
+            start=start,
+            end=horizon,
+            complete=sketches.since is not None and sketches.since <= start,
+            capacity=sketches.capacity,
+            items=[HeavyHitterItem(**item._asdict()) for item in items]
+        )
+
+    async def get_abends_distinct(
+        self,
+        hours: Optional[int] = None,
+        region: Optional[str] = None
+    ) -> DistinctCountsResponse:
+        """
+        Obtiene el número aproximado de programas, transacciones, usuarios y
+        terminales distintos con abends en una ventana de tiempo.
+
+        Se responde desde los sketches HyperLogLog que mantiene el ingestor,
+        sin consultar DVM ni retener los valores.
+
+        Args:
+            hours: Ventana en horas hacia atrás (por defecto ABEND_SUMMARY_HOURS)
+            region: Región CICS (opcional)
+
+        Returns:
+            DistinctCountsResponse
+
+        Raises:
+            SketchesUnavailableError: Si la ingesta no completó el backfill
+        """
+        horizon = self.ingester.horizon
+        if horizon is None:
+            raise SketchesUnavailableError(
+                "Conteos no disponibles: la ingesta de abends no completó el backfill"
+            )
+
+        hours = hours or self.settings.abend_summary_hours
+        region = region.strip() if region else None
+        distinct = self.ingester.distinct
+        since = horizon - timedelta(hours=hours)
+        counts = distinct.counts(since, horizon, region=region)
+
+        return DistinctCountsResponse(
+            success=True,
+            region=region,
+            hours=hours,
+            start=distinct.window_start(since, horizon),
+            end=horizon,
+            complete=distinct.complete(since, horizon),
+            relative_error=round(distinct.relative_error, 5),
+            counts={DISTINCT_FIELDS[dimension]: count for dimension, count in counts.items()}
+        )
+
+    async def suggest_names(
+        self,
+        field: NameField,
+        q: str = "",
+        limit: int = 20
+    ) -> NameSuggestionsResponse:
+        """
+        Autocompleta nombres de programa o transacción con abends.
+
+        Se responde desde el índice local de nombres, sin consultar DVM.
+
+        Args:
+            field: Columna a autocompletar
+            q: Texto escrito (prefijo o subcadena, distingue mayúsculas)
+            limit: Sugerencias máximas
+
+        Returns:
+            NameSuggestionsResponse
+        """
+        index = self.odbc_manager.name_indexes[NAME_FIELDS[field]]
+        q = q.strip()
+        return NameSuggestionsResponse(
+            success=True,
+            field=field,
+            query=q,
+            names=index.suggest(q, limit),
+            complete=index.ready
+        )
+
     async def test_connection(self) -> Dict[str, Any]:
         """
         Prueba la conexión a la base de datos.
@@ -219,7 +1046,8 @@ class QueryService:
             logger.info("Probando conexión a base de datos")
 
             # Intentar ejecutar una query simple
-            result = self.odbc_manager.execute_query(
+            result = await self.executor.run(
+                self.odbc_manager.execute_query,
                 query="SELECT 1 AS test",
                 fetch_all=True
             )
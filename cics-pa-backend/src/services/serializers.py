@@ -0,0 +1,105 @@
+"""
+Serializadores de resultados.
+Convierten registros ODBC en JSON, NDJSON o CSV.
+"""
+import csv
+import io
+from typing import Any, Dict, List, Sequence
+
+from ..core.responses import dumps
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+
+
+def encode_ndjson(columns: List[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    Codifica un lote de registros como NDJSON (un objeto por línea).
+
+    Args:
+        columns: Nombres de columnas
+        rows: Registros del lote
+
+    Returns:
+        Bytes listos para escribir en la respuesta
+    """
+    lines = [dumps(dict(zip(columns, row))) for row in rows]
+    lines.append(b"")
+    return b"\n".join(lines)
+
+
+def encode_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    Codifica un lote de registros como filas CSV.
+
+    Args:
+        rows: Registros del lote
+
+    Returns:
+        Bytes listos para escribir en la respuesta
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_csv_header(columns: List[str]) -> bytes:
+    """
+    Codifica la cabecera CSV.
+
+    Args:
+        columns: Nombres de columnas
+
+    Returns:
+        Línea de cabecera en bytes
+    """
+    return encode_csv([columns])
+
+
+def export_headers(filename: str) -> Dict[str, str]:
+    """
+    Cabeceras HTTP para una descarga en streaming.
+
+    Args:
+        filename: Nombre sugerido del archivo
+
+    Returns:
+        Diccionario de cabeceras
+    """
+    return {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+    }
+
+
+class NDJSONEncoder:
+    """Codificador incremental de lotes de registros a NDJSON"""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+
+    def start(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return encode_ndjson(self.columns, rows)
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CSVEncoder:
+    """Codificador incremental de lotes de registros a CSV con cabecera"""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+
+    def start(self) -> bytes:
+        return encode_csv_header(self.columns)
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return encode_csv(rows)
+
+    def finish(self) -> bytes:
+        return b""
@@ -0,0 +1,521 @@
+"""
+Sketches de abends: top-K aproximado (Space-Saving) y conteo de valores
+distintos (HyperLogLog).
+
+Mantiene, por región, intervalo de tiempo y dimensión, un sketch de
+tamaño fijo. Los intervalos horarios cubren las últimas 24 horas y los
+diarios los últimos 30 días; una ventana se responde fusionando sus
+intervalos. La memoria es constante: intervalos retenidos x regiones x
+dimensiones x tamaño del sketch.
+
+Cada conteo del top-K es una cota superior con su error máximo: el valor
+real está en [count - error, count]. Los conteos de distintos tienen un
+error relativo típico de 1.04 / sqrt(2^precision).
+"""
+import hashlib
+import heapq
+import math
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Dimensiones con top-K, en el orden en que se reciben en add_batch
+SKETCH_DIMENSIONS = ("PROGRAM_NAME", "TRANSACTION_ID", "ABEND_CODE")
+
+# Dimensiones con conteo de distintos, en el orden en que se reciben en add_batch
+DISTINCT_DIMENSIONS = ("PROGRAM_NAME", "TRANSACTION_ID", "USER_ID", "TERMINAL_ID")
+
+
+class SketchesUnavailableError(Exception):
+    """Los sketches aún no tienen datos (ingesta desactivada o en backfill)"""
+
+
+class HeavyHitter(NamedTuple):
+    """Elemento del top-K con su conteo estimado"""
+    name: str
+    count: int  # Cota superior
+    error: int  # El conteo real es al menos count - error
+    guaranteed: bool  # Seguro dentro del top-K pese al error
+
+
+class SpaceSaving:
+    """
+    Sketch Space-Saving (Metwally et al.) de `capacity` contadores.
+
+    Al llegar un elemento no monitorizado con el sketch lleno, reemplaza al
+    de menor conteo y hereda ese conteo como error. Cualquier elemento con
+    frecuencia mayor que N / capacity está garantizado en el sketch.
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "_heap")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        # Una entrada por elemento; los conteos solo crecen, así que una
+        # entrada desactualizada es una cota inferior y se corrige al salir
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _settle_min(self) -> Tuple[int, str]:
+        """Entrada mínima del heap con su conteo actualizado"""
+        heap = self._heap
+        while True:
+            count, item = heap[0]
+            actual = self.counts[item]
+            if actual == count:
+                return count, item
+            heapq.heapreplace(heap, (actual, item))
+
+    def min_count(self) -> int:
+        """Conteo mínimo monitorizado (0 si el sketch no está lleno)"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return self._settle_min()[0]
+
+    def offer(self, item: str, weight: int = 1):
+        """
+        Cuenta `weight` ocurrencias de un elemento.
+
+        Args:
+            item: Elemento
+            weight: Ocurrencias
+        """
+        counts = self.counts
+        if item in counts:
+            counts[item] += weight
+            return
+
+        if len(counts) < self.capacity:
+            counts[item] = weight
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (weight, item))
+            return
+
+        floor, victim = self._settle_min()
+        heapq.heapreplace(self._heap, (floor + weight, item))
+        del counts[victim]
+        del self.errors[victim]
+        counts[item] = floor + weight
+        self.errors[item] = floor
+
+    def update(self, counts: Dict[str, int]):
+        """Cuenta un lote ya agregado, de mayor a menor frecuencia"""
+        for item, weight in sorted(counts.items(), key=lambda entry: -entry[1]):
+            self.offer(item, weight)
+
+    @classmethod
+    def merge(cls, sketches: Iterable["SpaceSaving"], capacity: int) -> "SpaceSaving":
+        """
+        Fusiona sketches conservando las cotas de error.
+
+        Un elemento ausente de un sketch lleno pudo tener hasta el mínimo de
+        ese sketch: se suma a su conteo y a su error.
+
+        Args:
+            sketches: Sketches a fusionar
+            capacity: Capacidad del resultado
+
+        Returns:
+            Sketch fusionado
+        """
+        total_floor = 0
+        counts: Counter = Counter()
+        errors: Counter = Counter()
+        for sketch in sketches:
+            floor = sketch.min_count()
+            total_floor += floor
+            for item, count in sketch.counts.items():
+                counts[item] += count - floor
+                errors[item] += sketch.errors[item] - floor
+
+        merged = cls(capacity)
+        for item, count in heapq.nlargest(capacity, counts.items(), key=lambda entry: entry[1]):
+            merged.counts[item] = count + total_floor
+            merged.errors[item] = errors[item] + total_floor
+        merged._heap = [(count, item) for item, count in merged.counts.items()]
+        heapq.heapify(merged._heap)
+        return merged
+
+    def top(self, k: int) -> List[HeavyHitter]:
+        """
+        Los k elementos con mayor conteo estimado.
+
+        Un elemento está garantizado si su conteo mínimo posible supera el
+        conteo estimado del primer elemento fuera del top.
+        """
+        ranked = sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))
+        threshold = ranked[k][1] if len(ranked) > k else self.min_count()
+        return [
+            HeavyHitter(item, count, self.errors[item], count - self.errors[item] >= threshold)
+            for item, count in ranked[:k]
+        ]
+
+
+def _hash64(value: str) -> int:
+    """Hash de 64 bits estable entre procesos (hash() usa semilla aleatoria)"""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+# Precisiones admitidas: el rango se calcula con frexp en float64 sobre los
+# 64 - p bits restantes del hash, exacto solo si son 53 o menos
+HLL_MIN_PRECISION = 11
+HLL_MAX_PRECISION = 16
+
+
+def _check_precision(precision: int):
+    if not HLL_MIN_PRECISION <= precision <= HLL_MAX_PRECISION:
+        raise ValueError(
+            f"Precisión de HyperLogLog fuera de rango "
+            f"({HLL_MIN_PRECISION}-{HLL_MAX_PRECISION}): {precision}"
+        )
+
+
+class HyperLogLog:
+    """
+    Sketch HyperLogLog (Flajolet et al.) de 2^precision registros de un byte.
+
+    Con precision=12 ocupa 4 KB y el error relativo típico es ~1.6%,
+    independientemente del número de valores distintos. Dos sketches se
+    fusionan con el máximo registro a registro.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int):
+        _check_precision(precision)
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        """
+        Agrega valores ya hasheados.
+
+        Args:
+            hashes: Array uint64 de hashes
+        """
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # El exponente de frexp es la longitud en bits (exacta: rest < 2^53)
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - p + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, values: Iterable[str]):
+        """Agrega valores"""
+        self.add_hashes(np.fromiter((_hash64(value) for value in values), dtype=np.uint64))
+
+    @classmethod
+    def merge(cls, sketches: Iterable["HyperLogLog"], precision: int) -> "HyperLogLog":
+        """Unión de sketches de la misma precisión"""
+        merged = cls(precision)
+        for sketch in sketches:
+            np.maximum(merged.registers, sketch.registers, out=merged.registers)
+        return merged
+
+    def count(self) -> int:
+        """Número estimado de valores distintos"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+        zeros = m - int(np.count_nonzero(self.registers))
+        if estimate <= 2.5 * m and zeros:
+            # Rango pequeño: conteo lineal sobre los registros vacíos
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class _Tier:
+    """Sketches de intervalos de `bucket_seconds`, los últimos `buckets`"""
+
+    __slots__ = ("bucket_seconds", "buckets", "sketches")
+
+    def __init__(self, bucket_seconds: int, buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        # intervalo -> (región, dimensión) -> sketch
+        self.sketches: Dict[int, Dict[Tuple[str, str], object]] = {}
+
+    def bucket_of(self, timestamp: datetime) -> int:
+        seconds = int((timestamp - _EPOCH).total_seconds())
+        return seconds - seconds % self.bucket_seconds
+
+
+# Ventanas disponibles: (segundos del intervalo, número de intervalos)
+WINDOWS = {
+    "24h": (3600, 24),
+    "7d": (86400, 7),
+    "30d": (86400, 30),
+}
+
+
+class _Windowed(ABC):
+    """
+    Sketches por región, dimensión e intervalo horario o diario.
+
+    Pensado para usarse desde el event loop: no es thread-safe.
+    """
+
+    def __init__(self):
+        self._tiers: Dict[int, _Tier] = {}
+        for bucket_seconds, buckets in WINDOWS.values():
+            # Un intervalo más: una ventana de `buckets` intervalos que no
+            # empieza alineada (las últimas 24 horas desde ahora) toca
+            # `buckets + 1` intervalos
+            buckets += 1
+            tier = self._tiers.get(bucket_seconds)
+            if tier is None or tier.buckets < buckets:
+                self._tiers[bucket_seconds] = _Tier(bucket_seconds, buckets)
+        # Desde cuándo están contados todos los abends (inicio del backfill)
+        self.since: Optional[datetime] = None
+
+    @property
+    def sketch_count(self) -> int:
+        """Número de sketches retenidos"""
+        return sum(len(buckets) for tier in self._tiers.values() for buckets in tier.sketches.values())
+
+    def _oldest(self, tier: _Tier, now: datetime) -> int:
+        """Primer intervalo de un nivel que aún entra en alguna ventana"""
+        return tier.bucket_of(now) - (tier.buckets - 1) * tier.bucket_seconds
+
+    def _buckets(
+        self,
+        rows: Iterable[Sequence],
+        dimensions: Sequence[str],
+        now: Optional[datetime]
+    ) -> Dict[Tuple[int, int, str, str], List]:
+        """Agrupa los valores de un lote por (nivel, intervalo, región, dimensión)"""
+        tiers = list(self._tiers.values())
+        oldest = [None if now is None else self._oldest(tier, now) for tier in tiers]
+        batches: Dict[Tuple[int, int, str, str], List] = {}
+        for row in rows:
+            timestamp, region = row[0], row[1]
+            for tier, first in zip(tiers, oldest):
+                bucket = tier.bucket_of(timestamp)
+                if first is not None and bucket < first:
+                    continue
+                for dimension, value in zip(dimensions, row[2:]):
+                    key = (tier.bucket_seconds, bucket, region, dimension)
+                    values = batches.get(key)
+                    if values is None:
+                        values = batches[key] = []
+                    values.append(value)
+        return batches
+
+    def _sketch(self, bucket_seconds: int, bucket: int, region: str, dimension: str):
+        sketches = self._tiers[bucket_seconds].sketches.setdefault(bucket, {})
+        sketch = sketches.get((region, dimension))
+        if sketch is None:
+            sketch = sketches[(region, dimension)] = self._new_sketch()
+        return sketch
+
+    @abstractmethod
+    def _new_sketch(self):
+        """Sketch vacío de la subclase"""
+
+    def _select(
+        self,
+        tier: _Tier,
+        first: int,
+        dimension: str,
+        region: Optional[str]
+    ) -> List:
+        """Sketches de una dimensión desde el intervalo `first`"""
+        return [
+            sketch
+            for bucket, sketches in tier.sketches.items() if bucket >= first
+            for (sketch_region, sketch_dimension), sketch in sketches.items()
+            if sketch_dimension == dimension and (region is None or sketch_region == region)
+        ]
+
+    def prune(self, now: datetime) -> int:
+        """
+        Descarta los intervalos que ya no entran en ninguna ventana.
+
+        Returns:
+            Número de intervalos descartados
+        """
+        removed = 0
+        for tier in self._tiers.values():
+            oldest = self._oldest(tier, now)
+            for bucket in [b for b in tier.sketches if b < oldest]:
+                del tier.sketches[bucket]
+                removed += 1
+        return removed
+
+    def clear(self):
+        """Descarta todos los sketches"""
+        for tier in self._tiers.values():
+            tier.sketches.clear()
+        self.since = None
+
+
+class WindowedSketches(_Windowed):
+    """Top-K por región y ventana de tiempo con memoria constante"""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.capacity = capacity
+
+    def _new_sketch(self) -> SpaceSaving:
+        return SpaceSaving(self.capacity)
+
+    @property
+    def counters(self) -> int:
+        """Número total de contadores en todos los sketches"""
+        return sum(
+            len(sketch)
+            for tier in self._tiers.values()
+            for buckets in tier.sketches.values()
+            for sketch in buckets.values()
+        )
+
+    def add_batch(self, rows: Iterable[Sequence], now: Optional[datetime] = None):
+        """
+        Cuenta un lote de abends.
+
+        Args:
+            rows: Tuplas (TIMESTAMP, región, programa, transacción, código)
+            now: Referencia temporal; los abends que ya no entran en las
+                ventanas de un nivel no se cuentan en él (opcional)
+        """
+        for key, values in self._buckets(rows, SKETCH_DIMENSIONS, now).items():
+            self._sketch(*key).update(Counter(values))
+
+    def window_start(self, window: str, now: datetime) -> datetime:
+        """Inicio de una ventana, alineado a sus intervalos"""
+        bucket_seconds, buckets = WINDOWS[window]
+        tier = self._tiers[bucket_seconds]
+        first = tier.bucket_of(now) - (buckets - 1) * bucket_seconds
+        return _EPOCH + timedelta(seconds=first)
+
+    def top(
+        self,
+        window: str,
+        dimension: str,
+        now: datetime,
+        region: Optional[str] = None,
+        k: int = 10
+    ) -> List[HeavyHitter]:
+        """
+        Top-K de una dimensión en una ventana.
+
+        Args:
+            window: "24h", "7d" o "30d"
+            dimension: Una de SKETCH_DIMENSIONS
+            now: Referencia temporal (el horizonte de ingesta)
+            region: Región CICS (None = todas)
+            k: Elementos a retornar
+
+        Returns:
+            Lista de HeavyHitter de mayor a menor conteo
+        """
+        bucket_seconds, _ = WINDOWS[window]
+        tier = self._tiers[bucket_seconds]
+        first = tier.bucket_of(self.window_start(window, now))
+
+        selected = self._select(tier, first, dimension, region)
+        return SpaceSaving.merge(selected, self.capacity).top(k)
+
+
+class WindowedDistinct(_Windowed):
+    """
+    Conteo aproximado de valores distintos por región y ventana de tiempo.
+
+    Cualquier ventana se responde con la unión de los intervalos que la
+    cubren: horarios dentro de las últimas 24 horas y diarios hasta 30
+    días. Los valores nulos no se cuentan, como en COUNT(DISTINCT).
+    """
+
+    def __init__(self, precision: int):
+        super().__init__()
+        _check_precision(precision)
+        self.precision = precision
+
+    @property
+    def relative_error(self) -> float:
+        """Error relativo típico (una desviación estándar)"""
+        return 1.04 / math.sqrt(1 << self.precision)
+
+    def _new_sketch(self) -> HyperLogLog:
+        return HyperLogLog(self.precision)
+
+    def add_batch(self, rows: Iterable[Sequence], now: Optional[datetime] = None):
+        """
+        Agrega un lote de abends.
+
+        Args:
+            rows: Tuplas (TIMESTAMP, región, programa, transacción, usuario,
+                terminal); los valores None se ignoran
+            now: Referencia temporal; los abends que ya no entran en las
+                ventanas de un nivel no se cuentan en él (opcional)
+        """
+        hashes: Dict[str, int] = {}
+        for key, values in self._buckets(rows, DISTINCT_DIMENSIONS, now).items():
+            distinct: Set[str] = {value for value in values if value is not None}
+            if not distinct:
+                continue
+            for value in distinct:
+                if value not in hashes:
+                    hashes[value] = _hash64(value)
+            self._sketch(*key).add_hashes(
+                np.fromiter((hashes[value] for value in distinct), dtype=np.uint64, count=len(distinct))
+            )
+
+    def _window(self, since: datetime, now: datetime) -> Tuple[_Tier, int]:
+        """
+        Nivel y primer intervalo de una ventana: horario si `since` cae
+        dentro de los intervalos horarios retenidos (24 horas más la hora
+        en curso), diario si no.
+        """
+        hourly = self._tiers[3600]
+        first = hourly.bucket_of(since)
+        if first >= self._oldest(hourly, now):
+            return hourly, first
+        daily = self._tiers[86400]
+        return daily, daily.bucket_of(since)
+
+    def window_start(self, since: datetime, now: datetime) -> datetime:
+        """Inicio efectivo de una ventana, alineado a la hora o al día"""
+        _, first = self._window(since, now)
+        return _EPOCH + timedelta(seconds=first)
+
+    def complete(self, since: datetime, now: datetime) -> bool:
+        """Si la ventana desde `since` está contada entera (ingesta y retención)"""
+        start = self.window_start(since, now)
+        retained = _EPOCH + timedelta(seconds=self._oldest(self._tiers[86400], now))
+        return self.since is not None and self.since <= start and start >= retained
+
+    def counts(
+        self,
+        since: datetime,
+        now: datetime,
+        region: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Valores distintos de cada dimensión desde `since`.
+
+        Args:
+            since: Inicio de la ventana (se alinea con window_start)
+            now: Referencia temporal (el horizonte de ingesta)
+            region: Región CICS (None = todas)
+
+        Returns:
+            Diccionario dimensión -> número estimado de valores distintos
+        """
+        tier, first = self._window(since, now)
+        return {
+            dimension: HyperLogLog.merge(
+                self._select(tier, first, dimension, region), self.precision
+            ).count()
+            for dimension in DISTINCT_DIMENSIONS
+        }
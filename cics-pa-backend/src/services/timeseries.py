@@ -0,0 +1,120 @@
+"""
+Series temporales de abends con agrupamiento vectorizado.
+
+Convierte los conteos por intervalo (agrupados en DVM) o los TIMESTAMP
+leídos (cuando el driver no puede agrupar por intervalo) en series densas
+listas para graficar. Todo el agrupamiento se hace con operaciones de
+arrays de NumPy en lugar de bucles por registro.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Origen de los intervalos: alineados a múltiplos de su tamaño desde epoch
+_EPOCH = datetime(1970, 1, 1)
+
+# Nombre de la serie cuando no se separa por dimensión
+TOTAL_SERIES = "total"
+# Serie que acumula los grupos fuera del top
+OTHER_SERIES = "OTHER"
+
+
+def align_range(
+    start: datetime,
+    end: datetime,
+    bucket_seconds: int
+) -> Tuple[datetime, int]:
+    """
+    Alinea un rango a intervalos de `bucket_seconds`.
+
+    El inicio se redondea hacia abajo y el fin hacia arriba, de modo que
+    dos requests del mismo intervalo producen los mismos intervalos.
+
+    Args:
+        start: Inicio del rango
+        end: Fin del rango (exclusivo)
+        bucket_seconds: Tamaño de cada intervalo
+
+    Returns:
+        Tupla (inicio alineado, número de intervalos)
+    """
+    offset = int((start - _EPOCH).total_seconds())
+    aligned = _EPOCH + timedelta(seconds=offset - offset % bucket_seconds)
+    span = (end - aligned).total_seconds()
+    return aligned, max(1, -int(-span // bucket_seconds))
+
+
+def bucket_starts(start: datetime, count: int, bucket_seconds: int) -> List[datetime]:
+    """Inicio de cada intervalo"""
+    starts = np.datetime64(start, "s") + np.arange(count) * np.timedelta64(bucket_seconds, "s")
+    return starts.tolist()
+
+
+def bucket_indexes(
+    timestamps: Sequence[datetime],
+    start: datetime,
+    bucket_seconds: int
+) -> np.ndarray:
+    """
+    Índice de intervalo de cada TIMESTAMP.
+
+    Args:
+        timestamps: TIMESTAMP de los abends
+        start: Inicio del primer intervalo
+        bucket_seconds: Tamaño de cada intervalo
+
+    Returns:
+        Array int64 de índices
+    """
+    values = np.asarray(timestamps, dtype="datetime64[us]")
+    offsets = values - np.datetime64(start, "us")
+    return offsets // np.timedelta64(bucket_seconds, "s")
+
+
+def dense_series(
+    indexes: np.ndarray,
+    count: int,
+    labels: Optional[Sequence[Optional[str]]] = None,
+    weights: Optional[Sequence[int]] = None,
+    max_series: int = 10
+) -> Dict[str, List[int]]:
+    """
+    Construye series densas (un valor por intervalo) a partir de índices.
+
+    Los grupos se ordenan por total descendente; los que quedan fuera de
+    los `max_series` primeros se suman en la serie OTHER.
+
+    Args:
+        indexes: Índice de intervalo de cada registro (o grupo)
+        count: Número de intervalos
+        labels: Valor de la dimensión de cada registro (None = una serie)
+        weights: Conteo de cada registro si ya vienen agregados
+        max_series: Series máximas antes de agrupar el resto
+
+    Returns:
+        Diccionario grupo -> lista de `count` conteos
+    """
+    indexes = np.asarray(indexes, dtype=np.int64)
+    valid = (indexes >= 0) & (indexes < count)
+
+    if labels is None:
+        names = np.array([TOTAL_SERIES], dtype=object)
+        groups = np.zeros(len(indexes), dtype=np.int64)
+    else:
+        values = np.array(labels, dtype=object)
+        values[values == None] = "UNKNOWN"  # noqa: E711 - comparación elemento a elemento
+        # Las columnas CHAR llegan con relleno de espacios
+        values = np.char.strip(values.astype(str))
+        names, groups = np.unique(values, return_inverse=True)
+
+    flat = groups[valid] * count + indexes[valid]
+    weight = None if weights is None else np.asarray(weights, dtype=np.int64)[valid]
+    matrix = np.bincount(flat, weights=weight, minlength=len(names) * count)
+    matrix = matrix.astype(np.int64).reshape(len(names), count)
+
+    order = np.argsort(-matrix.sum(axis=1), kind="stable")
+    series = {str(names[i]): matrix[i].tolist() for i in order[:max_series]}
+    if len(order) > max_series:
+        series[OTHER_SERIES] = matrix[order[max_series:]].sum(axis=0).tolist()
+    return series
@@ -0,0 +1,17 @@
+"""
+Fixtures compartidas por los tests
+"""
+import pytest
+
+
+class InlineExecutor:
+    """Ejecutor que corre las funciones en el event loop"""
+
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+@pytest.fixture
+def inline_executor():
+    """Sustituto del ODBCExecutor que ejecuta las llamadas sin threads"""
+    return InlineExecutor()
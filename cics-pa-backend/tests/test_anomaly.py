@@ -0,0 +1,72 @@
+"""
+Tests para la detección incremental de picos de abends
+"""
+from datetime import datetime, timedelta
+
+from prometheus_client import REGISTRY
+
+from src.services.anomaly import ALL_CODES, AbendRateDetector
+
+START = datetime(2024, 11, 9, 8, 0)
+
+
+def _feed(detector, minute, region, code, count):
+    for second in range(count):
+        detector.observe(START + timedelta(minutes=minute, seconds=second % 60), region, code)
+
+
+def _score(region, code):
+    return REGISTRY.get_sample_value(
+        "cics_pa_abend_anomaly_score", {"region": region, "abend_code": code}
+    )
+
+
+def test_spike_scores_high_after_steady_baseline():
+    """Test que un pico sobre una tasa estable da una puntuación alta y la tasa estable no"""
+    detector = AbendRateDetector(interval_seconds=60, halflife_minutes=30, warmup=10, max_keys=50)
+    for minute in range(60):
+        _feed(detector, minute, "PROD01", "ASRA", 5 + minute % 2)
+    detector.advance(START + timedelta(minutes=60))
+
+    assert abs(_score("PROD01", "ASRA")) < 2
+    assert 4 < detector.baseline("PROD01", "ASRA").mean < 7
+
+    _feed(detector, 60, "PROD01", "ASRA", 60)
+    detector.advance(START + timedelta(minutes=61))
+
+    assert _score("PROD01", "ASRA") > 10
+    assert _score("PROD01", ALL_CODES) > 10
+    assert REGISTRY.get_sample_value(
+        "cics_pa_abend_rate", {"region": "PROD01", "abend_code": ALL_CODES}
+    ) == 1.0
+
+
+def test_new_code_after_warmup_scores_immediately_and_idle_keys_expire():
+    """Test que un código nuevo puntúa desde su primer intervalo y las claves inactivas se descartan"""
+    detector = AbendRateDetector(interval_seconds=60, halflife_minutes=5, warmup=10, max_keys=50)
+    for minute in range(20):
+        _feed(detector, minute, "PROD02", "AEY9", 2)
+    _feed(detector, 20, "PROD02", "AZCT", 8)
+    detector.advance(START + timedelta(minutes=21))
+
+    assert _score("PROD02", "AZCT") == 8.0
+
+    # Sin abends la línea base decae hasta dejar de seguirse
+    detector.advance(START + timedelta(hours=3))
+    assert detector.key_count == 0
+    assert _score("PROD02", "AZCT") is None
+
+
+def test_max_keys_evicts_lowest_codes_but_keeps_region_totals():
+    """Test que el límite de claves descarta los códigos de menor tasa y no los totales"""
+    detector = AbendRateDetector(interval_seconds=60, halflife_minutes=30, warmup=0, max_keys=3)
+    _feed(detector, 0, "PROD03", "ASRA", 9)
+    _feed(detector, 0, "PROD03", "AEY9", 5)
+    _feed(detector, 0, "PROD03", "AICA", 1)
+    detector.advance(START + timedelta(minutes=1))
+
+    assert detector.key_count == 3
+    assert detector.baseline("PROD03") is not None
+    assert detector.baseline("PROD03", "ASRA") is not None
+    assert detector.baseline("PROD03", "AICA") is None
+    assert _score("PROD03", "AICA") is None
@@ -118,3 +118,260 @@ async def test_get_abends_endpoint(mock_query_service):
     data = response.json()
     assert data["success"] is True
     assert "abends" in data
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint_reports_pool_state(mock_query_service):
+    """Test del readiness check"""
+    from src.services import get_query_service
+
+    mock_query_service.odbc_manager.ready = False
+    mock_query_service.odbc_manager.pool.status.return_value = {"size": 0}
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/health/ready")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+
+@pytest.mark.asyncio
+async def test_export_abends_streams_ndjson(mock_query_service):
+    """Test del endpoint de exportación en streaming"""
+    from src.services import get_query_service
+
+    async def chunks():
+        yield b'{"CICS_REGION": "PROD01"}\n'
+        yield b'{"CICS_REGION": "PROD02"}\n'
+
+    mock_query_service.stream_abends = AsyncMock(return_value=chunks())
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/query/abends/export",
+                params={"region": "PROD01", "format": "ndjson"}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert len(response.text.splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_abends_columnar_format(mock_query_service):
+    """Test del formato columnar de abends"""
+    from datetime import datetime
+    from src.models import ColumnarAbendsResponse
+    from src.services import get_query_service
+
+    mock_query_service.get_abends_columnar = AsyncMock(
+        return_value=ColumnarAbendsResponse.model_construct(
+            success=True,
+            columns=["TIMESTAMP", "CICS_REGION"],
+            rows=[(datetime(2024, 11, 9, 10, 30), "PROD01")],
+            total=1,
+            filters_applied={"region": "PROD01"}
+        )
+    )
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/query/abends",
+                params={"region": "PROD01", "format": "columnar"}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["columns"] == ["TIMESTAMP", "CICS_REGION"]
+    assert data["rows"] == [["2024-11-09T10:30:00", "PROD01"]]
+    mock_query_service.get_abends.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_continue_query_with_expired_token(mock_query_service):
+    """Test que un token de continuación expirado retorna 404"""
+    from src.database import CursorNotFoundError
+    from src.services import get_query_service
+
+    mock_query_service.continue_query = AsyncMock(
+        side_effect=CursorNotFoundError("Token de continuación inválido o expirado")
+    )
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/query/execute/continue",
+                json={"continuation_token": "expirado"}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_abends_not_modified(mock_query_service):
+    """Test que If-None-Match con el ETag vigente retorna 304 sin cuerpo"""
+    from src.services import get_query_service
+
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/api/v1/query/abends")
+            etag = first.headers["etag"]
+            second = await client.get(
+                "/api/v1/query/abends",
+                headers={"If-None-Match": etag}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert "must-revalidate" in first.headers["cache-control"]
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_abends_timeseries_endpoint(mock_query_service):
+    """Test del endpoint de series temporales y del 400 con rango inválido"""
+    from datetime import datetime
+    from src.models import TimeseriesGroupBy, TimeseriesResponse
+    from src.services import get_query_service
+
+    mock_query_service.get_abends_timeseries = AsyncMock(return_value=TimeseriesResponse(
+        success=True,
+        bucket_seconds=3600,
+        start=datetime(2024, 11, 9, 10, 0),
+        end=datetime(2024, 11, 9, 12, 0),
+        group_by=TimeseriesGroupBy.REGION,
+        buckets=[datetime(2024, 11, 9, 10, 0), datetime(2024, 11, 9, 11, 0)],
+        series={"PROD01": [2, 0]},
+        total=2,
+        source="sql"
+    ))
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/query/abends/timeseries",
+                params={"group_by": "region", "bucket_seconds": 3600}
+            )
+            mock_query_service.get_abends_timeseries.side_effect = ValueError("rango vacío")
+            invalid = await client.get("/api/v1/query/abends/timeseries")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["series"] == {"PROD01": [2, 0]}
+    assert "etag" in response.headers
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_top_abends_endpoint(mock_query_service):
+    """Test del endpoint de top-K y del 503 mientras la ingesta no terminó el backfill"""
+    from datetime import datetime
+    from src.models import (
+        HeavyHitterItem,
+        TopAbendsDimension,
+        TopAbendsResponse,
+        TopAbendsWindow,
+    )
+    from src.services import get_query_service
+    from src.services.sketches import SketchesUnavailableError
+
+    mock_query_service.get_top_abends = AsyncMock(return_value=TopAbendsResponse(
+        success=True,
+        window=TopAbendsWindow.WEEK,
+        dimension=TopAbendsDimension.ABEND_CODE,
+        start=datetime(2024, 11, 3),
+        end=datetime(2024, 11, 9, 10, 15),
+        complete=True,
+        capacity=200,
+        items=[HeavyHitterItem(name="ASRA", count=42, error=0, guaranteed=True)]
+    ))
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/query/abends/top",
+                params={"window": "7d", "dimension": "abend_code"}
+            )
+            mock_query_service.get_top_abends.side_effect = SketchesUnavailableError("backfill")
+            unavailable = await client.get("/api/v1/query/abends/top")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["items"][0] == {
+        "name": "ASRA", "count": 42, "error": 0, "guaranteed": True
+    }
+    kwargs = mock_query_service.get_top_abends.call_args_list[0].kwargs
+    assert kwargs["window"] == TopAbendsWindow.WEEK
+    assert unavailable.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_abend_names_endpoint(mock_query_service):
+    """Test del endpoint de autocompletado de nombres"""
+    from src.models import NameField, NameSuggestionsResponse
+    from src.services import get_query_service
+
+    mock_query_service.suggest_names = AsyncMock(return_value=NameSuggestionsResponse(
+        success=True,
+        field=NameField.TRANSACTION,
+        query="T1",
+        names=["T100", "T101"],
+        complete=True
+    ))
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/query/abends/names",
+                params={"field": "transaction", "q": "T1", "limit": 5}
+            )
+            invalid = await client.get("/api/v1/query/abends/names", params={"field": "user"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["names"] == ["T100", "T101"]
+    assert mock_query_service.suggest_names.call_args.kwargs == {
+        "field": NameField.TRANSACTION, "q": "T1", "limit": 5
+    }
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_abends_with_several_regions(mock_query_service):
+    """Test que /query/abends admite la región repetida o separada por comas"""
+    from src.services import get_query_service
+
+    app.dependency_overrides[get_query_service] = lambda: mock_query_service
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/query/abends",
+                params=[("region", "PROD01"), ("region", "PROD02,PROD03"), ("limit", "50")]
+            )
+            mock_query_service.get_abends.side_effect = ValueError("demasiadas regiones")
+            too_many = await client.get("/api/v1/query/abends", params={"region": "A,B"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    kwargs = mock_query_service.get_abends.call_args_list[0].kwargs
+    assert kwargs["region"] == ["PROD01", "PROD02,PROD03"]
+    assert too_many.status_code == 400
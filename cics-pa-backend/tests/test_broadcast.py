@@ -0,0 +1,81 @@
+"""
+Tests para el stream en vivo de abends
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+from httpx import AsyncClient
+
+from src.database.keyset import decode_cursor
+from src.main import app
+from src.services.broadcast import AbendBroadcaster
+
+COLUMNS = ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID", "PROGRAM_NAME", "ABEND_CODE"]
+KEYSET = ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID"]
+ROWS = [
+    (datetime(2024, 11, 9, 10, 0), "PROD01  ", "T1", "PAYROLL", "ASRA"),
+    (datetime(2024, 11, 9, 10, 1), "PROD02  ", "T2", "PAYROLL", "AEY9"),
+    (datetime(2024, 11, 9, 10, 2), "PROD01  ", "T3", "INVOICE", "ASRA"),
+]
+
+
+def _parse(event: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in event.decode().strip().split("\n"))
+    fields["data"] = orjson.loads(fields["data"])
+    return fields
+
+
+@pytest.mark.asyncio
+async def test_batches_are_filtered_per_client():
+    """Test que cada cliente recibe solo los abends de sus filtros, con cursor como id"""
+    broadcaster = AbendBroadcaster(KEYSET, max_clients=10, queue_size=10, heartbeat=5)
+    region_client = broadcaster.subscribe(region="PROD01")
+    program_client = broadcaster.subscribe(program="INVO")
+
+    region_events = broadcaster.events(region_client)
+    program_events = broadcaster.events(program_client)
+    assert await region_events.__anext__() == b"retry: 5000\n\n"
+    await program_events.__anext__()
+
+    broadcaster.publish(COLUMNS, ROWS)
+
+    event = _parse(await region_events.__anext__())
+    assert event["event"] == "abends"
+    assert [row[2] for row in event["data"]["rows"]] == ["T1", "T3"]
+    assert decode_cursor(event["id"], 3) == ROWS[2][:3]
+
+    event = _parse(await program_events.__anext__())
+    assert [row[2] for row in event["data"]["rows"]] == ["T3"]
+
+    await region_events.aclose()
+    assert broadcaster.clients == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_client_is_dropped():
+    """Test que un cliente que no consume se desconecta con un evento overflow"""
+    broadcaster = AbendBroadcaster(KEYSET, max_clients=10, queue_size=1, heartbeat=5)
+    client = broadcaster.subscribe()
+    events = broadcaster.events(client)
+    await events.__anext__()
+
+    broadcaster.publish(COLUMNS, ROWS[:1])
+    broadcaster.publish(COLUMNS, ROWS[1:])
+
+    assert broadcaster.clients == 0
+    assert _parse(await events.__anext__())["event"] == "overflow"
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(events.__anext__(), 1)
+
+
+@pytest.mark.asyncio
+async def test_stream_unavailable_without_ingester():
+    """Test que sin ingesta el stream responde 503"""
+    with patch("src.api.query.get_abend_ingester", return_value=MagicMock(running=False)):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/query/abends/stream")
+
+    assert response.status_code == 503
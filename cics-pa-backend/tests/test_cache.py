@@ -0,0 +1,89 @@
+"""
+Tests para la caché de resultados
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.services.cache import ResultCache
+
+
+@pytest.mark.asyncio
+async def test_single_flight_runs_one_query_for_concurrent_requests():
+    """Test que 50 requests idénticas concurrentes generan una sola consulta"""
+    cache = ResultCache("test", ttl=60, max_bytes=10 ** 6)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [("PROD01", "ASRA")]
+
+    results = await asyncio.gather(*[
+        cache.get_or_load(("abends", "PROD01"), load) for _ in range(50)
+    ])
+
+    assert calls == 1
+    assert all(result == [("PROD01", "ASRA")] for result in results)
+
+    await cache.get_or_load(("abends", "PROD01"), load)
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_and_errors_are_reloaded():
+    """Test que las entradas expiradas y los errores no se sirven de la caché"""
+    cache = ResultCache("test", ttl=1, max_bytes=10 ** 6)
+
+    async def fail():
+        raise RuntimeError("DVM no disponible")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("k", fail)
+
+    async def load():
+        return ["ok"]
+
+    assert await cache.get_or_load("k", load) == ["ok"]
+
+    with patch("src.services.cache.time.monotonic", return_value=10 ** 9):
+        assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction_bounded_by_bytes():
+    """Test que se expulsa la entrada menos usada al superar max_bytes"""
+    cache = ResultCache("test", ttl=60, max_bytes=2000)
+    cache.set("a", "x" * 800)
+    cache.set("b", "y" * 800)
+    assert cache.get("a") is not None  # "a" pasa a ser la más reciente
+
+    cache.set("c", "z" * 800)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size <= 2000
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tag_drops_entries_and_inflight_loads():
+    """Test que invalidar una etiqueta descarta sus entradas y sus cargas en curso"""
+    cache = ResultCache("test", ttl=60, max_bytes=10 ** 6)
+    cache.set("a", ["a"], tags=["PROD01"])
+    cache.set("b", ["b"], tags=["PROD02"])
+
+    async def load():
+        await asyncio.sleep(0.01)
+        return ["obsoleto"]
+
+    pending = asyncio.ensure_future(cache.get_or_load("c", load, tags=["PROD01"]))
+    await asyncio.sleep(0)
+
+    assert cache.invalidate_tag("PROD01") == 1
+    assert await pending == ["obsoleto"]
+
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert cache.get("b") == ["b"]
@@ -0,0 +1,107 @@
+"""
+Tests para la caché de metadata de tablas
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database.catalog import TableCatalog, TableNotFoundError
+
+
+def catalog_row(name, ordinal, type_name="CHAR", size=8, nullable=1):
+    """Registro de SQLColumns"""
+    return SimpleNamespace(
+        column_name=name,
+        ordinal_position=ordinal,
+        type_name=type_name,
+        column_size=size,
+        nullable=nullable
+    )
+
+
+@pytest.fixture
+def catalog():
+    """Catálogo sobre un pool mock"""
+    pool = MagicMock()
+    conn = pool.get_connection.return_value.__enter__.return_value
+    return TableCatalog(pool, ttl=60, negative_ttl=60), conn.cursor.return_value
+
+
+def test_columns_come_from_catalog_and_are_cached(catalog):
+    """Test que las columnas se leen con SQLColumns una sola vez"""
+    catalog, cursor = catalog
+    cursor.columns.return_value.fetchall.return_value = [
+        catalog_row("CICS_REGION", 2, nullable=0),
+        catalog_row("TIMESTAMP", 1, type_name="TIMESTAMP", size=26),
+    ]
+
+    first = catalog.get_columns("cics_abends")
+    second = catalog.get_columns("CICS_ABENDS")
+
+    assert [c["name"] for c in first] == ["TIMESTAMP", "CICS_REGION"]
+    assert first[1]["nullable"] is False
+    assert second is first
+    cursor.execute.assert_not_called()
+    assert cursor.columns.call_count == 1
+
+
+def test_missing_table_is_negatively_cached(catalog):
+    """Test de caché negativa para tablas inexistentes"""
+    catalog, cursor = catalog
+    cursor.columns.return_value.fetchall.return_value = []
+
+    with pytest.raises(TableNotFoundError):
+        catalog.get_columns("NO_EXISTE")
+    with pytest.raises(TableNotFoundError):
+        catalog.get_columns("NO_EXISTE")
+
+    assert cursor.columns.call_count == 1
+
+    assert catalog.invalidate("NO_EXISTE") == 1
+    with pytest.raises(TableNotFoundError):
+        catalog.get_columns("NO_EXISTE")
+    assert cursor.columns.call_count == 2
+
+
+def test_failed_load_keeps_single_flight_for_waiters(catalog):
+    """Test que tras una carga fallida los threads en espera no cargan en paralelo"""
+    import threading
+    import time
+
+    catalog, _ = catalog
+    counter = threading.Lock()
+    gate = threading.Event()
+    state = {"active": 0, "peak": 0}
+
+    def load(table_name):
+        with counter:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        try:
+            gate.wait(1)
+            time.sleep(0.2)
+            raise RuntimeError("DVM no disponible")
+        finally:
+            with counter:
+                state["active"] -= 1
+
+    def lookup():
+        with pytest.raises(RuntimeError):
+            catalog.get_columns("CICS_ABENDS")
+
+    catalog._load = load
+    first, waiter, late = (threading.Thread(target=lookup) for _ in range(3))
+    first.start()
+    time.sleep(0.05)
+    waiter.start()
+    time.sleep(0.05)
+    gate.set()
+    # Llega cuando la primera carga ya falló y la segunda está en curso
+    time.sleep(0.3)
+    late.start()
+    for thread in (first, waiter, late):
+        thread.join()
+
+    assert state["peak"] == 1
+    assert catalog._loading == {}
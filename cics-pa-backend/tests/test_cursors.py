@@ -0,0 +1,77 @@
+"""
+Tests para los cursores paginados
+"""
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database.cursors import CursorRegistry, CursorNotFoundError, CursorLimitError
+from src.database.manager import ResultStream
+
+
+def make_stream(rows):
+    """ResultStream sobre un cursor mock que devuelve `rows` con fetchmany"""
+    remaining = list(rows)
+    cursor = MagicMock()
+    cursor.description = [("ID", int, None, 10, 10, 0, False)]
+
+    def fetchmany(size):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    cursor.fetchmany.side_effect = fetchmany
+    pool = MagicMock()
+    stream = ResultStream(pool, MagicMock(), cursor, 100, "SELECT", "T", time.perf_counter())
+    return stream, pool
+
+
+def test_cursor_pages_through_result_without_rerunning():
+    """Test que las páginas se leen del mismo cursor hasta agotarlo"""
+    registry = CursorRegistry(max_open=1, ttl=60)
+    stream, pool = make_stream([(i,) for i in range(5)])
+    open_stream = MagicMock(return_value=stream)
+
+    page = registry.open(open_stream, page_size=2)
+    assert page.rows == [(0,), (1,)]
+    assert page.continuation_token
+
+    page = registry.fetch(page.continuation_token, page_size=2)
+    assert page.rows == [(2,), (3,)]
+
+    page = registry.fetch(page.continuation_token, page_size=2)
+    assert page.rows == [(4,)]
+    assert page.continuation_token is None
+
+    open_stream.assert_called_once()
+    pool.checkin.assert_called_once()
+    assert registry.open_count == 0
+
+
+def test_cursor_not_registered_when_first_page_is_complete():
+    """Test que un resultado de una sola página no deja el cursor abierto"""
+    registry = CursorRegistry(max_open=1, ttl=60)
+    stream, pool = make_stream([(1,), (2,)])
+
+    page = registry.open(lambda: stream, page_size=2)
+
+    assert page.continuation_token is None
+    assert stream.closed
+    assert registry.open_count == 0
+
+
+def test_cursor_limit_and_expiration():
+    """Test del máximo de cursores abiertos y su cierre por TTL"""
+    registry = CursorRegistry(max_open=1, ttl=0)
+    stream, pool = make_stream([(i,) for i in range(5)])
+    token = registry.open(lambda: stream, page_size=1).continuation_token
+
+    with pytest.raises(CursorLimitError):
+        registry.open(lambda: make_stream([(1,)])[0], page_size=1)
+
+    assert registry.sweep() == 1
+    assert stream.closed
+    with pytest.raises(CursorNotFoundError):
+        registry.fetch(token, page_size=1)
+    registry.stop_sweeper()
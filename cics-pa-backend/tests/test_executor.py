@@ -0,0 +1,61 @@
+"""
+Tests para el ejecutor ODBC
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.database.executor import ODBCExecutor
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_outside_event_loop():
+    """Test que la función se ejecuta en un thread del ejecutor"""
+    executor = ODBCExecutor(max_workers=1)
+    try:
+        thread_name = await executor.run(lambda: threading.current_thread().name)
+    finally:
+        executor.shutdown()
+
+    assert thread_name.startswith("odbc-worker")
+
+
+@pytest.mark.asyncio
+async def test_executor_does_not_block_event_loop():
+    """Test que una llamada lenta no bloquea otras corutinas"""
+    executor = ODBCExecutor(max_workers=1)
+    try:
+        slow = asyncio.create_task(executor.run(time.sleep, 0.3))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        # Mientras la primera ocupa el único worker, la segunda espera en cola
+        queued = asyncio.create_task(executor.run(lambda: "ok"))
+        await asyncio.sleep(0.01)
+        assert executor.queue_depth == 1
+
+        await slow
+        assert await queued == "ok"
+    finally:
+        executor.shutdown()
+
+    assert elapsed < 0.2
+    assert executor.queue_depth == 0
+
+
+def test_default_workers_cover_pool_overflow():
+    """Test que por defecto hay un worker por cada conexión que puede abrir el pool"""
+    from unittest.mock import patch
+
+    from src.core import get_settings
+    from src.database import executor as executor_module
+
+    settings = get_settings()
+    with patch.object(executor_module, "_odbc_executor", None), \
+            patch.object(settings, "db_executor_workers", None):
+        odbc_executor = executor_module.get_odbc_executor()
+
+    assert odbc_executor.max_workers == settings.pool_size + settings.max_overflow
@@ -0,0 +1,79 @@
+"""
+Tests para la invalidación de caché por marca de agua
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.cache import ResultCache
+from src.services.freshness import WatermarkProbe, region_tag
+
+
+@pytest.fixture
+def probe():
+    """Sonda con un ejecutor que retorna marcas de agua en secuencia"""
+    cache = ResultCache("test", ttl=60, max_bytes=10 ** 6)
+    executor = MagicMock()
+    executor.run = AsyncMock()
+    return WatermarkProbe(cache, MagicMock(), executor, interval=0)
+
+
+@pytest.mark.asyncio
+async def test_only_changed_regions_are_invalidated(probe):
+    """Test que solo se invalidan la región que cambió y los resultados globales"""
+    cache = probe.cache
+    probe.executor.run.side_effect = [
+        {"PROD01": ("t1", 10), "PROD02": ("t1", 5)},
+        {"PROD01": ("t2", 11), "PROD02": ("t1", 5)},
+    ]
+    assert await probe.probe() == []
+    assert probe.active
+
+    cache.set("prod01", ["a"], tags=[region_tag("PROD01")])
+    cache.set("prod02", ["b"], tags=[region_tag("PROD02")])
+    cache.set("all", ["c"], tags=[region_tag(None)])
+
+    assert await probe.probe() == ["PROD01"]
+
+    assert cache.get("prod01") is None
+    assert cache.get("all") is None
+    assert cache.get("prod02") == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_probe_failure_clears_cache(probe):
+    """Test que si la sonda falla se vacía la caché y se desactiva"""
+    probe.executor.run.side_effect = [{"PROD01": ("t1", 1)}, RuntimeError("DVM caído")]
+    await probe.probe()
+    probe.cache.set("prod01", ["a"], tags=[region_tag("PROD01")])
+
+    await probe.probe()
+
+    assert not probe.active
+    assert len(probe.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_probe_counts_from_a_fixed_recent_start(probe):
+    """Test que la sonda cuenta desde un inicio fijo y lo adelanta vaciando la caché"""
+    from datetime import timedelta
+    from unittest.mock import patch
+
+    from src.services.ingest import utc_now
+
+    now = utc_now()
+    probe.executor.run.side_effect = [{"PROD01": ("t1", 1)}] * 3
+    with patch("src.services.freshness.utc_now", return_value=now):
+        await probe.probe()
+    with patch("src.services.freshness.utc_now", return_value=now + timedelta(hours=1)):
+        await probe.probe()
+
+    first, second = (call.args[1] for call in probe.executor.run.call_args_list)
+    assert first == second == now - probe.window
+
+    probe.cache.set("prod01", ["a"], tags=[region_tag("PROD01")])
+    with patch("src.services.freshness.utc_now", return_value=now + 2 * probe.window):
+        assert await probe.probe() == []
+
+    assert probe.executor.run.call_args.args[1] == now + probe.window
+    assert probe.cache.get("prod01") is None
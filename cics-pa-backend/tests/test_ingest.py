@@ -0,0 +1,223 @@
+"""
+Tests para los agregados de abends en memoria
+"""
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services.ingest import FOLD_SLICE_ROWS, AbendIngester, utc_now
+
+COLUMNS = [
+    "TIMESTAMP", "CICS_REGION", "TRANSACTION_ID", "PROGRAM_NAME", "ABEND_CODE",
+    "USER_ID", "TERMINAL_ID",
+]
+
+
+def _table(rows):
+    """get_new_abends sobre una tabla en memoria ordenada por keyset"""
+    def get_new_abends(until, since=None, after=None, limit=5000, all_columns=False):
+        selected = [
+            row for row in rows
+            if row[0] <= until
+            and (row[0] > after if after is not None else since is None or row[0] >= since)
+        ]
+        return COLUMNS, selected[:limit] if limit is not None else selected
+    return get_new_abends
+
+
+@pytest.fixture
+def ingester(inline_executor):
+    manager = MagicMock()
+    manager.abend_keyset_columns = ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID"]
+    manager.recent = None
+    return AbendIngester(
+        manager,
+        inline_executor,
+        interval=10,
+        retention_hours=24,
+        bucket_seconds=300,
+        lag_seconds=30,
+        batch_size=2
+    )
+
+
+@pytest.mark.asyncio
+async def test_poll_reads_in_batches_and_resumes_from_last_key(ingester):
+    """Test que el backfill lee por lotes y los sondeos siguientes continúan desde el último registro"""
+    t = utc_now() - timedelta(hours=1)
+    ingester.manager.get_new_abends.side_effect = _table([
+        (t, "PROD01  ", "T1", "PAYROLL", "ASRA", "USER1   ", "TRM1"),
+        (t, "PROD01  ", "T2", "PAYROLL", "AEY9", "USER1   ", "TRM2"),
+        (t + timedelta(minutes=1), "PROD02", "T3", "INVOICE", "ASRA", "USER2", None),
+    ])
+
+    assert await ingester.poll() == 3
+    assert ingester.covers(utc_now() - timedelta(hours=2))
+    assert not ingester.covers(utc_now() - timedelta(hours=25))
+
+    assert await ingester.poll() == 0
+    last_call = ingester.manager.get_new_abends.call_args_list[-1][0]
+    assert last_call[2] == t + timedelta(minutes=1)
+
+    counts = ingester.aggregates.counts(utc_now() - timedelta(hours=2))
+    assert counts["CICS_REGION"] == {"PROD01": 2, "PROD02": 1}
+    assert counts["ABEND_CODE"] == {"ASRA": 2, "AEY9": 1}
+
+    counts = ingester.aggregates.counts(utc_now() - timedelta(hours=2), region="PROD01")
+    assert counts["PROGRAM_NAME"] == {"PAYROLL": 2}
+
+    distinct = ingester.distinct.counts(utc_now() - timedelta(hours=2), ingester.horizon)
+    assert distinct == {"PROGRAM_NAME": 2, "TRANSACTION_ID": 3, "USER_ID": 2, "TERMINAL_ID": 2}
+
+
+def test_buckets_outside_retention_are_pruned(ingester):
+    """Test que los intervalos más antiguos que la retención se descartan"""
+    now = utc_now()
+    aggregates = ingester.aggregates
+    aggregates.add(now - timedelta(hours=30), ("PROD01", "PAYROLL", "ASRA"))
+    aggregates.add(now - timedelta(hours=1), ("PROD01", "PAYROLL", "ASRA"))
+
+    assert aggregates.prune(now) == 1
+    assert aggregates.key_count == 1
+
+
+@pytest.mark.asyncio
+async def test_only_new_rows_are_broadcast(ingester):
+    """Test que el backfill no se difunde y los sondeos siguientes sí"""
+    ingester.broadcaster = MagicMock(clients=1)
+    t = utc_now() - timedelta(minutes=5)
+    backfill = [(t, "PROD01", "T1", "PAYROLL", "ASRA", "USER1", "TRM1")]
+    new = [(t + timedelta(minutes=1), "PROD01", "T2", "PAYROLL", "ASRA", "USER1", "TRM1")]
+    ingester.manager.get_new_abends.side_effect = [(COLUMNS, backfill), (COLUMNS, new)]
+
+    await ingester.poll()
+    ingester.broadcaster.publish.assert_not_called()
+
+    await ingester.poll()
+    ingester.broadcaster.publish.assert_called_once_with(COLUMNS, new)
+    assert ingester.manager.get_new_abends.call_args[0][4] is True
+
+
+@pytest.mark.asyncio
+async def test_sketch_backfill_beyond_retention_skips_aggregates(ingester):
+    """Test que los días anteriores a la retención solo alimentan los sketches"""
+    ingester.sketch_backfill = timedelta(days=7)
+    ingester.manager.recent = MagicMock()
+    old = utc_now() - timedelta(days=3)
+    recent = utc_now() - timedelta(hours=1)
+    ingester.manager.get_new_abends.side_effect = _table([
+        (old, "PROD01", "T1", "PAYROLL", "ASRA", "USER1", "TRM1"),
+        (recent, "PROD01", "T2", "INVOICE", "AEY9", "USER2", "TRM2"),
+    ])
+
+    assert await ingester.poll() == 2
+
+    since = ingester.manager.get_new_abends.call_args_list[0][0][1]
+    assert utc_now() - since > timedelta(days=6)
+    assert ingester.aggregates.key_count == 1
+    appended = ingester.manager.recent.append.call_args[0][1]
+    assert [row[3] for row in appended] == ["INVOICE"]
+    top = ingester.sketches.top("7d", "PROGRAM_NAME", ingester.horizon)
+    assert {hitter.name for hitter in top} == {"PAYROLL", "INVOICE"}
+
+
+@pytest.mark.asyncio
+async def test_ingested_names_extend_loaded_index(ingester):
+    """Test que los nombres ingeridos amplían el índice y su cobertura tras la carga"""
+    from src.database.names import NameIndex
+
+    index = NameIndex("PROGRAM_NAME")
+    ingester.manager.name_indexes = {"PROGRAM_NAME": index}
+    index.load(["PAYROLL"], utc_now() - timedelta(hours=2))
+    t = utc_now() - timedelta(minutes=5)
+    ingester.manager.get_new_abends.side_effect = [
+        (COLUMNS, [(t, "PROD01", "T1", "NEWPAY01", "ASRA", "USER1", "TRM1")]),
+    ]
+
+    await ingester.poll()
+
+    assert index.containing("PAY") == ["NEWPAY01", "PAYROLL"]
+    assert index.covered_until == ingester.horizon
+
+
+@pytest.mark.asyncio
+async def test_backfill_yields_the_event_loop_between_slices(ingester):
+    """Test que un backfill de varios lotes no bloquea el event loop"""
+    ingester.batch_size = 3 * FOLD_SLICE_ROWS
+    t = utc_now() - timedelta(hours=1)
+    rows = [
+        (t + timedelta(milliseconds=i), "PROD01", f"T{i}", "PAYROLL", "ASRA", "USER1", "TRM1")
+        for i in range(2 * ingester.batch_size)
+    ]
+    ingester.manager.get_new_abends.side_effect = _table(rows)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    try:
+        assert await ingester.poll() == len(rows)
+    finally:
+        task.cancel()
+
+    # El ejecutor en línea no cede el loop: solo lo hacen los tramos de cada lote
+    assert ticks > 2 * (ingester.batch_size // FOLD_SLICE_ROWS - 1)
+    counts = ingester.aggregates.counts(t - timedelta(minutes=5))
+    assert counts["CICS_REGION"] == {"PROD01": len(rows)}
+
+
+@pytest.mark.asyncio
+async def test_batches_end_on_timestamp_change(ingester):
+    """Test que los abends empatados en todo el keyset no se saltan entre lotes"""
+    t = utc_now() - timedelta(hours=1)
+    tied = [(t, "PROD01", "T1", f"PGM{i}", "ASRA", "USER1", "TRM1") for i in range(3)]
+    later = [
+        (t + timedelta(seconds=1), "PROD01", "T1", "PAYROLL", "AEY9", "USER1", "TRM1"),
+        (t + timedelta(seconds=1), "PROD01", "T1", "PAYROLL", "AEY9", "USER2", "TRM1"),
+    ]
+    ingester.manager.get_new_abends.side_effect = _table(
+        [(t - timedelta(seconds=1), "PROD02", "T9", "INVOICE", "ASRA", "USER9", None)]
+        + tied + later
+    )
+
+    assert await ingester.poll() == 6
+
+    counts = ingester.aggregates.counts(t - timedelta(hours=1))
+    assert counts["CICS_REGION"] == {"PROD01": 5, "PROD02": 1}
+    assert counts["ABEND_CODE"] == {"ASRA": 4, "AEY9": 2}
+    # Un lote lleno con un solo TIMESTAMP se completa leyendo el grupo sin límite
+    assert any(call[0][3] is None for call in ingester.manager.get_new_abends.call_args_list)
+
+
+def test_default_summary_window_is_covered_between_polls(inline_executor):
+    """Test que la ventana por defecto del resumen, redondeada al minuto, queda cubierta"""
+    from unittest.mock import patch
+
+    from src.core import get_settings
+
+    settings = get_settings()
+    ingester = AbendIngester(
+        MagicMock(),
+        inline_executor,
+        interval=settings.abend_ingest_interval,
+        retention_hours=settings.abend_ingest_retention_hours,
+        bucket_seconds=settings.abend_ingest_bucket_seconds,
+        lag_seconds=settings.abend_ingest_lag_seconds,
+        batch_size=settings.abend_ingest_batch_size
+    )
+    minute = utc_now().replace(second=0, microsecond=0)
+
+    for second in range(0, 60, 5):
+        now = minute + timedelta(seconds=second)
+        # Último sondeo hace 5 segundos
+        ingester._horizon = now - timedelta(seconds=5) - ingester.lag
+        since = minute - timedelta(hours=settings.abend_summary_hours)
+        with patch("src.services.ingest.utc_now", return_value=now):
+            assert ingester.covers(since), second
@@ -0,0 +1,136 @@
+"""
+Tests para la paginación keyset de abends
+"""
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src.database.keyset import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    ends_in_unique_column,
+    keyset_predicate,
+)
+from src.database.manager import ODBCManager
+
+
+def test_cursor_roundtrip_preserves_types():
+    """Test que el cursor conserva datetime y valores de desempate"""
+    values = (datetime(2024, 11, 9, 10, 30, 0, 123456), "PROD01", "PAY1")
+
+    assert decode_cursor(encode_cursor(values), 3) == values
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(values), 2)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("no-es-un-cursor", 3)
+
+
+def test_keyset_predicate_expands_row_comparison():
+    """Test del predicado (a, b) < (?, ?) expandido"""
+    predicate, params = keyset_predicate(["TIMESTAMP", "CICS_REGION"], ["t", "r"], "<")
+
+    assert predicate == (
+        "TIMESTAMP <= ? AND ((TIMESTAMP < ?) OR (TIMESTAMP = ? AND CICS_REGION < ?))"
+    )
+    assert params == ["t", "t", "t", "r"]
+
+
+def test_abends_page_with_after_cursor():
+    """Test que `after` genera un rango y retorna los cursores vecinos"""
+    manager = ODBCManager(pool_size=1)
+    columns = ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID", "ABEND_CODE"]
+    rows = [
+        (datetime(2024, 11, 9, 10, 2), "PROD01", "T2", "ASRA"),
+        (datetime(2024, 11, 9, 10, 1), "PROD01", "T1", "AEY9"),
+        (datetime(2024, 11, 9, 10, 0), "PROD01", "T0", "ASRA"),
+    ]
+    after = (datetime(2024, 11, 9, 10, 3), "PROD01", "T3")
+
+    with patch.object(manager, "execute_query_rows", return_value=(columns, rows)) as execute:
+        page = manager.get_abends_page(region="PROD01", limit=2, after=after)
+
+    query, params = execute.call_args[0]
+    assert query.startswith("SELECT TOP 3 ")
+    assert "TIMESTAMP <= ?" in query
+    assert query.endswith("ORDER BY TIMESTAMP DESC, CICS_REGION DESC, TRANSACTION_ID DESC")
+    assert params[0] == "PROD01"
+    assert page.rows == rows[:2]
+    assert page.next_key == rows[1][:3]
+    assert page.prev_key == rows[0][:3]
+
+
+def test_merge_abends_pages_across_regions():
+    """Test que la mezcla k-way ordena por keyset y se corta en `limit`"""
+    manager = ODBCManager(pool_size=1)
+    columns = ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID", "ABEND_CODE"]
+    t = datetime(2024, 11, 9, 10, 0)
+    prod01 = [
+        (t.replace(minute=5), "PROD01", "T5", "ASRA"),
+        (t.replace(minute=2), "PROD01", "T2", "ASRA"),
+    ]
+    prod02 = [
+        (t.replace(minute=4), "PROD02", "T4", "AEY9"),
+        (t.replace(minute=3), "PROD02", "T3", "AEY9"),
+        (t.replace(minute=1), "PROD02", "T1", "AEY9"),
+    ]
+    pages = []
+    for rows in (prod01, prod02, []):
+        with patch.object(manager, "execute_query_rows", return_value=(columns, rows)):
+            pages.append(manager.get_abends_page(limit=3))
+
+    page = manager.merge_abends_pages(pages, limit=3)
+
+    assert [row[2] for row in page.rows] == ["T5", "T4", "T3"]
+    assert page.next_key == prod02[1][:3]
+    assert page.prev_key is None
+
+    # `before` mezcla desde el cursor: los más antiguos entre los posteriores
+    before = (t, "PROD02", "T0")
+    page = manager.merge_abends_pages(pages, limit=3, before=before)
+
+    assert [row[2] for row in page.rows] == ["T3", "T2", "T1"]
+    assert page.next_key == prod02[2][:3]
+    assert page.prev_key == prod02[1][:3]
+
+
+def test_abends_query_with_several_regions_uses_in():
+    """Test que la exportación de varias regiones usa una sola query con IN"""
+    manager = ODBCManager(pool_size=1)
+
+    query, params = manager.build_abends_query(region=["PROD01", "PROD02"], limit=10)
+
+    assert "CICS_REGION IN (?, ?)" in query
+    assert params == ("PROD01", "PROD02")
+
+
+def test_keyset_must_end_in_unique_column():
+    """Test que se detecta un keyset sin desempate único"""
+    from src.database.manager import ABEND_NON_UNIQUE_COLUMNS
+
+    assert not ends_in_unique_column(
+        ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID"], ABEND_NON_UNIQUE_COLUMNS
+    )
+    assert not ends_in_unique_column(["timestamp"], ABEND_NON_UNIQUE_COLUMNS)
+    assert ends_in_unique_column(
+        ["TIMESTAMP", "CICS_REGION", "TASK_NUMBER"], ABEND_NON_UNIQUE_COLUMNS
+    )
+
+
+def test_new_abends_resume_from_timestamp_only():
+    """Test que la ingesta continúa por TIMESTAMP y no por el keyset completo"""
+    manager = ODBCManager(pool_size=1)
+    until = datetime(2024, 11, 9, 11, 0)
+    after = datetime(2024, 11, 9, 10, 0)
+
+    with patch.object(manager, "execute_query_rows", return_value=([], [])) as execute:
+        manager.get_new_abends(until, after=after, limit=100)
+        query, params = execute.call_args[0]
+        assert query.startswith("SELECT TOP 100 ")
+        assert "TIMESTAMP <= ? AND TIMESTAMP > ? ORDER BY" in query
+        assert params == (until, after)
+
+        manager.get_new_abends(after, after=datetime(2024, 11, 9, 9, 0), limit=None)
+        assert "TOP" not in execute.call_args[0][0]
@@ -0,0 +1,96 @@
+"""
+Tests para el índice local de nombres y el filtro de programa
+"""
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database.manager import ODBCManager
+from src.database.names import NameIndex
+from src.services.names import NameIndexRefresher
+
+
+def test_suggest_prefix_first_then_substring():
+    """Test que el autocompletado da primero los prefijos y luego las subcadenas"""
+    index = NameIndex("PROGRAM_NAME")
+    assert index.add(["PAYROLL ", "EMPPAY01", "PAYSLIP", None, "  ", "INVOICE"]) == 4
+    assert index.add(["PAYROLL"]) == 0
+
+    assert index.suggest("PAY") == ["PAYROLL", "PAYSLIP", "EMPPAY01"]
+    assert index.suggest("PAY", limit=1) == ["PAYROLL"]
+    assert index.suggest("") == ["EMPPAY01", "INVOICE", "PAYROLL", "PAYSLIP"]
+    assert index.suggest("ROL") == ["PAYROLL"]
+    assert index.suggest("XYZ") == []
+
+
+def test_containing_requires_full_load():
+    """Test que el índice no resuelve filtros hasta su primera carga completa"""
+    index = NameIndex("PROGRAM_NAME")
+    index.add(["PAYROLL"])
+    index.advance(datetime(2024, 11, 9))
+    assert index.containing("PAY") is None
+
+    index.load(["PAYROLL", "EMPPAY01", "INVOICE"], datetime(2024, 11, 9))
+    assert index.containing("PAY") == ["EMPPAY01", "PAYROLL"]
+    assert index.containing("PA") == ["EMPPAY01", "PAYROLL"]
+
+    index.advance(datetime(2024, 11, 8))
+    assert index.covered_until == datetime(2024, 11, 9)
+
+
+def test_program_filter_uses_in_with_recent_like():
+    """Test que LIKE '%x%' se traduce en IN más LIKE sobre los abends no cubiertos"""
+    manager = ODBCManager(pool_size=1)
+    covered_until = datetime(2024, 11, 9, 10, 0)
+    manager.name_indexes["PROGRAM_NAME"].load(["PAYROLL", "EMPPAY01", "INVOICE"], covered_until)
+
+    query, params = manager.build_abends_query(region="PROD01", program="PAY", limit=10)
+    assert (
+        "(PROGRAM_NAME IN (?, ?) OR (TIMESTAMP > ? AND PROGRAM_NAME LIKE ?))" in query
+    )
+    assert params == ("PROD01", "EMPPAY01", "PAYROLL", covered_until, "%PAY%")
+
+    query, params = manager.build_abends_query(program="NOMATCH", limit=10)
+    assert "IN (" not in query
+    assert params == (covered_until, "%NOMATCH%")
+
+    # Los comodines SQL conservan la semántica de LIKE
+    query, params = manager.build_abends_query(program="PAY%01", limit=10)
+    assert "PROGRAM_NAME LIKE ?" in query and "IN (" not in query
+    assert params == ("%PAY%01%",)
+
+
+def test_program_filter_falls_back_to_like():
+    """Test que sin carga completa o con demasiados nombres se usa LIKE"""
+    manager = ODBCManager(pool_size=1)
+    index = manager.name_indexes["PROGRAM_NAME"]
+    index.add(["PAYROLL"])
+
+    query, params = manager.build_abends_query(program="PAY", limit=10)
+    assert "IN (" not in query
+    assert params == ("%PAY%",)
+
+    index.load([f"PAY{i:04d}" for i in range(manager.settings.name_index_max_in + 1)],
+               datetime(2024, 11, 9))
+    query, params = manager.build_abends_query(program="PAY", limit=10)
+    assert "IN (" not in query
+    assert params == ("%PAY%",)
+
+
+@pytest.mark.asyncio
+async def test_refresher_loads_every_indexed_column(inline_executor):
+    """Test que la carga lee los distintos de cada columna y fija la cobertura"""
+    manager = MagicMock()
+    manager.name_indexes = {
+        "PROGRAM_NAME": NameIndex("PROGRAM_NAME"),
+        "TRANSACTION_ID": NameIndex("TRANSACTION_ID"),
+    }
+    manager.get_distinct_values.side_effect = lambda column: (
+        ["PAYROLL ", "INVOICE "] if column == "PROGRAM_NAME" else ["T1  ", None]
+    )
+    refresher = NameIndexRefresher(manager, inline_executor, interval=3600, lag_seconds=30)
+
+    assert await refresher.refresh() == 3
+    assert all(index.ready for index in manager.name_indexes.values())
+    assert manager.name_indexes["TRANSACTION_ID"].suggest("T") == ["T1"]
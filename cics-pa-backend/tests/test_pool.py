@@ -0,0 +1,141 @@
+"""
+Tests para el pool de conexiones ODBC
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.database.manager import ODBCConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def pool():
+    """Pool cuyas conexiones son mocks"""
+    pool = ODBCConnectionPool(pool_size=2, max_overflow=1, recycle=0, timeout=0.05)
+    with patch.object(pool, "_create_connection", side_effect=lambda: MagicMock()):
+        yield pool
+
+
+def test_pool_opens_overflow_up_to_limit(pool):
+    """Test que el pool abre overflow hasta pool_size + max_overflow"""
+    connections = [pool.checkout() for _ in range(3)]
+
+    assert pool.status()["overflow"] == 1
+    with pytest.raises(PoolTimeoutError):
+        pool.checkout()
+
+    for conn in connections:
+        pool.checkin(conn)
+    assert pool.status()["idle"] == 3
+
+
+def test_pool_reuses_last_returned_connection(pool):
+    """Test de reutilización LIFO"""
+    first = pool.checkout()
+    second = pool.checkout()
+    pool.checkin(first)
+    pool.checkin(second)
+
+    assert pool.checkout() is second
+
+
+def test_pool_trims_idle_overflow(pool):
+    """Test que el overflow ocioso se cierra"""
+    pool.overflow_idle_timeout = 0
+    connections = [pool.checkout() for _ in range(3)]
+    for conn in connections:
+        pool.checkin(conn)
+
+    status = pool.status()
+    assert status["size"] == 2
+    assert status["overflow"] == 0
+    connections[0].close.assert_called_once()
+
+
+def test_pool_recycles_old_connections(pool):
+    """Test que las conexiones con más de pool_recycle se reemplazan"""
+    conn = pool.checkout()
+    pool.checkin(conn)
+    pool.recycle = 1
+
+    with patch("src.database.manager.time.monotonic", return_value=10 ** 9):
+        fresh = pool.checkout()
+
+    assert fresh is not conn
+    conn.close.assert_called_once()
+
+
+def test_pool_skips_ping_for_recently_used_connection(pool):
+    """Test que una conexión usada recientemente no se valida"""
+    pool.validation_idle_seconds = 60
+    conn = pool.checkout()
+    pool.checkin(conn)
+
+    assert pool.checkout() is conn
+    conn.cursor.assert_not_called()
+
+
+def test_pool_replaces_idle_connection_that_fails_ping(pool):
+    """Test que una conexión ociosa inválida se descarta al hacer checkout"""
+    pool.validation_idle_seconds = 0
+    conn = pool.checkout()
+    pool.checkin(conn)
+    conn.cursor.return_value.execute.side_effect = Exception("link failure")
+
+    fresh = pool.checkout()
+
+    assert fresh is not conn
+    conn.close.assert_called_once()
+    assert pool.status()["size"] == 1
+
+
+def test_reaper_probes_and_replenishes(pool):
+    """Test que el reaper descarta conexiones muertas y repone el pool"""
+    pool.validation_idle_seconds = 0
+    healthy, dead = pool.checkout(), pool.checkout()
+    pool.checkin(healthy)
+    pool.checkin(dead)
+    dead.cursor.return_value.execute.side_effect = Exception("link failure")
+
+    pool.reap()
+
+    dead.close.assert_called_once()
+    healthy.cursor.return_value.close.assert_called()
+    assert pool.status()["idle"] == 2
+
+
+def test_pool_initialize_tolerates_partial_failures():
+    """Test que el calentamiento paralelo tolera fallos si se alcanza el mínimo"""
+    pool = ODBCConnectionPool(pool_size=3, max_overflow=0, recycle=0, timeout=0.05)
+    pool.min_size = 2
+    pool.reaper_interval = 0
+    outcomes = iter([MagicMock(), Exception("DVM no disponible"), MagicMock()])
+
+    def create():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with patch.object(pool, "_create_connection", side_effect=create):
+        pool.initialize()
+
+    assert pool.ready
+    assert pool.status()["size"] == 2
+
+
+def test_pool_reports_leaked_checkout(pool):
+    """Test que un checkout retenido se registra una sola vez con su stack"""
+    pool.leak_threshold = 0.01
+    with patch("src.database.manager.traceback.StackSummary") as summary:
+        conn = pool.checkout()
+        # El checkout solo guarda los frames; el stack se formatea al reportar
+        summary.extract.assert_not_called()
+        frame, _ = pool._in_use[id(conn)].checkout_stack[0]
+        assert frame.f_code.co_name == "test_pool_reports_leaked_checkout"
+
+        with patch("src.database.manager.time.monotonic", return_value=10 ** 9):
+            assert pool.detect_leaks() == 1
+            assert pool.detect_leaks() == 0
+        summary.extract.assert_called_once()
+
+    pool.checkin(conn)
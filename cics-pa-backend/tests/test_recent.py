@@ -0,0 +1,111 @@
+"""
+Tests para el almacén en memoria de abends recientes
+"""
+from datetime import timedelta
+
+import pytest
+
+from src.database.recent import RecentAbendStore
+from src.services.ingest import utc_now
+
+COLUMNS = ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID", "PROGRAM_NAME", "ABEND_CODE", "USER_ID"]
+KEYSET = ["TIMESTAMP", "CICS_REGION", "TRANSACTION_ID"]
+
+
+def _rows(count, start):
+    """Filas en orden ascendente de keyset, con TIMESTAMP repetidos"""
+    return [
+        (
+            start + timedelta(seconds=i // 3),
+            f"PROD0{i % 3}  ",
+            f"T{i:04d}",
+            ("PAYROLL", "INVOICE", "PAYMENT")[i % 4 % 3],
+            ("ASRA", "AEY9")[i % 2],
+            f"USER{i % 5}",
+        )
+        for i in range(count)
+    ]
+
+
+def _expected(rows, region=None, program=None, limit=10, after=None, before=None):
+    """Lo que retornaría DVM para la misma query"""
+    matches = [
+        row for row in rows
+        if (region is None or row[1].strip() == region)
+        and (program is None or program in row[3])
+    ]
+    if before is not None:
+        return [row for row in matches if row[:3] > before][:limit]
+    if after is not None:
+        matches = [row for row in matches if row[:3] < after]
+    return list(reversed(matches))[:limit]
+
+
+@pytest.fixture
+def store():
+    return RecentAbendStore(KEYSET, max_rows=500, retention=timedelta(hours=4),
+                            max_staleness=timedelta(minutes=5))
+
+
+def test_pages_match_database_results(store):
+    """Test que las páginas servidas desde memoria coinciden con las de DVM"""
+    start = utc_now() - timedelta(hours=1)
+    rows = _rows(300, start)
+    for i in range(0, 300, 64):
+        store.append(COLUMNS, rows[i:i + 64])
+    store.advance(utc_now())
+
+    cases = [
+        {},
+        {"region": "PROD01"},
+        {"program": "PAY"},
+        {"region": "PROD02", "program": "INVOICE"},
+        {"after": rows[200][:3]},
+        {"region": "PROD00", "after": rows[150][:3]},
+        {"before": rows[100][:3]},
+        {"program": "PAYMENT", "before": rows[250][:3]},
+    ]
+    for case in cases:
+        columns, page = store.query(limit=11, **case)
+        assert columns == COLUMNS
+        assert page == _expected(rows, limit=11, **case), case
+
+
+def test_incomplete_pages_fall_through_to_database(store):
+    """Test que sin filas suficientes o sin ingesta reciente no se responde desde memoria"""
+    rows = _rows(30, utc_now() - timedelta(minutes=10))
+    store.append(COLUMNS, rows)
+
+    assert store.query(limit=5) is None  # el horizonte aún no se registró
+
+    store.advance(utc_now())
+    assert store.query(limit=5) is not None
+    assert store.query(limit=31) is None
+    assert store.query(limit=5, after=rows[3][:3]) is None
+    assert store.query(limit=5, before=(rows[0][0] - timedelta(seconds=1), "", "")) is None
+    assert store.query(limit=5, program="PAY%") is None
+
+    store.advance(utc_now() - timedelta(hours=1))
+    assert store.query(limit=5) is None
+
+
+def test_oldest_rows_are_evicted(store):
+    """Test que se descartan las filas más antiguas por retención y por tamaño"""
+    old = _rows(200, utc_now() - timedelta(hours=5))
+    store.append(COLUMNS, old)
+    recent = _rows(100, utc_now() - timedelta(minutes=30))
+    store.append(COLUMNS, recent)
+    store.advance(utc_now())
+
+    assert len(store) == 100
+    _, page = store.query(region="PROD01", limit=20)
+    assert page == _expected(recent, region="PROD01", limit=20)
+
+    newer = _rows(600, utc_now() - timedelta(minutes=20))
+    store.append(COLUMNS, newer)
+    store.advance(utc_now())
+
+    assert len(store) == 500
+    _, page = store.query(program="INVOICE", limit=50)
+    assert page == _expected(newer[-500:], program="INVOICE", limit=50)
+    assert store.query(limit=501) is None
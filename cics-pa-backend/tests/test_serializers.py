@@ -0,0 +1,80 @@
+"""
+Tests para los serializadores de streaming
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.services.serializers import encode_ndjson, encode_csv, encode_csv_header
+
+
+def test_encode_ndjson_one_object_per_line():
+    """Test de NDJSON con tipos de pyodbc"""
+    columns = ["TIMESTAMP", "CICS_REGION", "CPU_TIME"]
+    rows = [
+        (datetime(2024, 11, 9, 10, 30), "PROD01", Decimal("1.25")),
+        (datetime(2024, 11, 9, 10, 31), "PROD02", Decimal("3")),
+    ]
+
+    lines = encode_ndjson(columns, rows).decode().splitlines()
+
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {
+        "TIMESTAMP": "2024-11-09T10:30:00",
+        "CICS_REGION": "PROD01",
+        "CPU_TIME": 1.25,
+    }
+    assert json.loads(lines[1])["CPU_TIME"] == 3
+
+
+def test_encode_csv_with_header():
+    """Test de CSV con cabecera y valores nulos"""
+    header = encode_csv_header(["CICS_REGION", "PROGRAM_NAME"])
+    body = encode_csv([("PROD01", None), ("PROD02", "PAY,ROLL")])
+
+    assert header == b"CICS_REGION,PROGRAM_NAME\r\n"
+    assert body == b'PROD01,\r\nPROD02,"PAY,ROLL"\r\n'
+
+
+def test_arrow_encoder_builds_typed_stream():
+    """Test del codificador Arrow IPC con tipos de cursor.description"""
+    pa = pytest.importorskip("pyarrow")
+    from src.services.arrow_export import ArrowStreamEncoder
+
+    description = [
+        ("TIMESTAMP", datetime, None, 26, 26, 6, False),
+        ("CICS_REGION", str, None, 8, 8, 0, True),
+        ("CPU_TIME", Decimal, None, 10, 10, 2, True),
+    ]
+    encoder = ArrowStreamEncoder(description)
+    data = encoder.start()
+    data += encoder.encode([(datetime(2024, 11, 9, 10, 30), "PROD01", Decimal("1.25"))])
+    data += encoder.encode([(datetime(2024, 11, 9, 10, 31), None, None)])
+    data += encoder.finish()
+
+    table = pa.ipc.open_stream(data).read_all()
+
+    assert table.num_rows == 2
+    assert pa.types.is_timestamp(table.schema.field("TIMESTAMP").type)
+    assert table.schema.field("CPU_TIME").type == pa.decimal128(10, 2)
+    assert table.column("CICS_REGION").to_pylist() == ["PROD01", None]
+
+
+def test_fast_json_response_skips_row_validation():
+    """Test que FastJSONResponse serializa modelos construidos sin validar"""
+    from src.core.responses import FastJSONResponse
+    from src.models import QueryResponse
+
+    result = QueryResponse.model_construct(
+        success=True,
+        data=[{"TIMESTAMP": datetime(2024, 11, 9, 10, 30), "CPU_TIME": Decimal("0.50")}],
+        row_count=1,
+        execution_time_ms=1.5
+    )
+
+    body = json.loads(FastJSONResponse(result).body)
+
+    assert body["data"] == [{"TIMESTAMP": "2024-11-09T10:30:00", "CPU_TIME": 0.5}]
+    assert body["row_count"] == 1
@@ -0,0 +1,149 @@
+"""
+Tests para el top-K aproximado con sketches Space-Saving
+"""
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.services.sketches import HyperLogLog, SpaceSaving, WindowedDistinct, WindowedSketches
+
+
+def _zipf_stream(seed: int, size: int):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, 501)]
+    return rng.choices([f"PGM{i:03d}" for i in range(500)], weights=weights, k=size)
+
+
+def test_space_saving_bounds_hold_and_finds_heavy_hitters():
+    """Test que el conteo real queda en [count - error, count] y el top real aparece"""
+    stream = _zipf_stream(seed=7, size=20000)
+    exact = Counter(stream)
+    sketch = SpaceSaving(capacity=50)
+    for item in stream:
+        sketch.offer(item)
+
+    for item, count in sketch.counts.items():
+        assert count - sketch.errors[item] <= exact[item] <= count
+
+    top = sketch.top(5)
+    assert [hitter.name for hitter in top] == [item for item, _ in exact.most_common(5)]
+    assert all(hitter.guaranteed for hitter in top[:3])
+
+
+def test_merge_keeps_error_bounds():
+    """Test que la fusión de sketches llenos conserva las cotas"""
+    streams = [_zipf_stream(seed, 5000) for seed in range(4)]
+    exact = Counter()
+    sketches = []
+    for stream in streams:
+        exact.update(stream)
+        sketch = SpaceSaving(capacity=40)
+        sketch.update(Counter(stream))
+        sketches.append(sketch)
+
+    merged = SpaceSaving.merge(sketches, capacity=40)
+
+    assert len(merged) == 40
+    for item, count in merged.counts.items():
+        assert count - merged.errors[item] <= exact[item] <= count
+    assert merged.top(1)[0].name == exact.most_common(1)[0][0]
+
+
+def test_windows_select_buckets_and_prune():
+    """Test que cada ventana suma solo sus intervalos y los antiguos se descartan"""
+    now = datetime(2024, 11, 9, 10, 30)
+    sketches = WindowedSketches(capacity=10)
+    sketches.add_batch([
+        (now - timedelta(hours=1), "PROD01", "PAYROLL", "T1", "ASRA"),
+        (now - timedelta(hours=1), "PROD02", "PAYROLL", "T1", "ASRA"),
+        (now - timedelta(days=3), "PROD01", "INVOICE", "T2", "AEY9"),
+        (now - timedelta(days=20), "PROD01", "INVOICE", "T2", "AEY9"),
+        (now - timedelta(days=40), "PROD01", "INVOICE", "T2", "AEY9"),
+    ])
+
+    def top(window, dimension, region=None):
+        return {h.name: h.count for h in sketches.top(window, dimension, now, region=region)}
+
+    assert top("24h", "PROGRAM_NAME") == {"PAYROLL": 2}
+    assert top("24h", "PROGRAM_NAME", region="PROD01") == {"PAYROLL": 1}
+    assert top("7d", "ABEND_CODE") == {"ASRA": 2, "AEY9": 1}
+    assert top("30d", "TRANSACTION_ID") == {"T1": 2, "T2": 2}
+    assert top("30d", "TRANSACTION_ID", region="PROD01") == {"T1": 1, "T2": 2}
+    assert sketches.window_start("7d", now) == datetime(2024, 11, 3)
+
+    # Intervalos de 40 días (diario) y de más de 24h (horario)
+    assert sketches.prune(now) == 4
+    assert top("30d", "PROGRAM_NAME") == {"PAYROLL": 2, "INVOICE": 2}
+
+
+def test_hyperloglog_estimates_and_unions():
+    """Test que el estimado queda dentro del error esperado y la fusión es la unión"""
+    first, second = HyperLogLog(12), HyperLogLog(12)
+    first.update(f"USER{i}" for i in range(60000))
+    second.update(f"USER{i}" for i in range(40000, 100000))
+
+    assert abs(first.count() - 60000) / 60000 < 0.05
+    union = HyperLogLog.merge([first, second], 12)
+    assert abs(union.count() - 100000) / 100000 < 0.05
+
+    small = HyperLogLog(12)
+    small.update(["TRM1", "TRM2", "TRM3", "TRM1"])
+    assert small.count() == 3
+
+
+def test_distinct_windows_align_and_skip_nulls():
+    """Test que una ventana une intervalos horarios o diarios y que NULL no cuenta"""
+    now = datetime(2024, 11, 9, 10, 30)
+    distinct = WindowedDistinct(precision=12)
+    distinct.since = now - timedelta(days=10)
+    distinct.add_batch([
+        (now - timedelta(minutes=10), "PROD01", "PAYROLL", "T1", "USER1", None),
+        (now - timedelta(hours=2), "PROD02", "INVOICE", "T2", "USER2", "TRM1"),
+        (now - timedelta(days=3), "PROD01", "PAYROLL", "T3", "USER3", "TRM2"),
+    ], now=now)
+
+    assert distinct.counts(now - timedelta(hours=1), now) == {
+        "PROGRAM_NAME": 1, "TRANSACTION_ID": 1, "USER_ID": 1, "TERMINAL_ID": 0
+    }
+    assert distinct.counts(now - timedelta(days=7), now, region="PROD01") == {
+        "PROGRAM_NAME": 1, "TRANSACTION_ID": 2, "USER_ID": 2, "TERMINAL_ID": 1
+    }
+    assert distinct.window_start(now - timedelta(hours=3), now) == datetime(2024, 11, 9, 7)
+    assert distinct.window_start(now - timedelta(days=2), now) == datetime(2024, 11, 7)
+    assert distinct.complete(now - timedelta(days=7), now)
+    assert not distinct.complete(now - timedelta(days=12), now)
+
+
+def test_distinct_default_24h_window_stays_hourly():
+    """Test que la ventana por defecto de 24 horas no cae al nivel diario"""
+    now = datetime(2026, 10, 17, 22, 30)
+    distinct = WindowedDistinct(precision=12)
+    distinct.since = now - timedelta(days=2)
+    distinct.add_batch([
+        (now - timedelta(hours=23, minutes=50), "PROD01", "PAYROLL", "T1", "USER1", "TRM1"),
+        (now - timedelta(hours=40), "PROD01", "INVOICE", "T2", "USER2", "TRM2"),
+    ], now=now)
+
+    since = now - timedelta(hours=24)
+    assert distinct.window_start(since, now) == datetime(2026, 10, 16, 22)
+    assert distinct.complete(since, now)
+    assert distinct.counts(since, now)["PROGRAM_NAME"] == 1
+
+
+def test_hyperloglog_precision_bounds():
+    """Test que solo se admiten precisiones en las que el rango es exacto"""
+    from pydantic import ValidationError
+
+    from src.core.config import Settings
+
+    for precision in (11, 16):
+        assert len(HyperLogLog(precision).registers) == 1 << precision
+    for precision in (10, 17):
+        with pytest.raises(ValueError):
+            HyperLogLog(precision)
+        with pytest.raises(ValueError):
+            WindowedDistinct(precision)
+        with pytest.raises(ValidationError):
+            Settings(abend_distinct_precision=precision)
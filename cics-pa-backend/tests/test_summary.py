@@ -0,0 +1,75 @@
+"""
+Tests para el resumen de abends agregado en DVM
+"""
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.database.manager import ODBCManager
+from src.services.cache import ResultCache
+from src.services.query_service import QueryService
+
+SINCE = datetime(2024, 11, 9, 10, 0)
+
+
+def test_grouping_sets_rows_are_split_by_dimension():
+    """Test que GROUPING() separa cada conjunto y un NULL real cuenta como UNKNOWN"""
+    manager = ODBCManager(pool_size=1)
+    rows = [
+        ("PROD01  ", None, None, 0, 1, 1, 5),
+        (None, None, None, 0, 1, 1, 2),
+        (None, "PAYROLL ", None, 1, 0, 1, 7),
+        (None, None, "ASRA", 1, 1, 0, 7),
+    ]
+
+    with patch.object(manager, "execute_query_rows", return_value=([], rows)) as execute:
+        counts = manager.get_abend_counts_grouping_sets("PROD01", SINCE)
+
+    query, params = execute.call_args[0]
+    assert "GROUP BY GROUPING SETS ((CICS_REGION), (PROGRAM_NAME), (ABEND_CODE))" in query
+    assert params == (SINCE, "PROD01")
+    assert counts == {
+        "CICS_REGION": {"PROD01": 5, "UNKNOWN": 2},
+        "PROGRAM_NAME": {"PAYROLL": 7},
+        "ABEND_CODE": {"ASRA": 7},
+    }
+
+
+@pytest.mark.asyncio
+async def test_summary_falls_back_to_group_by_per_dimension(inline_executor):
+    """Test que sin GROUPING SETS se hace un GROUP BY por dimensión"""
+    manager = ODBCManager(pool_size=1)
+    manager.grouping_sets_enabled = True
+
+    service = QueryService.__new__(QueryService)
+    service.odbc_manager = manager
+    service.executor = inline_executor
+    service.cache = ResultCache("test", ttl=60, max_bytes=10 ** 6)
+    service.watermarks = MagicMock(active=False)
+    service.ingester = MagicMock()
+    service.ingester.covers.return_value = False
+    service.settings = manager.settings
+
+    results = {
+        "CICS_REGION": [("PROD01", 3), ("PROD02", 1)],
+        "PROGRAM_NAME": [("PAYROLL", 4)],
+        "ABEND_CODE": [("ASRA", 3), (None, 1)],
+    }
+
+    def execute(query, params=None):
+        if "GROUPING SETS" in query:
+            raise RuntimeError("Syntax error")
+        dimension = query.split()[1].rstrip(",")
+        return [], results[dimension]
+
+    with patch.object(manager, "execute_query_rows", side_effect=execute):
+        summary = await service.get_abends_summary(hours=6)
+
+    assert manager.grouping_sets_enabled is False
+    assert summary["total_abends"] == 4
+    assert summary["top_regions"] == {"PROD01": 3, "PROD02": 1}
+    assert summary["top_abend_codes"] == {"ASRA": 3, "UNKNOWN": 1}
+    assert summary["unique_programs"] == 1
+    assert summary["window_hours"] == 6
+    assert summary["source"] == "query"
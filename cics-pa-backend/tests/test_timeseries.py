@@ -0,0 +1,108 @@
+"""
+Tests para las series temporales de abends
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.database.manager import ODBCManager
+from src.models import TimeseriesGroupBy
+from src.services.cache import ResultCache
+from src.services.query_service import QueryService
+from src.services.timeseries import align_range, bucket_indexes, dense_series
+
+START = datetime(2024, 11, 9, 10, 0)
+
+
+def test_align_range_rounds_to_bucket_boundaries():
+    """Test que el rango se alinea a múltiplos del intervalo"""
+    start, count = align_range(
+        datetime(2024, 11, 9, 10, 7, 30), datetime(2024, 11, 9, 10, 20, 1), 300
+    )
+
+    assert start == datetime(2024, 11, 9, 10, 5)
+    assert count == 4
+
+
+def test_dense_series_from_timestamps():
+    """Test que los TIMESTAMP se agrupan en series densas con top y OTHER"""
+    timestamps = [
+        datetime(2024, 11, 9, 10, 0, 10),
+        datetime(2024, 11, 9, 10, 0, 50),
+        datetime(2024, 11, 9, 10, 2, 0),
+        datetime(2024, 11, 9, 10, 2, 30),
+        datetime(2024, 11, 9, 10, 1, 0),
+        datetime(2024, 11, 9, 11, 0, 0),  # fuera del rango
+    ]
+    labels = ["PROD01  ", "PROD01", "PROD02", None, "PROD03", "PROD01"]
+
+    indexes = bucket_indexes(timestamps, START, 60)
+    series = dense_series(indexes, 3, labels=labels, max_series=2)
+
+    assert list(series) == ["PROD01", "PROD02", "OTHER"]
+    assert series["PROD01"] == [2, 0, 0]
+    assert series["PROD02"] == [0, 0, 1]
+    assert series["OTHER"] == [0, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_timeseries_falls_back_to_numpy_bucketing(inline_executor):
+    """Test que si DVM no agrupa por intervalo se agrupan los TIMESTAMP leídos"""
+    manager = ODBCManager(pool_size=1)
+    manager.sql_bucketing_enabled = True
+
+    service = QueryService.__new__(QueryService)
+    service.odbc_manager = manager
+    service.executor = inline_executor
+    service.cache = ResultCache("test", ttl=60, max_bytes=10 ** 6)
+    service.watermarks = MagicMock(active=False)
+    service.settings = manager.settings
+
+    def execute(query, params=None):
+        if "TIMESTAMPDIFF" in query:
+            raise RuntimeError("Función no soportada")
+        return [], [(datetime(2024, 11, 9, 10, 30),), (datetime(2024, 11, 9, 12, 5),)]
+
+    with patch.object(manager, "execute_query_rows", side_effect=execute):
+        result = await service.get_abends_timeseries(
+            bucket_seconds=3600,
+            start=START,
+            end=datetime(2024, 11, 9, 13, 0)
+        )
+
+    assert manager.sql_bucketing_enabled is False
+    assert result.source == "numpy"
+    assert result.series == {"total": [1, 0, 1]}
+    assert result.buckets[2] == datetime(2024, 11, 9, 12, 0)
+
+    with patch.object(
+        manager,
+        "execute_query_rows",
+        return_value=([], [(Decimal(0), "ASRA", 3), (Decimal(2), "AEY9", 1)])
+    ):
+        manager.sql_bucketing_enabled = True
+        result = await service.get_abends_timeseries(
+            bucket_seconds=3600,
+            start=START,
+            end=datetime(2024, 11, 9, 13, 0),
+            group_by=TimeseriesGroupBy.ABEND_CODE
+        )
+
+    assert result.source == "sql"
+    assert result.series == {"ASRA": [3, 0, 0], "AEY9": [0, 0, 1]}
+    assert result.total == 4
+
+
+def test_numpy_fallback_reads_a_bounded_number_of_rows():
+    """Test que la lectura de TIMESTAMP para NumPy tiene tope y no trunca en silencio"""
+    manager = ODBCManager(pool_size=1)
+    rows = [(START,), (START,), (START,)]
+
+    with patch.object(manager, "execute_query_rows", return_value=([], rows)) as execute:
+        assert manager.get_abend_timestamps(START, START + timedelta(hours=1), limit=3) == rows
+        assert execute.call_args[0][0].startswith("SELECT TOP 4 TIMESTAMP ")
+
+        with pytest.raises(ValueError):
+            manager.get_abend_timestamps(START, START + timedelta(hours=1), limit=2)
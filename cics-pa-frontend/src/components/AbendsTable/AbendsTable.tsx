@@ -1,29 +1,41 @@
 import { useState } from 'react';
-import { useAbends } from '../../hooks/useApi';
+import { useAbends, useAbendsStream } from '../../hooks/useApi';
 import { Loading } from '../Loading/Loading';
 import { ErrorMessage } from '../ErrorMessage/ErrorMessage';
-import type { AbendRecord } from '../../types/api.types';
+import type { AbendRecord, AbendsFilterRequest } from '../../types/api.types';
 import './AbendsTable.css';
 
 export function AbendsTable() {
   const [region, setRegion] = useState<string>('');
   const [program, setProgram] = useState<string>('');
   const [limit, setLimit] = useState<number>(100);
+  // Filtros aplicados con "Buscar": escribir en el formulario no cambia la
+  // consulta ni reabre el stream en cada tecla
+  const [filters, setFilters] = useState<AbendsFilterRequest>({ limit: 100 });
 
-  const { data, isLoading, error, refetch } = useAbends(
-    {
+  const { data, isLoading, error, refetch } = useAbends(filters, {
+    refetchOnMount: true,
+  });
+
+  // Los abends nuevos llegan por SSE y refrescan la tabla sin polling
+  useAbendsStream({ region: filters.region, program: filters.program });
+
+  const handleSubmit = (e: React.FormEvent) => {
+    e.preventDefault();
+    const next: AbendsFilterRequest = {
       region: region || undefined,
       program: program || undefined,
       limit,
-    },
-    {
-      refetchOnMount: true,
+    };
+    if (
+      next.region === filters.region &&
+      next.program === filters.program &&
+      next.limit === filters.limit
+    ) {
+      refetch();
+    } else {
+      setFilters(next);
     }
-  );
-
-  const handleSubmit = (e: React.FormEvent) => {
-    e.preventDefault();
-    refetch();
   };
 
   if (error) {
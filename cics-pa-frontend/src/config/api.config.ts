@@ -15,5 +15,6 @@ export const API_ENDPOINTS = {
   abends: '/api/v1/query/abends',
   execute: '/api/v1/query/execute',
   summary: '/api/v1/query/abends/summary',
+  abendsStream: '/api/v1/query/abends/stream',
   tables: '/api/v1/tables',
 };
@@ -1,6 +1,7 @@
-import { useQuery, useMutation, UseQueryOptions } from '@tanstack/react-query';
+import { useEffect, useState } from 'react';
+import { useQuery, useMutation, useQueryClient, UseQueryOptions } from '@tanstack/react-query';
 import { apiService } from '../services/api.service';
-import { API_ENDPOINTS } from '../config/api.config';
+import { API_CONFIG, API_ENDPOINTS } from '../config/api.config';
 import type {
   HealthResponse,
   AbendsResponse,
@@ -57,6 +58,46 @@ export function useAbendsSummary(
   });
 }
 
+// ========== Live Stream ==========
+
+/**
+ * Suscripción SSE a los abends nuevos.
+ * Cada evento invalida las queries de abends, que se recargan solo cuando
+ * hay cambios en lugar de hacer polling.
+ */
+export function useAbendsStream(
+  filters?: Pick<AbendsFilterRequest, 'region' | 'program'>,
+  enabled = true
+) {
+  const queryClient = useQueryClient();
+  const [connected, setConnected] = useState(false);
+  const [lastEventId, setLastEventId] = useState<string | null>(null);
+  // Valores primitivos: un objeto de filtros nuevo en cada render no reabre la conexión
+  const region = filters?.region;
+  const program = filters?.program;
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    const params = new URLSearchParams();
+    if (region) params.append('region', region);
+    if (program) params.append('program', program);
+    const query = params.toString() ? `?${params.toString()}` : '';
+
+    const source = new EventSource(`${API_CONFIG.baseURL}${API_ENDPOINTS.abendsStream}${query}`);
+    source.onopen = () => setConnected(true);
+    source.onerror = () => setConnected(false); // EventSource reconecta solo
+    source.addEventListener('abends', (event) => {
+      setLastEventId((event as MessageEvent).lastEventId);
+      queryClient.invalidateQueries({ queryKey: ['abends'] });
+    });
+
+    return () => source.close();
+  }, [enabled, region, program, queryClient]);
+
+  return { connected, lastEventId };
+}
+
 // ========== Custom Query ==========
 
 export function useExecuteQuery() {